@@ -0,0 +1,33 @@
+"""Add keyset pagination indexes for tasks and journal entries
+
+Revision ID: 004_keyset_indexes
+Revises: 003_add_mood
+Create Date: 2024-01-04 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_keyset_indexes'
+down_revision = '003_add_mood'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; it keeps the tables writable while building
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_created_id', 'tasks', ['user_id', 'created_at', 'id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_journal_entries_user_created_id', 'journal_entries', ['user_id', 'created_at', 'id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_journal_entries_user_created_id', 'journal_entries', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_created_id', 'tasks', postgresql_concurrently=True)
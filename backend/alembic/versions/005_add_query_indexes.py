@@ -0,0 +1,34 @@
+"""Add composite indexes for task, journal and mood predictor queries
+
+Revision ID: 005_query_indexes
+Revises: 004_keyset_indexes
+Create Date: 2024-01-05 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005_query_indexes'
+down_revision = '004_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+# journal_entries is served by ix_journal_entries_user_created_id from 004 (scanned
+# backwards for newest-first), and mood_profiles by ix_mood_profiles_user_created from 003.
+INDEXES = [
+    ('ix_tasks_user_status_created', 'tasks', ['user_id', 'status', 'created_at', 'id']),
+    ('ix_tasks_user_status_due', 'tasks', ['user_id', 'status', 'due_date', 'estimated_time']),
+    ('ix_tasks_user_source_title', 'tasks', ['user_id', 'source', 'title']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table, postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""Add per-user change versions for conditional GET
+
+Revision ID: 006_change_versions
+Revises: 005_query_indexes
+Create Date: 2024-01-06 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006_change_versions'
+down_revision = '005_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_change_versions',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('resource', sa.String(), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_change_versions')
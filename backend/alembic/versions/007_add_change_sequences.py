@@ -0,0 +1,54 @@
+"""Add change sequence columns and tombstones for delta sync
+
+Revision ID: 007_change_sequences
+Revises: 006_change_versions
+Create Date: 2024-01-07 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007_change_sequences'
+down_revision = '006_change_versions'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_tasks_user_change_seq', 'tasks', ['user_id', 'change_seq', 'id']),
+    ('ix_journal_entries_user_change_seq', 'journal_entries', ['user_id', 'change_seq', 'id']),
+]
+
+
+def upgrade() -> None:
+    # A constant default doesn't rewrite the table (Postgres 11+); existing rows get 0,
+    # which a first sync returns and later syncs skip
+    for table in ('tasks', 'journal_entries'):
+        op.add_column(table, sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.create_table(
+        'tombstones',
+        sa.Column('resource', sa.String(), primary_key=True),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index(
+        'ix_tombstones_user_resource_seq', 'tombstones', ['user_id', 'resource', 'change_seq', 'entity_id']
+    )
+    
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table, postgresql_concurrently=True)
+    
+    op.drop_index('ix_tombstones_user_resource_seq', 'tombstones')
+    op.drop_table('tombstones')
+    op.drop_column('journal_entries', 'change_seq')
+    op.drop_column('tasks', 'change_seq')
@@ -0,0 +1,80 @@
+"""Add materialized task priority scores
+
+Revision ID: 008_task_priority
+Revises: 007_change_sequences
+Create Date: 2024-01-08 00:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_task_priority'
+down_revision = '007_change_sequences'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # In the (priority_score DESC, id) order GET /tasks/next reads it
+    ('ix_tasks_user_priority', 'tasks', ['user_id', sa.text('priority_score DESC'), 'id']),
+    ('ix_tasks_due_date_id', 'tasks', ['due_date', 'id']),
+]
+BATCH_SIZE = 1000
+
+# compute_priority (app/services/priority_service.py) as of this revision, in SQL
+SLACK_HOURS = "EXTRACT(EPOCH FROM (due_date - now())) / 3600 - COALESCE(NULLIF(estimated_time, 0), 60) / 60.0"
+PRIORITY_SCORE = f"""
+    round(CAST(
+        100 * (
+            0.65 * CASE
+                WHEN due_date IS NULL THEN 0
+                WHEN {SLACK_HOURS} <= 0 THEN 1
+                ELSE 1 / (1 + ({SLACK_HOURS}) / 24)
+            END
+            + 0.35 * CASE source WHEN 'BRIGHTSPACE' THEN 1.0 WHEN 'CALENDAR' THEN 0.8 ELSE 0.6 END
+        )
+        + CASE WHEN status = 'IN_PROGRESS' THEN 5 ELSE 0 END
+    AS numeric), 3)
+"""
+# Closed tasks keep the -1 default
+OPEN_TASKS = "(status IS NULL OR status IN ('PENDING', 'IN_PROGRESS'))"
+
+
+def backfill_scores() -> None:
+    """Score existing open tasks so GET /tasks/next offers them right away, one transaction per batch"""
+    if context.is_offline_mode():
+        # No rows to page through in a script: score them in one statement
+        op.execute(f"UPDATE tasks SET priority_score = {PRIORITY_SCORE} WHERE {OPEN_TASKS}")
+        return
+    
+    # Only priority_score is written: updated_at and change sequences stay as they were
+    select_batch = sa.text(
+        f"SELECT id FROM tasks WHERE id > CAST(:last_id AS uuid) AND {OPEN_TASKS} ORDER BY id LIMIT :batch_size"
+    )
+    rescore = sa.text(f"UPDATE tasks SET priority_score = {PRIORITY_SCORE} WHERE id = ANY(CAST(:ids AS uuid[]))")
+    connection = op.get_bind()
+    last_id = "00000000-0000-0000-0000-000000000000"
+    while True:
+        ids = connection.execute(select_batch, {"last_id": last_id, "batch_size": BATCH_SIZE}).scalars().all()
+        if not ids:
+            break
+        connection.execute(rescore, {"ids": ids})
+        last_id = ids[-1]
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('priority_score', sa.Float(), nullable=False, server_default='-1'))
+    
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+        # In the autocommit block, so each batch commits on its own
+        backfill_scores()
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table, postgresql_concurrently=True)
+    
+    op.drop_column('tasks', 'priority_score')
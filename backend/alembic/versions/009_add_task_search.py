@@ -0,0 +1,35 @@
+"""Add full-text search over tasks
+
+Revision ID: 009_task_search
+Revises: 008_task_priority
+Create Date: 2024-01-09 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '009_task_search'
+down_revision = '008_task_priority'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # A stored generated column rewrites the table under an exclusive lock;
+    # schedule this migration for a quiet window on large databases
+    op.execute(f"ALTER TABLE tasks ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED")
+    
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY ix_tasks_search ON tasks USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY ix_tasks_search")
+    
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,37 @@
+"""Add journal import jobs
+
+Revision ID: 010_journal_imports
+Revises: 009_task_search
+Create Date: 2024-01-10 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '010_journal_imports'
+down_revision = '009_task_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'journal_imports',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('imported', sa.Integer(), nullable=False),
+        sa.Column('skipped', sa.Integer(), nullable=False),
+        sa.Column('labeled', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON()),
+        sa.Column('first_seq', sa.BigInteger()),
+        sa.Column('last_seq', sa.BigInteger()),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('journal_imports')
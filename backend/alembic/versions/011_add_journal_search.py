@@ -0,0 +1,39 @@
+"""Add full-text search over journal entries
+
+Revision ID: 011_journal_search
+Revises: 010_journal_imports
+Create Date: 2024-01-11 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011_journal_search'
+down_revision = '010_journal_imports'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = "setweight(to_tsvector('english', coalesce(content, '')), 'A')"
+
+
+def upgrade() -> None:
+    # btree_gin lets one GIN index cover (user_id, search_vector), so a search
+    # only visits the user's own matches
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # A stored generated column rewrites the table under an exclusive lock;
+    # schedule this migration for a quiet window on large databases
+    op.execute(
+        f"ALTER TABLE journal_entries ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+    )
+    
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY ix_journal_entries_search ON journal_entries USING gin (user_id, search_vector)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY ix_journal_entries_search")
+    
+    op.drop_column('journal_entries', 'search_vector')
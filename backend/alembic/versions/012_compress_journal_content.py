@@ -0,0 +1,59 @@
+"""Compress long journal entries with lz4
+
+Revision ID: 012_journal_compression
+Revises: 011_journal_search
+Create Date: 2024-01-12 00:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_journal_compression'
+down_revision = '011_journal_search'
+branch_labels = None
+depends_on = None
+
+# Rows longer than this have their long values compressed (the default is about 2 kB)
+TOAST_TUPLE_TARGET = 512
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    # Postgres compresses long text in TOAST and only decompresses it when the
+    # column is read; lz4 (Postgres 14+) is several times faster than the default pglz
+    op.execute("ALTER TABLE journal_entries ALTER COLUMN content SET COMPRESSION lz4")
+    op.execute(f"ALTER TABLE journal_entries SET (toast_tuple_target = {TOAST_TUPLE_TARGET})")
+    
+    if context.is_offline_mode():
+        # Recompressing existing rows needs a live connection; run the upgrade
+        # online (without --sql) to include it
+        return
+    
+    # Existing values keep their storage until written again. `content || ''`
+    # is a new value, stored under the settings above; the text doesn't change,
+    # so entries aren't stamped as changed for sync. One transaction per batch.
+    select_batch = sa.text(
+        "SELECT id FROM journal_entries "
+        "WHERE id > CAST(:last_id AS uuid) AND octet_length(content) >= :min_bytes "
+        "AND pg_column_compression(content) IS DISTINCT FROM 'lz4' "
+        "ORDER BY id LIMIT :batch_size"
+    )
+    rewrite = sa.text("UPDATE journal_entries SET content = content || '' WHERE id = ANY(CAST(:ids AS uuid[]))")
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        last_id = "00000000-0000-0000-0000-000000000000"
+        while True:
+            ids = connection.execute(
+                select_batch, {"last_id": last_id, "min_bytes": TOAST_TUPLE_TARGET, "batch_size": BATCH_SIZE}
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(rewrite, {"ids": ids})
+            last_id = ids[-1]
+
+
+def downgrade() -> None:
+    # Values already compressed with lz4 stay readable
+    op.execute("ALTER TABLE journal_entries RESET (toast_tuple_target)")
+    op.execute("ALTER TABLE journal_entries ALTER COLUMN content SET COMPRESSION default")
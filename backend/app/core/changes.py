@@ -0,0 +1,165 @@
+"""
+Per-user change sequences
+
+Each user has a counter per collection (tasks, journal, mood) in
+user_change_versions. Every flush that adds, modifies or deletes rows of a
+collection advances the counter by the number of rows, in the same transaction,
+and stamps each row with its own number: live rows in their change_seq column,
+deleted rows in a Tombstone. The counter doubles as the collection's version for
+ETags (etags.py), and delta sync reads everything stamped after a client's last
+position.
+
+The upsert that advances the counter locks the user's counter row until commit,
+so a user's writes commit in sequence order and a reader never sees number n+1
+before n. Bulk INSERT/UPDATE/DELETE statements bypass the flush hook below, so
+services that issue them stamp rows with numbers from allocate_change_seqs.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import base64
+import itertools
+import json
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.change_version import UserChangeVersion
+from ..models.tombstone import Tombstone
+
+# Table name -> collection name used in versions, tombstones and ETags
+TRACKED_TABLES = {
+    "tasks": "tasks",
+    "journal_entries": "journal",
+    "mood_profiles": "mood",
+}
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+ChangeKey = Tuple[int, uuid.UUID]
+
+
+async def get_change_version(db: AsyncSession, user_id: uuid.UUID, resource: str) -> int:
+    """Current version of a user's collection (0 if it was never written)"""
+    version = await db.scalar(
+        select(UserChangeVersion.version).where(
+            UserChangeVersion.user_id == user_id,
+            UserChangeVersion.resource == resource
+        )
+    )
+    return version or 0
+
+
+def allocate_statement(dialect_name: str, counts: Dict[Tuple[uuid.UUID, str], int]):
+    """One upsert advancing each (user_id, resource) counter by its count, returning the new values"""
+    insert = _INSERTS[dialect_name]
+    statement = insert(UserChangeVersion).values([
+        {"user_id": user_id, "resource": resource, "version": count}
+        for (user_id, resource), count in sorted(counts.items(), key=lambda item: (str(item[0][0]), item[0][1]))
+    ])
+    return statement.on_conflict_do_update(
+        index_elements=[UserChangeVersion.user_id, UserChangeVersion.resource],
+        set_={"version": UserChangeVersion.version + statement.excluded.version}
+    ).returning(UserChangeVersion.user_id, UserChangeVersion.resource, UserChangeVersion.version)
+
+
+async def allocate_change_seqs(db: AsyncSession, user_id: uuid.UUID, resource: str, count: int) -> List[int]:
+    """Reserve `count` consecutive change numbers for rows written with a bulk statement"""
+    if count == 0:
+        return []
+    connection = await db.connection()
+    result = await connection.execute(allocate_statement(connection.dialect.name, {(user_id, resource): count}))
+    last = result.one().version
+    return list(range(last - count + 1, last + 1))
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_changes(session, flush_context, instances):
+    groups = defaultdict(list)
+    modified = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in itertools.chain(session.new, modified, session.deleted):
+        resource = TRACKED_TABLES.get(getattr(obj, "__tablename__", None))
+        if resource is not None and obj.user_id is not None:
+            groups[(obj.user_id, resource)].append(obj)
+    if not groups:
+        return
+    
+    connection = session.connection()
+    result = connection.execute(
+        allocate_statement(connection.dialect.name, {key: len(objs) for key, objs in groups.items()})
+    )
+    last_seqs = {(row.user_id, row.resource): row.version for row in result}
+    for (user_id, resource), objs in groups.items():
+        seqs = range(last_seqs[(user_id, resource)] - len(objs) + 1, last_seqs[(user_id, resource)] + 1)
+        for obj, seq in zip(objs, seqs):
+            if not hasattr(obj, "change_seq"):
+                continue
+            if obj in session.deleted:
+                session.add(Tombstone(resource=resource, entity_id=obj.id, user_id=user_id, change_seq=seq))
+            else:
+                obj.change_seq = seq
+
+
+def encode_change_token(key: ChangeKey) -> str:
+    payload = json.dumps([key[0], key[1].hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_change_token(token: Optional[str]) -> Optional[ChangeKey]:
+    """Position encoded in a sync token; 400 if it wasn't produced by encode_change_token"""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        seq, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(seq), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+
+
+async def read_changes(
+    db: AsyncSession,
+    model,
+    user_id: uuid.UUID,
+    resource: str,
+    since: Optional[ChangeKey],
+    limit: int
+) -> dict:
+    """
+    Rows of `model` written and ids deleted after `since`, oldest change first.
+    
+    Returns at most `limit` changes with the position to resume from; `has_more`
+    says whether another call would return more. Rows written before change
+    tracking existed carry change_seq 0 and come back on a first sync only.
+    """
+    rows_query = select(model).where(model.user_id == user_id)
+    deleted_query = select(Tombstone.change_seq, Tombstone.entity_id).where(
+        Tombstone.user_id == user_id, Tombstone.resource == resource
+    )
+    if since is not None:
+        rows_query = rows_query.where(tuple_(model.change_seq, model.id) > since)
+        deleted_query = deleted_query.where(tuple_(Tombstone.change_seq, Tombstone.entity_id) > since)
+    
+    rows = await db.scalars(rows_query.order_by(model.change_seq, model.id).limit(limit + 1))
+    deleted = await db.execute(
+        deleted_query.order_by(Tombstone.change_seq, Tombstone.entity_id).limit(limit + 1)
+    )
+    changes = list(itertools.islice(
+        sorted(
+            itertools.chain(
+                ((row.change_seq, row.id, row) for row in rows),
+                ((seq, entity_id, None) for seq, entity_id in deleted)
+            ),
+            key=lambda change: (change[0], change[1])
+        ),
+        limit + 1
+    ))
+    page = changes[:limit]
+    return {
+        "changed": [row for _, _, row in page if row is not None],
+        "deleted": [entity_id for _, entity_id, row in page if row is None],
+        "next": (page[-1][0], page[-1][1]) if page else since or (0, uuid.UUID(int=0)),
+        "has_more": len(changes) > limit,
+    }
@@ -0,0 +1,123 @@
+"""
+Compressed text columns
+
+A CompressedText column stores values at least as long (in UTF-8 bytes) as its
+setting as a blob holding a one-byte codec marker and the compressed text: zstd
+when the zstandard package is installed, zlib otherwise. Shorter values stay plain text,
+and reads handle both, so the threshold can change (or be set to 0 to stop
+compressing) without rewriting anything.
+
+Only SQLite stores compressed values. Postgres already compresses long values
+in TOAST (lz4 for journal content since migration 012) and detoasts them only
+when they are read, and keeping the column text there lets its generated
+search_vector and ts_headline read it.
+
+A column declared with inflate=False returns values as stored, and
+compressed_text_attribute maps the text over it: ORM objects keep the stored
+value and decompress it only when the attribute is read (an entry loaded for
+its label or timestamp never is), while queries selecting the attribute get
+the text. SQL that needs the text (full-text triggers and snippets) calls
+inflate_text(column), registered on every SQLite connection.
+"""
+from typing import Optional, Union
+import zlib
+
+from sqlalchemy import Text, event, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.types import TypeDecorator
+
+from .config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZLIB = b"z"
+ZSTD = b"s"
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def compress_text(value: str) -> bytes:
+    """Codec marker followed by the compressed UTF-8 text"""
+    data = value.encode()
+    if zstandard is not None:
+        return ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return ZLIB + zlib.compress(data, ZLIB_LEVEL)
+
+
+def inflate_text(value: Union[str, bytes, None]) -> Optional[str]:
+    """Text of a stored value, compressed or not"""
+    if not isinstance(value, bytes):
+        return value
+    codec, data = value[:1], value[1:]
+    if codec == ZLIB:
+        return zlib.decompress(data).decode()
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Value was compressed with zstd; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data).decode()
+    raise ValueError(f"Unknown compression codec {codec!r}")
+
+
+class CompressedText(TypeDecorator):
+    """Text stored compressed on SQLite once at least as many bytes as the named setting (0 disables)"""
+    
+    impl = Text
+    cache_ok = True
+    
+    def __init__(self, min_bytes_setting: str, inflate: bool = True):
+        super().__init__()
+        self.min_bytes_setting = min_bytes_setting
+        self.inflate = inflate
+    
+    @property
+    def min_bytes(self) -> int:
+        # Read on every write, so the threshold can change without restarting
+        return getattr(settings, self.min_bytes_setting)
+    
+    def process_bind_param(self, value, dialect):
+        min_bytes = self.min_bytes
+        # A character is at most 4 UTF-8 bytes, so most short values are let through without encoding them
+        if min_bytes <= 0 or value is None or dialect.name != "sqlite" or len(value) * 4 < min_bytes:
+            return value
+        size = len(value.encode())
+        if size < min_bytes:
+            return value
+        compressed = compress_text(value)
+        # Text that doesn't compress (already compressed or random) is kept as written
+        return compressed if len(compressed) < size else value
+    
+    def process_result_value(self, value, dialect):
+        return inflate_text(value) if self.inflate else value
+
+
+def compressed_text_attribute(stored: str) -> hybrid_property:
+    """
+    Text of the CompressedText(inflate=False) column mapped as `stored`.
+    
+    Instances decompress on each read of the attribute and store assigned text
+    as given (compressed on flush); in queries it selects the text, labeled
+    with the column's name.
+    """
+    def get(self):
+        return inflate_text(getattr(self, stored))
+    
+    def set(self, value):
+        setattr(self, stored, value)
+    
+    def expression(cls):
+        column = getattr(cls, stored).expression
+        return type_coerce(column, CompressedText(column.type.min_bytes_setting)).label(column.name)
+    
+    return hybrid_property(get, set, expr=expression)
+
+
+@event.listens_for(Engine, "connect")
+def _register_inflate_text(dbapi_connection, connection_record):
+    # SQLite connections (sqlite3 or aiosqlite) only
+    create_function = getattr(dbapi_connection, "create_function", None)
+    if create_function is not None:
+        create_function("inflate_text", 1, inflate_text, deterministic=True)
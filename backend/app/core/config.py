@@ -5,15 +5,58 @@ from typing import Optional
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./test.db"
-    
+    # Derived from DATABASE_URL (asyncpg / aiosqlite) when not set
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool (sizing is ignored for SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # Postgres only; 0 disables
+    # Comma-separated read replicas for GET endpoints (same URL format as DATABASE_URL)
+    DATABASE_READ_URLS: str = ""
+    REPLICA_RETRY_SECONDS: float = 30.0  # how long a failed replica is skipped
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # users read from the primary this long after a write
+    # Fail requests that break their route's statement budget (default: DEBUG)
+    QUERY_BUDGET_ENFORCE: Optional[bool] = None
+    QUERY_REPEAT_LIMIT: int = 5  # same statement this often in one request counts as an N+1
+    SLOW_QUERY_MS: float = 250.0  # statements slower than this are logged; 0 disables
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 300.0  # re-capture a statement's plan at most this often
+    SLOW_QUERY_LOG_SIZE: int = 200  # entries kept for /admin/db/slow-queries
+
     # Security
     SECRET_KEY: str = "test-secret-key"
     ALGORITHM: str = "HS256"
+    # Comma-separated secrets for OAuth token encryption, newest first (default: SECRET_KEY)
+    ENCRYPTION_KEYS: str = ""
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # existing hashes are upgraded on the next login
+    PASSWORD_HASH_WORKERS: int = 2  # processes dedicated to bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 16  # in-flight hashes before logins get 503
+    # "database" loads the user per request; "claims" trusts id/timezone claims in the token
+    AUTH_MODE: str = "database"
+    # Cache of authenticated users by token subject; 0 disables
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
     
     # Application
     DEBUG: bool = False
     API_V1_PREFIX: str = "/api/v1"
+    ADMIN_TOKEN: Optional[str] = None  # enables /admin endpoints via X-Admin-Token
+    PRIORITY_REFRESH_SECONDS: float = 900.0  # re-score tasks nearing their deadline this often; 0 disables
+    PRIORITY_REFRESH_HORIZON_DAYS: float = 14.0  # tasks due further out are left to their next write
+    # Per-user cache of GET /tasks/stats, also dropped on any task write; 0 disables
+    TASK_STATS_CACHE_SIZE: int = 10000
+    TASK_STATS_CACHE_TTL_SECONDS: float = 60.0
+    JOURNAL_IMPORT_CHUNK_SIZE: int = 2000  # rows per INSERT/commit in POST /journal/import
+    JOURNAL_IMPORT_MAX_LINE_BYTES: int = 1048576  # longer lines (CSV records) are skipped
+    JOURNAL_COMPRESS_MIN_BYTES: int = 0  # SQLite: store journal content at least this long compressed; 0 disables
+    MOOD_LABEL_WORKERS: int = 2  # threads labeling new journal entries; 0 leaves them unlabeled
+    MOOD_LABEL_BATCH_SIZE: int = 100  # entries labeled per commit
+    MOOD_LABEL_BATCH_WAIT_SECONDS: float = 1.0  # a worker collects entries this long before labeling
+    MOOD_LABEL_MAX_PENDING: int = 10000  # entries queued beyond this stay unlabeled
+    MOOD_LABEL_DRAIN_SECONDS: float = 10.0  # shutdown waits this long for queued entries
     
     class Config:
         env_file = ".env"
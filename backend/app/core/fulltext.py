@@ -0,0 +1,311 @@
+"""
+Full-text search indexes
+
+Postgres: a generated `search_vector` tsvector column (title-like columns
+weighted above body columns) with a GIN index, ranked with ts_rank_cd.
+
+SQLite: an FTS5 table `<table>_fts` over the same columns plus user_id, using
+the base table as external content and kept in sync by insert/update/delete
+triggers. When a searched column is CompressedText and compression is on
+(its setting is above 0), the triggers index its inflated text and the
+external content is a `<table>_text` view of it; that layout calls
+inflate_text, so it is only created then, and rebuild_sqlite_search upgrades
+an index created while compression was off. Rows
+are linked by the base table's rowid, which VACUUM may renumber; run
+`INSERT INTO <table>_fts(<table>_fts) VALUES ('rebuild')` after a VACUUM.
+user_id is indexed as a token so a user's matches are found by intersecting
+posting lists instead of ranking everyone's matches. Matches are ranked by
+weighted term counts like ts_rank_cd rather than bm25, whose document
+frequencies are counted over every user's rows on each query (4x slower for a
+common word at 1M rows).
+
+Both are created with the table (create_all) and by migrations on Postgres.
+Queries match every term; a term ending in `*` matches as a prefix. Prefixes
+of common words are slow on SQLite, so they are only used when asked for.
+
+With `per_user=True` the Postgres GIN index covers (user_id, search_vector)
+through btree_gin, so the index scan itself returns only the user's matches
+instead of every user's matches filtered afterwards.
+
+SQLite search ranks only the SQLITE_RANK_WINDOW most recently written
+matches; ranked_search reports when older ones were left out, and the routes
+pass that on in the SEARCH_TRUNCATED_HEADER response header.
+
+Snippets mark matches with HIGHLIGHT_START/HIGHLIGHT_STOP in SQL;
+highlighted_html escapes the text and turns them into <mark> tags.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+import base64
+import html
+import json
+import re
+import uuid
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    DDL, Select, Table, column, event, exists, false, func, literal_column, select, table as sql_table, tuple_
+)
+from sqlalchemy.engine import Connection
+
+from .compression import CompressedText
+
+SEARCH_LANGUAGE = "english"
+SQLITE_TOKENIZER = "porter unicode61"
+MAX_TERMS = 8
+
+SearchKey = Tuple[float, uuid.UUID]
+
+# Table name -> (column, weight) pairs registered by attach_search_index
+SEARCH_COLUMNS: Dict[str, Sequence[Tuple[str, str]]] = {}
+# Rank contributed by each match in a column of this weight (SQLite)
+MATCH_WEIGHTS = {"A": 10, "B": 4, "C": 2, "D": 1}
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+SNIPPET_WORDS = 16
+SQLITE_RANK_WINDOW = 500
+SEARCH_TRUNCATED_HEADER = "X-Search-Truncated"
+_HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords={SNIPPET_WORDS}, "
+    f"MinWords={SNIPPET_WORDS // 2}, MaxFragments=2, FragmentDelimiter=\" … \""
+)
+
+
+def search_vector_sql(weighted_columns: Sequence[Tuple[str, str]]) -> str:
+    """tsvector expression over (column, weight) pairs"""
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce({name}, '')), '{weight}')"
+        for name, weight in weighted_columns
+    )
+
+
+def postgres_search_ddl(table_name: str, weighted_columns: Sequence[Tuple[str, str]], per_user: bool = False) -> List[str]:
+    indexed = "user_id, search_vector" if per_user else "search_vector"
+    return [
+        *(["CREATE EXTENSION IF NOT EXISTS btree_gin"] if per_user else []),
+        f"ALTER TABLE {table_name} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({search_vector_sql(weighted_columns)}) STORED",
+        f"CREATE INDEX ix_{table_name}_search ON {table_name} USING gin ({indexed})",
+    ]
+
+
+def sqlite_search_ddl(table_name: str, columns: Sequence[str], compressed: Sequence[str] = ()) -> List[str]:
+    fts = f"{table_name}_fts"
+    indexed = ["user_id", *columns]
+    names = ", ".join(indexed)
+    
+    def values(row: str) -> str:
+        return ", ".join(f"inflate_text({row}.{name})" if name in compressed else f"{row}.{name}" for name in indexed)
+    
+    insert_new = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {values('new')});"
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {values('old')});"
+    statements = []
+    content = f"content='{table_name}'"
+    if compressed:
+        # FTS5 reads column values for snippets, highlights and rebuilds from its
+        # content table, so it gets a view of the decompressed text instead
+        view_columns = ", ".join(f"inflate_text({name}) AS {name}" if name in compressed else name for name in indexed)
+        statements.append(
+            f"CREATE VIEW {table_name}_text AS SELECT rowid AS source_rowid, {view_columns} FROM {table_name}"
+        )
+        content = f"content='{table_name}_text', content_rowid='source_rowid'"
+    return statements + [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, {content}, tokenize='{SQLITE_TOKENIZER}')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table_name} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table_name} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table_name} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _compressed_columns(table: Table, columns: Sequence[str]) -> List[str]:
+    """Searched columns whose values may be stored compressed (compression is on)"""
+    return [
+        name for name in columns
+        if isinstance(table.c[name].type, CompressedText) and table.c[name].type.min_bytes > 0
+    ]
+
+
+def _sqlite_drop_ddl(table_name: str) -> List[str]:
+    # The triggers go with the table
+    return [f"DROP TABLE IF EXISTS {table_name}_fts", f"DROP VIEW IF EXISTS {table_name}_text"]
+
+
+def attach_search_index(table: Table, weighted_columns: Sequence[Tuple[str, str]], per_user: bool = False) -> None:
+    """Create the dialect's search index whenever `table` is created (and drop the FTS5 table with it)"""
+    SEARCH_COLUMNS[table.name] = weighted_columns
+    columns = [name for name, _ in weighted_columns]
+    for statement in postgres_search_ddl(table.name, weighted_columns, per_user):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    # Which layout is created depends on whether compression is on at the time
+    compressible = [name for name in columns if isinstance(table.c[name].type, CompressedText)]
+    layouts = {False: sqlite_search_ddl(table.name, columns)}
+    if compressible:
+        layouts[True] = sqlite_search_ddl(table.name, columns, compressible)
+    for compressing, statements in layouts.items():
+        def applies(*args, compressing=compressing, **kw) -> bool:
+            return bool(_compressed_columns(table, columns)) == compressing
+        for statement in statements:
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite", callable_=applies))
+    for statement in _sqlite_drop_ddl(table.name):
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def rebuild_sqlite_search(connection: Connection, table: Table) -> None:
+    """Recreate a table's FTS5 index in the current layout (e.g. after a column became compressed) and refill it"""
+    columns = [name for name, _ in SEARCH_COLUMNS[table.name]]
+    fts = f"{table.name}_fts"
+    for statement in [
+        *(f"DROP TRIGGER IF EXISTS {fts}_{suffix}" for suffix in ("ai", "ad", "au")),
+        *_sqlite_drop_ddl(table.name),
+        *sqlite_search_ddl(table.name, columns, _compressed_columns(table, columns)),
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]:
+        connection.exec_driver_sql(statement)
+
+
+def search_terms(q: str) -> List[str]:
+    """Words of a search query, keeping a trailing `*` on prefixes; 400 if it has none"""
+    terms = re.findall(r"\w+\*?", q.lower())[:MAX_TERMS]
+    if not terms:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Search query has no words")
+    return terms
+
+
+def _language():
+    return literal_column(f"'{SEARCH_LANGUAGE}'::regconfig")
+
+
+def _tsquery(terms: Sequence[str]):
+    tsquery = " & ".join(term[:-1] + ":*" if term.endswith("*") else term for term in terms)
+    return func.to_tsquery(_language(), tsquery)
+
+
+def _sqlite_match(table: Table, user_id: uuid.UUID, terms: Sequence[str]):
+    """MATCH of the user's token and every term in any searched column"""
+    phrases = " ".join(f'"{term[:-1]}"*' if term.endswith("*") else f'"{term}"' for term in terms)
+    columns = " ".join(name for name, _ in SEARCH_COLUMNS[table.name])
+    return literal_column(f"{table.name}_fts").op("MATCH")(f'user_id : "{user_id.hex}" AND {{{columns}}} : ({phrases})')
+
+
+def _sqlite_rank(table: Table):
+    """Weighted match count, negated so ascending order is best first"""
+    fts_name = f"{table.name}_fts"
+    # highlight() adds one marker character per match, so the length difference counts matches
+    matches = [
+        MATCH_WEIGHTS[weight] * func.coalesce(
+            func.length(func.highlight(literal_column(fts_name), position, func.char(1), ""))
+            - func.length(literal_column(f"{fts_name}.{name}")),
+            0
+        )
+        for position, (name, weight) in enumerate(SEARCH_COLUMNS[table.name], start=1)
+    ]
+    return -sum(matches[1:], matches[0])
+
+
+def search_clauses(dialect_name: str, table: Table, user_id: uuid.UUID, terms: Sequence[str]):
+    """
+    (FROM clause, WHERE clause, rank) selecting a user's rows of `table` matching every term.
+    
+    Sorting by rank ascending puts the best match first.
+    """
+    if dialect_name == "postgresql":
+        vector = literal_column(f"{table.name}.search_vector")
+        query = _tsquery(terms)
+        return table, (table.c.user_id == user_id) & vector.op("@@")(query), -func.ts_rank_cd(vector, query)
+    
+    fts = sql_table(f"{table.name}_fts", column("rowid"))
+    return (
+        fts.join(table, literal_column(f"{table.name}.rowid") == fts.c.rowid),
+        _sqlite_match(table, user_id, terms) & (table.c.user_id == user_id),
+        _sqlite_rank(table),
+    )
+
+
+def ranked_search(
+    dialect_name: str,
+    table: Table,
+    user_id: uuid.UUID,
+    terms: Sequence[str],
+    columns: Sequence,
+    snippet_column: str,
+    limit: int,
+    after: Optional[SearchKey] = None,
+    where: Sequence = ()
+) -> Select:
+    """
+    A page of a user's rows matching every term: `columns` plus `snippet`, `rank` and `truncated`, best match first.
+    
+    `where` adds conditions on `table`. Postgres ranks every match and builds
+    snippets for the page only. SQLite ranks the SQLITE_RANK_WINDOW most
+    recently written matches that meet `where`: ranking reads each match's
+    text, so beyond that a common word would take longer than the search is
+    worth. `truncated` is true on every row when older matches were left out.
+    """
+    key = table.c.id
+    if dialect_name == "postgresql":
+        from_clause, condition, rank = search_clauses(dialect_name, table, user_id, terms)
+        page = select(key.label("key"), rank.label("rank")).select_from(from_clause).where(condition, *where)
+        if after:
+            page = page.where(tuple_(rank, key) > after)
+        page = page.order_by(rank, key).limit(limit).subquery()
+        snippet = func.ts_headline(_language(), table.c[snippet_column], _tsquery(terms), _HEADLINE_OPTIONS)
+        return (
+            select(*columns, snippet.label("snippet"), page.c.rank, false().label("truncated"))
+            .select_from(page.join(table, key == page.c.key))
+            .order_by(page.c.rank, page.c.key)
+        )
+    
+    fts = sql_table(f"{table.name}_fts", column("rowid"))
+    names = ["user_id", *(name for name, _ in SEARCH_COLUMNS[table.name])]
+    snippet = func.snippet(
+        literal_column(fts.name), names.index(snippet_column), HIGHLIGHT_START, HIGHLIGHT_STOP, "…", SNIPPET_WORDS
+    )
+    # The window reads the FTS index alone, newest first, so it stops after
+    # SQLITE_RANK_WINDOW matches; joining the table here would sort every match
+    condition = _sqlite_match(table, user_id, terms)
+    if where:
+        base_rowid = literal_column(f"{table.name}.rowid")
+        condition = condition & fts.c.rowid.in_(
+            select(base_rowid).select_from(table).where(table.c.user_id == user_id, *where).correlate(None)
+        )
+    window = (
+        select(fts.c.rowid, snippet.label("snippet"), _sqlite_rank(table).label("rank"))
+        .where(condition)
+        .order_by(fts.c.rowid.desc())
+        .limit(SQLITE_RANK_WINDOW)
+        .subquery()
+    )
+    # Looking for a match past the window reads no text, so it is cheap
+    beyond_window = select(fts.c.rowid).where(condition).limit(1).offset(SQLITE_RANK_WINDOW).correlate(None)
+    query = (
+        select(*columns, window.c.snippet, window.c.rank, exists(beyond_window).label("truncated"))
+        .select_from(window.join(table, literal_column(f"{table.name}.rowid") == window.c.rowid))
+        # Second check besides the user_id token in MATCH; the window stays FTS-only
+        .where(table.c.user_id == user_id)
+    )
+    if after:
+        query = query.where(tuple_(window.c.rank, key) > after)
+    return query.order_by(window.c.rank, key).limit(limit)
+
+
+def highlighted_html(snippet: Optional[str]) -> str:
+    """A snippet as HTML: the text escaped and matches wrapped in <mark>"""
+    escaped = html.escape(snippet or "", quote=False)
+    return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+
+def encode_search_cursor(key: SearchKey) -> str:
+    payload = json.dumps([key[0], key[1].hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: Optional[str]) -> Optional[SearchKey]:
+    """Key encoded in a search cursor; 400 if it wasn't produced by encode_search_cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
@@ -0,0 +1,268 @@
+"""
+Prometheus metrics
+
+A small in-process registry rendered in the Prometheus text format at /metrics.
+MetricsMiddleware records request count, latency, response size and in-flight
+requests. Series are labelled with the route template (`/api/v1/tasks/{task_id}`),
+never the raw path, and unmatched paths share one label, so cardinality stays
+bounded by the number of routes.
+
+The request path only does a dict lookup, two bisects and a few additions.
+Pool gauges are read when /metrics is scraped.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import threading
+import time
+
+from .database import async_engine, engine
+from .pool_stats import describe_pool
+from .replicas import read_router
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+UNMATCHED_ROUTE = "<unmatched>"
+# Methods recorded as themselves; anything else a client sends is OTHER_METHOD
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+OTHER_METHOD = "other"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Sequence[str], labels: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+    
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge(Counter):
+    __slots__ = ()
+    
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+    
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    """A named metric and its labelled series"""
+    
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str] = (), buckets=None):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+        self.series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *labels: str):
+        """Series for these label values, created on first use"""
+        series = self.series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self.series.get(labels)
+                if series is None:
+                    if self.kind == "histogram":
+                        series = Histogram(self.buckets)
+                    elif self.kind == "gauge":
+                        series = Gauge()
+                    else:
+                        series = Counter()
+                    self.series[labels] = series
+        return series
+    
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, series in list(self.series.items()):
+            if self.kind != "histogram":
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(series.value)}"
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series.sum)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {series.count}"
+
+
+class Registry:
+    def __init__(self):
+        self.families: List[MetricFamily] = []
+        self.collectors: List[Callable[[], None]] = []
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._add(MetricFamily(name, help, "counter", labelnames))
+    
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        return self._add(MetricFamily(name, help, "gauge", labelnames))
+    
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> MetricFamily:
+        return self._add(MetricFamily(name, help, "histogram", labelnames, buckets))
+    
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Callback that refreshes gauges just before each scrape"""
+        self.collectors.append(collector)
+    
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for family in self.families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+    
+    def _add(self, family: MetricFamily) -> MetricFamily:
+        self.families.append(family)
+        return family
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+)
+http_response_size = registry.histogram(
+    "http_response_size_bytes", "HTTP response body size", ("method", "route"), buckets=SIZE_BUCKETS
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+).labels()
+mood_analyzer_duration = registry.histogram(
+    "mood_analyzer_duration_seconds", "Time spent in mood analyzers", ("analyzer",)
+)
+mood_label_backlog = registry.gauge(
+    "mood_label_backlog", "Journal entries queued or being labeled with a mood"
+).labels()
+mood_labels = registry.counter(
+    "mood_labels_total", "Journal entries handled by the mood labeling queue", ("outcome",)
+)
+brightspace_request_duration = registry.histogram(
+    "brightspace_request_duration_seconds", "Outbound Brightspace API calls", ("call", "outcome")
+)
+
+db_pool_connections = registry.gauge(
+    "db_pool_connections", "Pooled connections by state", ("engine", "state")
+)
+db_pool_checkouts = registry.counter(
+    "db_pool_checkouts_total", "Connection checkouts", ("engine",)
+)
+db_pool_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for a connection", ("engine",)
+)
+
+
+def collect_pool_metrics() -> None:
+    pools = [("sync", engine.pool), ("async", async_engine.sync_engine.pool)]
+    pools += [(f"replica{n}", replica.sync_engine.pool) for n, replica in enumerate(read_router.engines)]
+    for name, pool in pools:
+        info = describe_pool(pool)
+        for state in ("checked_out", "idle", "overflow_in_use"):
+            if state in info:
+                db_pool_connections.labels(name, state).set(info[state])
+        if "checkout_wait" in info:
+            db_pool_checkouts.labels(name).value = info["checkout_wait"]["checkouts"]
+            db_pool_checkout_timeouts.labels(name).value = info["checkout_wait"]["timeouts"]
+
+
+registry.add_collector(collect_pool_metrics)
+
+
+@contextmanager
+def timed(family: MetricFamily, *labels: str):
+    """Observe the duration of the block; an `outcome` label is appended when the family has one"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        if "outcome" in family.labelnames:
+            labels = labels + (outcome,)
+        family.labels(*labels).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """Records per-route request metrics"""
+    
+    def __init__(self, app):
+        self.app = app
+        self._route_series: Dict[Tuple[str, str], Tuple[Histogram, Histogram]] = {}
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+        
+        async def send_with_metrics(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+        
+        http_requests_in_flight.value += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            http_requests_in_flight.value -= 1
+            self.record(scope, status_code, time.perf_counter() - start, size)
+    
+    def record(self, scope, status_code: int, duration: float, size: int) -> None:
+        route = scope.get("route")
+        method = scope["method"] if scope["method"] in HTTP_METHODS else OTHER_METHOD
+        key = (method, getattr(route, "path", UNMATCHED_ROUTE))
+        series = self._route_series.get(key)
+        if series is None:
+            series = self._route_series[key] = (
+                http_request_duration.labels(*key),
+                http_response_size.labels(*key),
+            )
+        series[0].observe(duration)
+        series[1].observe(size)
+        http_requests.labels(key[0], key[1], str(status_code)).inc()
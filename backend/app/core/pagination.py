@@ -0,0 +1,50 @@
+"""
+Keyset (cursor) pagination
+
+Listings are ordered by (created_at, id) and a page continues strictly after
+the last row of the previous one, so deep pages cost the same as the first and
+concurrent writes can't shift rows between pages. The cursor is that last
+row's key, base64-encoded so clients treat it as opaque. It is returned in the
+X-Next-Cursor header (the body stays a plain list) and omitted on the last page.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import base64
+import json
+import uuid
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+
+
+def utcnow() -> datetime:
+    """Column default for ordering keys: microsecond precision keeps cursor ties rare"""
+    return datetime.now(timezone.utc)
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id.hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, uuid.UUID]]:
+    """Key encoded in a cursor; 400 if it wasn't produced by encode_cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(response: Response, rows: List, limit: int) -> List:
+    """Trim the look-ahead row fetched past `limit` and advertise the next page"""
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
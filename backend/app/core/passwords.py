@@ -0,0 +1,119 @@
+"""
+Password hashing off the request path
+
+bcrypt is deliberately slow (~250 ms of CPU at cost 12), so hashing and
+verification run in a small dedicated process pool. A login storm then can't
+hold the GIL or tie up the threadpool that serves ordinary requests, and once
+PASSWORD_HASH_MAX_PENDING operations are in flight further logins are turned
+away with a 503 instead of queueing behind each other.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+import asyncio
+import multiprocessing
+import os
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from .config import settings
+
+_contexts: Dict[int, CryptContext] = {}
+
+
+def build_crypt_context(rounds: int) -> CryptContext:
+    """bcrypt context that treats hashes at any other cost as needing a rehash"""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def _get_context(rounds: int) -> CryptContext:
+    # Built once per worker process
+    if rounds not in _contexts:
+        _contexts[rounds] = build_crypt_context(rounds)
+    return _contexts[rounds]
+
+
+def _init_worker() -> None:
+    # Request handling wins the CPU when bcrypt and the API share cores
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _get_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _get_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt work"""
+    
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and DB threads isn't safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+    
+    def ensure_capacity(self) -> None:
+        """Raise 503 if the pool is already full (lets callers reject before other work)"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+    
+    async def _run(self, fn, *args):
+        self.ensure_capacity()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured bcrypt cost"""
+        return await self._run(_hash, password, self.rounds)
+    
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password.
+        
+        Returns (valid, new_hash) where new_hash is set when the stored hash was
+        made at a different cost and should be replaced.
+        """
+        return await self._run(_verify_and_update, password, hashed_password, self.rounds)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.BCRYPT_ROUNDS,
+)
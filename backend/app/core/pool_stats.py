@@ -0,0 +1,116 @@
+"""
+Connection pool instrumentation
+
+TimedQueuePool / TimedAsyncAdaptedQueuePool behave exactly like SQLAlchemy's
+pools but record how long each checkout took (queueing for a free connection,
+opening a new one and the pre-ping), so the pool can be sized from real numbers.
+"""
+from collections import deque
+from typing import Any, Dict, Optional
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolStats:
+    """Checkout wait-time statistics for one pool"""
+    
+    def __init__(self, sample_size: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=sample_size)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, wait: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+    
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus p50/p99 over the most recent checkouts, in milliseconds"""
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+        
+        def percentile(fraction: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(len(recent) * fraction))] * 1000
+        
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "avg_ms": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+            "p50_ms": round(percentile(0.50), 3),
+            "p99_ms": round(percentile(0.99), 3),
+            "max_ms": round(max_wait * 1000, 3),
+        }
+
+
+class _TimedPoolMixin:
+    stats: PoolStats
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+    
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep the history
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def timed_pool_class(pool_class: type) -> Optional[type]:
+    """Timed replacement for a dialect's default pool class, if there is one"""
+    if issubclass(pool_class, AsyncAdaptedQueuePool):
+        return TimedAsyncAdaptedQueuePool
+    if issubclass(pool_class, QueuePool):
+        return TimedQueuePool
+    return None
+
+
+def describe_pool(pool: Pool) -> Dict[str, Any]:
+    """Current occupancy and checkout wait statistics for a pool"""
+    info: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        info.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow_in_use=max(0, pool.overflow()),
+            max_overflow=pool._max_overflow,
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        info["checkout_wait"] = stats.snapshot()
+    return info
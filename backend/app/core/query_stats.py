@@ -0,0 +1,162 @@
+"""
+Per-request SQL accounting
+
+QueryStatsMiddleware opens a RequestQueryStats for every HTTP request and engine
+events add each statement and its duration to it. The totals are sent back in
+a Server-Timing header. Routes declare how many statements they may run with
+`dependencies=[Depends(query_budget(n))]`, and any request that runs the same
+parameterized statement QUERY_REPEAT_LIMIT times is treated as an N+1. Routes
+that write an upload in chunks, repeating the same statements per chunk, declare
+`Depends(chunked_writes())` instead.
+
+When QUERY_BUDGET_ENFORCE is on (it defaults to DEBUG, and the test suite sets
+it) the statement that breaks the budget raises QueryBudgetExceeded before it
+executes. Otherwise the violation is logged once per request.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["RequestQueryStats"]] = ContextVar("request_query_stats", default=None)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more SQL than its route allows"""
+
+
+def budget_enforced() -> bool:
+    if settings.QUERY_BUDGET_ENFORCE is None:
+        return settings.DEBUG
+    return settings.QUERY_BUDGET_ENFORCE
+
+
+class RequestQueryStats:
+    """Statements and database time for one request"""
+    
+    __slots__ = (
+        "scope", "path", "statements", "duration", "budget", "repeats", "chunked", "violation", "closed"
+    )
+    
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope or {}
+        self.path = self.scope.get("path", "")
+        self.statements = 0
+        self.duration = 0.0
+        self.budget: Optional[int] = None
+        self.repeats: Counter = Counter()
+        self.chunked = False
+        self.violation: Optional[str] = None
+        self.closed = False
+    
+    def record_statement(self, statement: str) -> None:
+        """Count a statement about to run and check it against the limits"""
+        self.statements += 1
+        self.repeats[statement] += 1
+        if self.violation is not None:
+            return
+        
+        if self.budget is not None and self.statements > self.budget:
+            self.violation = f"{self.path} ran {self.statements} SQL statements, budget is {self.budget}"
+        elif not self.chunked and self.repeats[statement] >= settings.QUERY_REPEAT_LIMIT:
+            self.violation = (
+                f"{self.path} ran the same statement {self.repeats[statement]} times "
+                f"(N+1?): {statement[:200]}"
+            )
+        else:
+            return
+        
+        if budget_enforced():
+            raise QueryBudgetExceeded(self.violation)
+        logger.warning(self.violation)
+    
+    @property
+    def route(self) -> str:
+        """Matched route template (e.g. /api/v1/tasks/{task_id}), else the raw path"""
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.path
+    
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.statements} queries"'
+
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    """Stats for the request being handled, if any"""
+    return _current_stats.get()
+
+
+def query_budget(max_statements: int):
+    """Route dependency declaring how many SQL statements a request may run"""
+    async def set_query_budget():
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = max_statements
+    return set_query_budget
+
+
+def chunked_writes():
+    """Route dependency for uploads written in chunks: repeated statements are expected, so only counted"""
+    async def allow_repeats():
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.chunked = True
+    return allow_repeats
+
+
+class QueryStatsMiddleware:
+    """Collects per-request SQL stats and reports them in Server-Timing"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestQueryStats(scope)
+        token = _current_stats.set(stats)
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            elif message["type"] == "http.response.body" and not message.get("more_body"):
+                # Background tasks run after this point and aren't the route's cost
+                stats.closed = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None or stats.closed:
+        return
+    stats.record_statement(statement)
+    # On the execution context rather than the connection: a statement that
+    # fails never reaches after_cursor_execute, and its start time goes with it
+    if context is not None:
+        context.query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None or stats.closed:
+        return
+    start_time = getattr(context, "query_start_time", None)
+    if start_time is not None:
+        stats.duration += time.perf_counter() - start_time
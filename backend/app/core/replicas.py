@@ -0,0 +1,137 @@
+"""
+Read-replica routing
+
+GET endpoints depend on get_read_db, which round-robins across the engines in
+DATABASE_READ_URLS. A replica that fails to hand out a connection is skipped for
+REPLICA_RETRY_SECONDS, and when none is usable reads fall back to the primary.
+
+Replicas lag, so a user who committed a write within READ_YOUR_WRITES_SECONDS
+reads from the primary, as does any request sent with
+`X-Read-Consistency: primary`. The write log is per process; clients behind a
+multi-worker deployment that must see their own writes should send the header.
+"""
+from typing import Dict, List, Optional, Union
+import itertools
+import threading
+import time
+import uuid
+
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import get_async_database_url, get_async_db, get_engine_options
+from .security import Principal, get_current_user
+from ..models.user import User
+
+CONSISTENCY_HEADER = "X-Read-Consistency"
+
+
+class ReadReplicaRouter:
+    """Round-robin over replica engines, skipping ones that recently failed"""
+    
+    def __init__(self, urls: List[str], retry_after: float = 30.0):
+        self.urls = [get_async_database_url(url) for url in urls]
+        self.engines = [create_async_engine(url, **get_engine_options(url)) for url in self.urls]
+        self.session_makers = [
+            async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self.retry_after = retry_after
+        self._down_until = [0.0] * len(self.engines)
+        self._turn = itertools.count()
+    
+    async def open_session(self) -> Optional[AsyncSession]:
+        """A session on the next healthy replica, or None if none is available"""
+        for _ in range(len(self.engines)):
+            index = next(self._turn) % len(self.engines)
+            if self._down_until[index] > time.monotonic():
+                continue
+            session = self.session_makers[index]()
+            try:
+                await session.connection()
+                return session
+            except (DBAPIError, OSError):
+                await session.close()
+                self._down_until[index] = time.monotonic() + self.retry_after
+        return None
+    
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+
+read_router = ReadReplicaRouter(
+    [url.strip() for url in settings.DATABASE_READ_URLS.split(",") if url.strip()],
+    retry_after=settings.REPLICA_RETRY_SECONDS,
+)
+
+_recent_writes: Dict[uuid.UUID, float] = {}
+_recent_writes_lock = threading.Lock()
+
+
+def note_write(user_id: uuid.UUID) -> None:
+    """Record that a user just committed a write"""
+    now = time.monotonic()
+    with _recent_writes_lock:
+        _recent_writes[user_id] = now
+        if len(_recent_writes) > 10000:
+            cutoff = now - settings.READ_YOUR_WRITES_SECONDS
+            for key in [key for key, at in _recent_writes.items() if at < cutoff]:
+                del _recent_writes[key]
+
+
+def wrote_recently(user_id: uuid.UUID) -> bool:
+    wrote_at = _recent_writes.get(user_id)
+    return wrote_at is not None and time.monotonic() - wrote_at < settings.READ_YOUR_WRITES_SECONDS
+
+
+async def get_read_db(
+    request: Request,
+    current_user: Union[User, Principal] = Depends(get_current_user),
+    primary: AsyncSession = Depends(get_async_db)
+):
+    """Dependency for read-only endpoints: a replica session when it is safe to use one"""
+    replica = None
+    if (
+        read_router.engines
+        and request.headers.get(CONSISTENCY_HEADER, "").lower() != "primary"
+        and not wrote_recently(current_user.id)
+    ):
+        replica = await read_router.open_session()
+    
+    if replica is None:
+        yield primary
+        return
+    try:
+        yield replica
+    finally:
+        await replica.close()
+
+
+def mark_written(session: Union[Session, AsyncSession], user_id: uuid.UUID) -> None:
+    """Record a write made with a bulk statement, which the flush hooks below don't see"""
+    session.info.setdefault("written_users", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(session, flush_context):
+    written = session.info.setdefault("written_users", set())
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        user_id = obj.id if isinstance(obj, User) else getattr(obj, "user_id", None)
+        if user_id is not None:
+            written.add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_writes(session):
+    for user_id in session.info.pop("written_users", ()):
+        note_write(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_writes(session, previous_transaction):
+    session.info.pop("written_users", None)
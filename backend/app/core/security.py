@@ -1,17 +1,33 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+import json
+import secrets
+import uuid
+import zlib
+from .cache import TTLCache
 from .config import settings
+from .passwords import build_crypt_context
 from ..models.user import User
-from ..core.database import get_db
+from ..core.database import get_async_db
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_crypt_context(settings.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
+# Authenticated users keyed by token subject, so hot users skip the users lookup
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+# Current settings version by user id, checked against claims-mode tokens
+settings_version_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -23,9 +39,62 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token"""
+class Principal:
+    """Authenticated identity rebuilt from token claims (AUTH_MODE=claims)"""
+    
+    __slots__ = ("id", "timezone", "settings_version")
+    
+    def __init__(self, id: uuid.UUID, timezone: str, settings_version: str):
+        self.id = id
+        self.timezone = timezone
+        self.settings_version = settings_version
+    
+    def __repr__(self) -> str:
+        return f"Principal(id={self.id!r}, timezone={self.timezone!r})"
+
+
+def get_settings_version(user: User) -> str:
+    """Short fingerprint of a user's timezone, preferences and consents (anything with those attributes)"""
+    blob = json.dumps(
+        {"timezone": user.timezone or "UTC", "preferences": user.preferences or {}, "consents": user.consents or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return format(zlib.crc32(blob.encode()), "08x")
+
+
+def get_principal_claims(user: User) -> dict:
+    """Claims that let routes authenticate the user without a database lookup"""
+    return {
+        "tz": user.timezone or "UTC",
+        "sv": get_settings_version(user),
+    }
+
+
+async def current_settings_version(user_id: uuid.UUID, db: AsyncSession) -> Optional[str]:
+    """A user's settings version, cached like principals; None if the user no longer exists"""
+    key = str(user_id)
+    version = settings_version_cache.get(key)
+    if version is None:
+        row = (await db.execute(
+            select(User.timezone, User.preferences, User.consents).where(User.id == user_id)
+        )).first()
+        if row is None:
+            return None
+        version = get_settings_version(row)
+        settings_version_cache.set(key, version)
+    return version
+
+
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    user: Optional[User] = None
+) -> str:
+    """Create a JWT access token (embedding principal claims in claims mode)"""
     to_encode = data.copy()
+    if user is not None and settings.AUTH_MODE == "claims":
+        to_encode.update(get_principal_claims(user))
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -35,11 +104,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user from JWT token"""
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[User, Principal]:
+    """
+    Get the current authenticated user from JWT token.
+    
+    In claims mode this is a Principal built from the token's claims; routes
+    that need the full row depend on get_current_user_record instead. The
+    token's settings version is checked against the user's current one (cached,
+    so hot users skip the lookup) and a token issued before a settings change,
+    e.g. to the timezone, is rejected so the client logs in again.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -50,12 +127,88 @@ def get_current_user(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        user_uuid = uuid.UUID(user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == user_id).first()
+    # Tokens issued before claims mode was enabled fall through to the lookup
+    if settings.AUTH_MODE == "claims" and "tz" in payload and "sv" in payload:
+        if payload["sv"] != await current_settings_version(user_uuid, db):
+            raise credentials_exception
+        return Principal(user_uuid, payload["tz"], payload["sv"])
+    
+    cached_user = principal_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+    
+    user = await db.get(User, user_uuid)
     if user is None:
         raise credentials_exception
+    principal_cache.set(user_id, _detached_copy(user))
+    return user
+
+
+async def get_current_user_record(
+    current_user: Union[User, Principal] = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Get the full User row for the authenticated user"""
+    return await load_user_record(current_user, db)
+
+
+async def load_user_record(current_user: Union[User, Principal], db: AsyncSession) -> User:
+    """Full User row for an authenticated user or principal, loaded through `db`"""
+    if isinstance(current_user, User):
+        return current_user
+    
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
+def _detached_copy(user: User) -> User:
+    """Column-only snapshot of a user that can be shared across sessions"""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_principal(mapper, connection, target):
+    """Drop the cached principal now and again once the change is committed"""
+    user_id = str(target.id)
+    principal_cache.invalidate(user_id)
+    settings_version_cache.invalidate(user_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_principals", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session):
+    # A request may have re-cached the old row between our flush and commit
+    for user_id in session.info.pop("changed_principals", ()):
+        principal_cache.invalidate(user_id)
+        settings_version_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_principals(session, previous_transaction):
+    session.info.pop("changed_principals", None)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Guard for operational endpoints; disabled unless ADMIN_TOKEN is configured"""
+    if not settings.ADMIN_TOKEN or not x_admin_token or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
@@ -0,0 +1,155 @@
+"""
+Slow-query log
+
+Statements slower than SLOW_QUERY_MS, on any engine, are logged with their
+normalized SQL, the shape of their bind parameters (types only, never values)
+and the route that ran them. The latest entries are kept in memory for
+GET /admin/db/slow-queries.
+
+Each normalized statement also gets an EXPLAIN (EXPLAIN QUERY PLAN on SQLite),
+captured on the same connection right after it runs. That happens at most once
+per statement every SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS, and later entries reuse
+the stored plan, so a hot slow query doesn't double its own cost.
+"""
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .query_stats import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_REPEATED_VALUES = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and placeholder lists so variants of a query group together"""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    return _REPEATED_VALUES.sub("(...)", statement)
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Types of the bind parameters, without their values"""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+class SlowQueryLog:
+    """Recent slow statements plus the last captured plan for each"""
+    
+    def __init__(self, maxlen: int):
+        self.entries: Deque[dict] = deque(maxlen=maxlen)
+        self.plans: Dict[str, Tuple[float, Optional[List[str]]]] = {}
+        self._lock = threading.Lock()
+    
+    def plan_is_due(self, normalized: str) -> bool:
+        captured = self.plans.get(normalized)
+        if captured is None:
+            return True
+        return time.monotonic() - captured[0] >= settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+    
+    def add(self, entry: dict, plan: Optional[List[str]] = None, explained: bool = False) -> None:
+        with self._lock:
+            if explained:
+                self.plans[entry["sql"]] = (time.monotonic(), plan)
+            captured = self.plans.get(entry["sql"])
+            entry["plan"] = captured[1] if captured else None
+            self.entries.append(entry)
+    
+    def recent(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            return list(self.entries)[-limit:][::-1]
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.plans.clear()
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE)
+
+
+def explain(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+    """Plan for a statement that just ran on `conn`, or None if it can't be explained"""
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    words = statement.lstrip().split(None, 1)
+    if prefix is None or not words or words[0].upper() not in EXPLAINABLE:
+        return None
+    
+    # Straight through the DBAPI cursor so the EXPLAIN isn't itself counted or timed
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except Exception as e:
+        logger.debug("Could not EXPLAIN slow query: %s", e)
+        return None
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    # Per execution, like query_stats: a failed statement takes its start time with it
+    if settings.SLOW_QUERY_MS > 0 and context is not None:
+        context.slow_query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+    start_time = getattr(context, "slow_query_start_time", None)
+    if settings.SLOW_QUERY_MS <= 0 or start_time is None:
+        return
+    duration_ms = (time.perf_counter() - start_time) * 1000
+    if duration_ms < settings.SLOW_QUERY_MS:
+        return
+    
+    normalized = normalize_sql(statement)
+    stats = current_query_stats()
+    entry = {
+        "sql": normalized,
+        "duration_ms": round(duration_ms, 2),
+        "parameters": parameter_shape(parameters, executemany),
+        "route": stats.route if stats is not None else None,
+        "database": conn.dialect.name,
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+    
+    explained = not executemany and slow_query_log.plan_is_due(normalized)
+    plan = explain(conn, statement, parameters) if explained else None
+    slow_query_log.add(entry, plan, explained)
+    logger.warning(
+        "Slow query (%.1f ms) on %s: %s params=%s",
+        duration_ms, entry["route"] or "-", normalized, entry["parameters"]
+    )
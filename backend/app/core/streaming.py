@@ -0,0 +1,148 @@
+"""
+Sparse fieldsets and NDJSON streaming for listings
+
+`?fields=id,title` selects only those columns (plus the cursor key) and
+serializes plain rows, skipping ORM loading and response-model validation.
+With `Accept: application/x-ndjson` a listing is sent as one JSON object per
+line from a server-side cursor, fetched in batches of STREAM_BATCH_SIZE, so
+memory stays flat however many rows match and the first chunk goes out as soon
+as the first batch arrives.
+
+Exports (export_response) stream the same way as NDJSON or CSV, optionally
+gzipped chunk by chunk, as a file download.
+
+The row generator runs on the request's session after the endpoint returns;
+FastAPI (0.104) closes yield dependencies only once the response has been sent.
+"""
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Type
+import csv
+import enum
+import io
+import json
+import zlib
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+GZIP_MEDIA_TYPE = "application/gzip"
+EXPORT_MEDIA_TYPES = {"ndjson": NDJSON_MEDIA_TYPE, "csv": CSV_MEDIA_TYPE}
+STREAM_BATCH_SIZE = 500
+STREAM_CHUNK_BYTES = 16384  # lines are buffered into chunks of about this size
+# Always selected so a page can produce its X-Next-Cursor
+CURSOR_COLUMNS = ("created_at", "id")
+
+_encoder = TypeAdapter(Any)
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Requested field names in order, or None for the full representation; 400 on unknown names"""
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested"
+        )
+    return names
+
+
+def query_columns(fields: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys([*fields, *CURSOR_COLUMNS]))
+
+
+def project(row: Any, fields: Sequence[str]) -> Dict[str, Any]:
+    mapping = row._mapping
+    return {name: mapping[name] for name in fields}
+
+
+def json_rows_response(response: Response, rows: Iterable, fields: Sequence[str]) -> Response:
+    """A JSON list of projected rows, keeping headers already set on `response`"""
+    body = _encoder.dump_json([project(row, fields) for row in rows])
+    return Response(content=body, media_type="application/json", headers=dict(response.headers))
+
+
+async def _chunked(rows: AsyncIterator, fields: Sequence[str], encode: Callable[[Dict[str, Any]], bytes]):
+    """Encoded rows buffered into chunks of about STREAM_CHUNK_BYTES"""
+    chunk = bytearray()
+    async for row in rows:
+        chunk += encode(project(row, fields))
+        if len(chunk) >= STREAM_CHUNK_BYTES:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+def ndjson_lines(rows: AsyncIterator, fields: Sequence[str]) -> AsyncIterator[bytes]:
+    return _chunked(rows, fields, lambda values: _encoder.dump_json(values) + b"\n")
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def csv_lines(rows: AsyncIterator, fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """A header row naming `fields`, then one CSV row per row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def encode(values: Dict[str, Any]) -> bytes:
+        writer.writerow([_csv_cell(value) for value in values.values()])
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line.encode()
+    
+    async def lines():
+        writer.writerow(fields)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        async for chunk in _chunked(rows, fields, encode):
+            yield chunk
+    return lines()
+
+
+async def gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream, flushing after every chunk so the download never stalls"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def ndjson_response(response: Response, rows: AsyncIterator, fields: Sequence[str]) -> StreamingResponse:
+    """Stream projected rows as NDJSON, keeping headers already set on `response`"""
+    return StreamingResponse(ndjson_lines(rows, fields), media_type=NDJSON_MEDIA_TYPE, headers=dict(response.headers))
+
+
+def export_response(
+    rows: AsyncIterator, fields: Sequence[str], export_format: str, compress: bool, name: str
+) -> StreamingResponse:
+    """Stream rows as an NDJSON or CSV file download, gzipped if `compress`"""
+    body = csv_lines(rows, fields) if export_format == "csv" else ndjson_lines(rows, fields)
+    filename = f"{name}.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if compress:
+        body, filename, media_type = gzipped(body), f"{filename}.gz", GZIP_MEDIA_TYPE
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,14 +1,44 @@
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
-from .routes import auth, task, journal, sync, mood
+from .core.database import async_engine
+from .core.metrics import MetricsMiddleware, registry
+from .core.passwords import password_hasher
+from .core.query_stats import QueryStatsMiddleware
+from .core.replicas import read_router
+from .core import slow_queries  # noqa: F401  (registers the slow-query engine hooks)
+from .routes import auth, task, journal, sync, mood, admin
+from .services.journal_compression_service import prepare_journal_compression
+from .services.mood_label_queue import mood_label_queue
+from .services.priority_service import refresh_periodically
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before any compressed entry is written, so the full-text index can read it
+    await asyncio.to_thread(prepare_journal_compression)
+    refresher = None
+    if settings.PRIORITY_REFRESH_SECONDS > 0:
+        refresher = asyncio.create_task(refresh_periodically(settings.PRIORITY_REFRESH_SECONDS))
+    yield
+    if refresher is not None:
+        refresher.cancel()
+    await asyncio.to_thread(mood_label_queue.drain, settings.MOOD_LABEL_DRAIN_SECONDS)
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    await read_router.dispose()
+
 
 app = FastAPI(
     title="Friday API",
     description="Personal Assistant App API",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -18,7 +48,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
@@ -26,6 +59,7 @@ app.include_router(task.router, prefix=settings.API_V1_PREFIX)
 app.include_router(journal.router, prefix=settings.API_V1_PREFIX)
 app.include_router(sync.router, prefix=settings.API_V1_PREFIX)
 app.include_router(mood.router, prefix=settings.API_V1_PREFIX)
+app.include_router(admin.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -37,3 +71,8 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,8 +1,11 @@
 from .user import User
 from .task import Task
 from .journal import JournalEntry
+from .journal_import import JournalImport
 from .oauth_token import OAuthToken, OAuthProvider
 from .mood import MoodProfile
+from .change_version import UserChangeVersion
+from .tombstone import Tombstone
 
-__all__ = ["User", "Task", "JournalEntry", "OAuthToken", "OAuthProvider", "MoodProfile"]
+__all__ = ["User", "Task", "JournalEntry", "JournalImport", "OAuthToken", "OAuthProvider", "MoodProfile", "UserChangeVersion", "Tombstone"]
 
@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, String, Uuid
+from ..core.database import Base
+
+
+class UserChangeVersion(Base):
+    """Counter bumped by every committed write to one of a user's collections"""
+    __tablename__ = "user_change_versions"
+    
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    resource = Column(String, primary_key=True)  # 'tasks', 'journal', 'mood'
+    version = Column(BigInteger, nullable=False, default=0)
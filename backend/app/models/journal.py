@@ -1,20 +1,35 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, String, DateTime, ForeignKey, Index, Uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
+from ..core.compression import CompressedText, compressed_text_attribute
 from ..core.database import Base
+from ..core.fulltext import attach_search_index
+from ..core.pagination import utcnow
 
 
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
+    __table_args__ = (
+        # Keyset pagination order (newest first) for a user's journal
+        Index("ix_journal_entries_user_created_id", "user_id", "created_at", "id"),
+        # Delta sync: a user's entries in change order
+        Index("ix_journal_entries_user_change_seq", "user_id", "change_seq", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    content = Column(Text, nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    # Long entries are stored compressed on SQLite and decompressed when `content`
+    # is read (see core/compression.py)
+    stored_content = Column("content", CompressedText("JOURNAL_COMPRESS_MIN_BYTES", inflate=False), nullable=False)
+    content = compressed_text_attribute("stored_content")
     mood_label = Column(String)  # To be filled by mood analyzer in Phase 3
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    # Position in the user's change sequence, stamped on every write (see core/changes.py)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
     
     user = relationship("User", backref="journal_entries")
 
 
+# Per-user GIN index: journals are large and searched one user at a time
+attach_search_index(JournalEntry.__table__, [("content", "A")], per_user=True)
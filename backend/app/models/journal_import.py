@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, JSON, String, Uuid
+import uuid
+from ..core.database import Base
+from ..core.pagination import utcnow
+
+
+class JournalImport(Base):
+    """Progress of one POST /journal/import and of the mood labeling that follows it"""
+    __tablename__ = "journal_imports"
+    
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    status = Column(String, nullable=False, default="importing")  # 'importing', 'labeling', 'done', 'failed'
+    imported = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    labeled = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, default=list)  # the first few skipped rows, "line N: reason"
+    # Change sequence range of the imported rows, walked by the labeler
+    first_seq = Column(BigInteger)
+    last_seq = Column(BigInteger)
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+    finished_at = Column(DateTime(timezone=True))
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index, JSON, Uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -8,9 +7,12 @@ from ..core.database import Base
 
 class MoodProfile(Base):
     __tablename__ = "mood_profiles"
+    __table_args__ = (
+        Index("ix_mood_profiles_user_created", "user_id", "created_at"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Valence: -1 (negative) to 1 (positive)
     valence = Column(Float, nullable=False)
@@ -21,8 +23,8 @@ class MoodProfile(Base):
     source = Column(String)  # 'text', 'behavioral', 'fused'
     confidence = Column(Float)  # 0 to 1
     
-    # Additional metadata
-    metadata = Column(JSON)  # Store emotion labels, features, etc.
+    # Additional metadata ("metadata" is reserved on declarative classes)
+    metadata_ = Column("metadata", JSON)  # Store emotion labels, features, etc.
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -1,5 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Index, Uuid
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -14,9 +13,12 @@ class OAuthProvider(str, enum.Enum):
 
 class OAuthToken(Base):
     __tablename__ = "oauth_tokens"
+    __table_args__ = (
+        Index("ix_oauth_tokens_user_provider", "user_id", "provider", unique=True),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     provider = Column(String, nullable=False)  # OAuthProvider enum value
     access_token = Column(Text, nullable=False)  # Encrypted
     refresh_token = Column(Text)  # Encrypted, optional
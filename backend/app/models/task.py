@@ -1,10 +1,11 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, String, DateTime, Float, Integer, ForeignKey, Enum as SQLEnum, Index, Uuid
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 import enum
 from ..core.database import Base
+from ..core.fulltext import attach_search_index
+from ..core.pagination import utcnow
 
 
 class TaskStatus(str, enum.Enum):
@@ -22,18 +23,40 @@ class TaskSource(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination order for a user's task list
+        Index("ix_tasks_user_created_id", "user_id", "created_at", "id"),
+        # Status-filtered listing and completion counts
+        Index("ix_tasks_user_status_created", "user_id", "status", "created_at", "id"),
+        # Deadline/overdue counts and open task load (covers estimated_time)
+        Index("ix_tasks_user_status_due", "user_id", "status", "due_date", "estimated_time"),
+        # Brightspace de-duplication by title
+        Index("ix_tasks_user_source_title", "user_id", "source", "title"),
+        # Delta sync: a user's tasks in change order
+        Index("ix_tasks_user_change_seq", "user_id", "change_seq", "id"),
+        # Top-K by priority for GET /tasks/next, in its (priority_score DESC, id) order
+        Index("ix_tasks_user_priority", "user_id", text("priority_score DESC"), "id"),
+        # Periodic priority refresh walks tasks by deadline
+        Index("ix_tasks_due_date_id", "due_date", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String, nullable=False)
     description = Column(String)
     due_date = Column(DateTime(timezone=True))
     estimated_time = Column(Integer)  # in minutes
     source = Column(SQLEnum(TaskSource), default=TaskSource.MANUAL)
     status = Column(SQLEnum(TaskStatus), default=TaskStatus.PENDING)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Position in the user's change sequence, stamped on every write (see core/changes.py)
+    change_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # Materialized priority (see services/priority_service.py); -1 for closed tasks
+    priority_score = Column(Float, nullable=False, default=-1.0, server_default="-1")
     
     user = relationship("User", backref="tasks")
 
 
+# GET /tasks/search: Postgres tsvector column or SQLite FTS5 table (see core/fulltext.py)
+attach_search_index(Task.__table__, [("title", "A"), ("description", "B")])
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String, Uuid
+from ..core.database import Base
+from ..core.pagination import utcnow
+
+
+class Tombstone(Base):
+    """Record of a deleted row, so delta sync can tell clients to drop it"""
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        # Delta sync reads a user's deletions in change order
+        Index("ix_tombstones_user_resource_seq", "user_id", "resource", "change_seq", "entity_id"),
+    )
+    
+    resource = Column(String, primary_key=True)  # 'tasks', 'journal'
+    entity_id = Column(Uuid(as_uuid=True), primary_key=True)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=utcnow)
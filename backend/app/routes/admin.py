@@ -0,0 +1,72 @@
+"""
+Operational endpoints (connection pool and cache statistics, key rotation, priority refresh, journal compression)
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, status
+
+from ..core.config import settings
+from ..core.database import engine, async_engine
+from ..core.pool_stats import describe_pool
+from ..core.replicas import read_router
+from ..core.security import principal_cache, require_admin
+from ..core.slow_queries import slow_query_log
+from ..services.encryption_service import reencrypt_oauth_tokens
+from ..services.journal_compression_service import compress_journal_entries
+from ..services.priority_service import refresh_priority_scores
+from ..services.task_stats_service import stats_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/db/pool")
+def get_pool_stats():
+    """Checked-out/idle connections, overflow in use and checkout wait times"""
+    return {
+        "sync": describe_pool(engine.pool),
+        "async": describe_pool(async_engine.sync_engine.pool),
+        "replicas": [describe_pool(replica.sync_engine.pool) for replica in read_router.engines],
+    }
+
+
+@router.get("/db/slow-queries")
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """Most recent slow statements with their parameter shapes, route and plan"""
+    return slow_query_log.recent(limit)
+
+
+@router.get("/cache/principals")
+def get_principal_cache_stats():
+    """Hit/miss counters for the authenticated-user cache"""
+    return principal_cache.stats()
+
+
+@router.get("/cache/task-stats")
+def get_task_stats_cache_stats():
+    """Hit/miss counters for the GET /tasks/stats cache"""
+    return stats_cache.stats()
+
+
+@router.post("/encryption/reencrypt", status_code=status.HTTP_202_ACCEPTED)
+def start_token_reencryption(background_tasks: BackgroundTasks, chunk_size: int = 500):
+    """Re-encrypt stored OAuth tokens under the newest key, in the background"""
+    background_tasks.add_task(reencrypt_oauth_tokens, chunk_size=chunk_size)
+    return {"message": "OAuth token re-encryption started"}
+
+
+@router.post("/journal/compress", status_code=status.HTTP_202_ACCEPTED)
+def start_journal_compression(background_tasks: BackgroundTasks, chunk_size: int = 500):
+    """Compress long journal entries stored before JOURNAL_COMPRESS_MIN_BYTES was set (SQLite), in the background"""
+    background_tasks.add_task(compress_journal_entries, chunk_size=chunk_size)
+    return {"message": "Journal compression started"}
+
+
+@router.post("/tasks/refresh-priorities", status_code=status.HTTP_202_ACCEPTED)
+def start_priority_refresh(
+    background_tasks: BackgroundTasks,
+    all_tasks: bool = Query(
+        False, alias="all", description="Re-score every open task, not just those due soon (needed once after migrating)"
+    )
+):
+    """Re-score open tasks' priority in the background"""
+    horizon_days = None if all_tasks else settings.PRIORITY_REFRESH_HORIZON_DAYS
+    background_tasks.add_task(refresh_priority_scores, horizon_days=horizon_days)
+    return {"message": "Task priority refresh started"}
@@ -1,13 +1,12 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..core.database import get_db
-from ..core.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    get_current_user,
-)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.database import get_async_db
+from ..core.passwords import password_hasher
+from ..core.replicas import get_read_db
+from ..core.query_stats import query_budget
+from ..core.security import create_access_token, get_current_user, load_user_record
 from ..core.config import settings
 from ..models.user import User
 from ..schemas.auth import LoginRequest, RegisterRequest, Token
@@ -16,11 +15,15 @@ from ..schemas.user import UserResponse
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
+@router.post(
+    "/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(3))]
+)
+async def register(user_data: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
+    password_hasher.ensure_capacity()
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -28,7 +31,7 @@ def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         email=user_data.email,
         hashed_password=hashed_password,
@@ -37,32 +40,44 @@ def register(user_data: RegisterRequest, db: Session = Depends(get_db)):
         consents={}
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
-@router.post("/login", response_model=Token)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(query_budget(2))])
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Login and get JWT token"""
-    user = db.query(User).filter(User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    password_hasher.ensure_capacity()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await password_hasher.verify(credentials.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Stored hash predates the current BCRYPT_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": str(user.id)}, expires_delta=access_token_expires, user=user
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 
-@router.get("/me", response_model=UserResponse)
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+@router.get("/me", response_model=UserResponse, dependencies=[Depends(query_budget(2))])
+async def get_current_user_profile(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get current authenticated user's profile"""
-    return current_user
+    return await load_user_record(current_user, db)
 
 
@@ -1,46 +1,208 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from ..core.database import get_db
+import uuid
+from ..core.changes import decode_change_token, encode_change_token
+from ..core.database import get_async_db
+from ..core.etags import conditional_get
+from ..core.fulltext import (
+    SEARCH_TRUNCATED_HEADER, decode_search_cursor, encode_search_cursor, highlighted_html, search_terms
+)
+from ..core.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, paginate
+from ..core.replicas import get_read_db
+from ..core.config import settings
+from ..core.query_stats import chunked_writes, query_budget
 from ..core.security import get_current_user
+from ..core.streaming import (
+    CSV_MEDIA_TYPE, GZIP_MEDIA_TYPE, NDJSON_MEDIA_TYPE, STREAM_BATCH_SIZE, export_response, json_rows_response,
+    ndjson_response, parse_fields, query_columns, wants_ndjson
+)
 from ..models.user import User
-from ..schemas.journal import JournalEntryCreate, JournalEntryResponse
-from ..services import journal_service
+from ..schemas.journal import (
+    JournalChanges, JournalEntryCreate, JournalEntryResponse, JournalImportResponse, JournalSearchResult
+)
+from ..services import async_journal_service as journal_service
+from ..services import journal_import_service
 
 router = APIRouter(prefix="/journal", tags=["journal"])
 
 
-@router.post("", response_model=JournalEntryResponse, status_code=status.HTTP_201_CREATED)
-def create_journal_entry(
+@router.post(
+    "", response_model=JournalEntryResponse, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(4))]
+)
+async def create_journal_entry(
     entry_data: JournalEntryCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Submit a new journal entry"""
-    entry = journal_service.create_journal_entry(db, entry_data, current_user.id)
+    entry = await journal_service.create_journal_entry(db, entry_data, current_user.id)
     return entry
 
 
-@router.get("", response_model=List[JournalEntryResponse])
-def get_journal_entries(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+@router.post(
+    "/import", response_model=JournalImportResponse, status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(chunked_writes())],
+    openapi_extra={"requestBody": {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}}}}
+)
+async def import_journal_entries(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import journal entries from an NDJSON or CSV body, read as it streams in.
+    
+    Each row has `content` and optionally `created_at` (kept as given) and
+    `mood_label`. The response comes once every row is parsed and written, so
+    a large upload holds the request for as long as that takes. Only missing
+    mood labels are filled in afterwards, in the background; poll
+    GET /journal/import/{job_id} for their progress.
+    """
+    parse = journal_import_service.import_parser(request.headers.get("content-type"))
+    rows = parse(request.stream(), settings.JOURNAL_IMPORT_MAX_LINE_BYTES)
+    job = await journal_import_service.import_journal_entries(db, current_user.id, rows)
+    if job.status == "labeling":
+        background_tasks.add_task(journal_import_service.label_imported_entries, job.id)
+    return job
+
+
+@router.get(
+    "/import/{job_id}", response_model=JournalImportResponse,
+    dependencies=[Depends(query_budget(2))]
+)
+async def get_journal_import(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Progress of a journal import and its mood labeling"""
+    job = await journal_import_service.get_import(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import not found"
+        )
+    return job
+
+
+@router.get(
+    "", response_model=List[JournalEntryResponse],
+    dependencies=[Depends(query_budget(3)), Depends(conditional_get("journal"))],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
+async def get_journal_entries(
+    request: Request,
+    response: Response,
+    after: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated: use `after`"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Page size (default 100); NDJSON streams every entry unless set"
+    ),
     since: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,created_at"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get journal entry history, newest first, one page at a time or streamed as NDJSON"""
+    selected = parse_fields(fields, JournalEntryResponse)
+    if wants_ndjson(request):
+        selected = selected or list(JournalEntryResponse.model_fields)
+        rows = journal_service.stream_user_journal_entries(
+            db, current_user.id, selected, skip=skip, limit=limit, since=since,
+            before=decode_cursor(after), batch_size=STREAM_BATCH_SIZE
+        )
+        return ndjson_response(response, rows, selected)
+    
+    limit = limit or DEFAULT_PAGE_SIZE
+    entries = await journal_service.get_user_journal_entries(
+        db, current_user.id, skip=skip, limit=limit + 1, since=since,
+        before=decode_cursor(after), columns=query_columns(selected) if selected else None
+    )
+    entries = paginate(response, entries, limit)
+    return json_rows_response(response, entries, selected) if selected else entries
+
+
+@router.get(
+    "/search", response_model=List[JournalSearchResult],
+    dependencies=[Depends(query_budget(3)), Depends(conditional_get("journal"))]
+)
+async def search_journal_entries(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in entries"),
+    since: Optional[datetime] = Query(None, description="Only entries written at or after this time"),
+    after: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get journal entry history for the current user"""
-    entries = journal_service.get_user_journal_entries(
-        db, current_user.id, skip=skip, limit=limit, since=since
+    """
+    Entries containing every word of `q`, best match first, with a highlighted snippet instead of the content.
+    
+    X-Search-Truncated: true means only the most recently written matches were
+    searched (SQLite); add words to the query to reach older ones.
+    """
+    rows = await journal_service.search_journal_entries(
+        db, current_user.id, search_terms(q), since=since, limit=limit + 1, after=decode_search_cursor(after)
     )
-    return entries
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_search_cursor((rows[-1].rank, rows[-1].id))
+    if rows and rows[0].truncated:
+        # SQLite only ranks the most recent matches; older ones are left out of every page
+        response.headers[SEARCH_TRUNCATED_HEADER] = "true"
+    return [
+        {
+            "id": row.id, "created_at": row.created_at, "mood_label": row.mood_label,
+            "snippet": highlighted_html(row.snippet),
+        }
+        for row in rows
+    ]
+
+
+@router.get(
+    "/export", dependencies=[Depends(query_budget(2))],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}, GZIP_MEDIA_TYPE: {}}}}
+)
+async def export_journal_entries(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False, description="Compress the download (.gz)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download every journal entry, newest first, as NDJSON or CSV streamed from a server-side cursor"""
+    selected = parse_fields(fields, JournalEntryResponse) or list(JournalEntryResponse.model_fields)
+    rows = journal_service.stream_user_journal_entries(db, current_user.id, selected, batch_size=STREAM_BATCH_SIZE)
+    return export_response(rows, selected, export_format, gzip, "journal")
+
+
+@router.get(
+    "/changes", response_model=JournalChanges,
+    dependencies=[Depends(query_budget(4)), Depends(conditional_get("journal"))]
+)
+async def get_journal_changes(
+    since: Optional[str] = Query(None, description="next_token from the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Journal entries created, updated or deleted since a sync token, oldest change first"""
+    changes = await journal_service.get_journal_changes(db, current_user.id, decode_change_token(since), limit)
+    changes["next_token"] = encode_change_token(changes.pop("next"))
+    return changes
 
 
-@router.get("/{entry_id}", response_model=JournalEntryResponse)
-def get_journal_entry(
+@router.get(
+    "/{entry_id}", response_model=JournalEntryResponse,
+    dependencies=[Depends(query_budget(2))]
+)
+async def get_journal_entry(
     entry_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific journal entry by ID"""
@@ -53,7 +215,7 @@ def get_journal_entry(
             detail="Invalid entry ID format"
         )
     
-    entry = journal_service.get_journal_entry_by_id(db, entry_uuid, current_user.id)
+    entry = await journal_service.get_journal_entry_by_id(db, entry_uuid, current_user.id)
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
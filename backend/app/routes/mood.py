@@ -2,11 +2,17 @@
 Mood analysis routes
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timedelta
 
 from ..core.database import get_db
+from ..core.etags import conditional_get
+from ..core.metrics import mood_analyzer_duration, timed
+from ..core.replicas import get_read_db
+from ..core.query_stats import query_budget
 from ..core.security import get_current_user
 from ..models.user import User
 from ..models.mood import MoodProfile
@@ -27,14 +33,18 @@ behavioral_predictor = BehavioralMoodPredictor()
 mood_fusion = MoodFusion()
 
 
-@router.post("/analyze-text", response_model=MoodProfileResponse)
+@router.post(
+    "/analyze-text", response_model=MoodProfileResponse,
+    dependencies=[Depends(query_budget(4))]
+)
 def analyze_text_mood(
     request: MoodAnalysisRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Analyze mood from text"""
-    result = text_analyzer.analyze(request.text)
+    with timed(mood_analyzer_duration, "text"):
+        result = text_analyzer.analyze(request.text)
     
     # Store mood profile
     mood_profile = MoodProfile(
@@ -43,7 +53,7 @@ def analyze_text_mood(
         arousal=result['arousal'],
         source='text',
         confidence=result['confidence'],
-        metadata={
+        metadata_={
             'emotions': result.get('emotions', []),
             'text_length': len(request.text)
         }
@@ -55,14 +65,18 @@ def analyze_text_mood(
     return mood_profile
 
 
-@router.post("/predict-behavioral", response_model=MoodProfileResponse)
+@router.post(
+    "/predict-behavioral", response_model=MoodProfileResponse,
+    dependencies=[Depends(query_budget(10))]
+)
 def predict_behavioral_mood(
     days_back: int = 7,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Predict mood from behavioral patterns"""
-    result = behavioral_predictor.predict(db, current_user.id, days_back)
+    with timed(mood_analyzer_duration, "behavioral"):
+        result = behavioral_predictor.predict(db, current_user.id, days_back)
     
     # Store mood profile
     mood_profile = MoodProfile(
@@ -71,7 +85,7 @@ def predict_behavioral_mood(
         arousal=result['arousal'],
         source='behavioral',
         confidence=result['confidence'],
-        metadata=result.get('features', {})
+        metadata_=result.get('features', {})
     )
     db.add(mood_profile)
     db.commit()
@@ -80,7 +94,10 @@ def predict_behavioral_mood(
     return mood_profile
 
 
-@router.get("/current", response_model=MoodProfileResponse)
+@router.get(
+    "/current", response_model=MoodProfileResponse,
+    dependencies=[Depends(query_budget(12))]
+)
 def get_current_mood(
     use_text: bool = True,
     use_behavioral: bool = True,
@@ -97,25 +114,19 @@ def get_current_mood(
             JournalEntry.user_id == current_user.id
         ).order_by(JournalEntry.created_at.desc()).first()
         
+        # Its mood_label is written by the labeling queue, not here
         if latest_journal:
-            text_mood = text_analyzer.analyze(latest_journal.content)
-            # Update journal entry with mood label
-            if not latest_journal.mood_label:
-                # Determine emotion label from valence/arousal
-                if text_mood['valence'] > 0.5:
-                    latest_journal.mood_label = 'positive'
-                elif text_mood['valence'] < -0.5:
-                    latest_journal.mood_label = 'negative'
-                else:
-                    latest_journal.mood_label = 'neutral'
-                db.commit()
+            with timed(mood_analyzer_duration, "text"):
+                text_mood = text_analyzer.analyze(latest_journal.content)
     
     # Get behavioral prediction
     if use_behavioral:
-        behavioral_mood = behavioral_predictor.predict(db, current_user.id)
+        with timed(mood_analyzer_duration, "behavioral"):
+            behavioral_mood = behavioral_predictor.predict(db, current_user.id)
     
     # Fuse moods
-    fused = mood_fusion.fuse(text_mood, behavioral_mood)
+    with timed(mood_analyzer_duration, "fusion"):
+        fused = mood_fusion.fuse(text_mood, behavioral_mood)
     
     # Store fused mood profile
     mood_profile = MoodProfile(
@@ -124,7 +135,7 @@ def get_current_mood(
         arousal=fused['arousal'],
         source='fused',
         confidence=fused['confidence'],
-        metadata={
+        metadata_={
             'source_breakdown': fused.get('source'),
             'components': fused.get('components', {})
         }
@@ -136,19 +147,23 @@ def get_current_mood(
     return mood_profile
 
 
-@router.get("/history")
-def get_mood_history(
+@router.get(
+    "/history", response_model=List[MoodProfileResponse],
+    dependencies=[Depends(query_budget(3)), Depends(conditional_get("mood"))]
+)
+async def get_mood_history(
     days: int = 30,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get mood history"""
     cutoff = datetime.utcnow() - timedelta(days=days)
     
-    profiles = db.query(MoodProfile).filter(
-        MoodProfile.user_id == current_user.id,
-        MoodProfile.created_at >= cutoff
-    ).order_by(MoodProfile.created_at.desc()).all()
-    
-    return profiles
+    profiles = await db.scalars(
+        select(MoodProfile).where(
+            MoodProfile.user_id == current_user.id,
+            MoodProfile.created_at >= cutoff
+        ).order_by(MoodProfile.created_at.desc())
+    )
+    return profiles.all()
 
@@ -7,6 +7,8 @@ from typing import List
 from datetime import datetime
 
 from ..core.database import get_db
+from ..core.metrics import brightspace_request_duration, timed
+from ..core.query_stats import query_budget
 from ..core.security import get_current_user
 from ..models.user import User
 from ..models.oauth_token import OAuthToken, OAuthProvider
@@ -24,7 +26,7 @@ from ..services.encryption_service import encrypt_token, decrypt_token
 router = APIRouter(prefix="/sync", tags=["sync"])
 
 
-@router.post("/brightspace/authorize")
+@router.post("/brightspace/authorize", dependencies=[Depends(query_budget(3))])
 def authorize_brightspace(
     app_id: str,
     app_key: str,
@@ -63,7 +65,10 @@ def authorize_brightspace(
     return {"message": "Brightspace credentials stored successfully"}
 
 
-@router.post("/brightspace/sync", response_model=List[TaskResponse])
+@router.post(
+    "/brightspace/sync", response_model=List[TaskResponse],
+    dependencies=[Depends(query_budget(6))]
+)
 def sync_brightspace_tasks(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -96,8 +101,9 @@ def sync_brightspace_tasks(
     
     # Fetch courses and assignments
     try:
-        courses = client.get_courses()
-        created_tasks = []
+        with timed(brightspace_request_duration, "courses"):
+            courses = client.get_courses()
+        fetched_tasks = []
         
         for course in courses:
             org_unit_id = course.get('OrgUnit', {}).get('Id')
@@ -107,30 +113,29 @@ def sync_brightspace_tasks(
                 continue
             
             try:
-                assignments = client.get_assignments(str(org_unit_id))
-                
+                with timed(brightspace_request_duration, "assignments"):
+                    assignments = client.get_assignments(str(org_unit_id))
                 for assignment in assignments:
-                    # Convert to task
-                    task_data = client.assignment_to_task(assignment, course_name)
-                    
-                    # Check if task already exists (by title and source)
-                    existing = db.query(Task).filter(
-                        Task.user_id == current_user.id,
-                        Task.title == task_data['title'],
-                        Task.source == TaskSource.BRIGHTSPACE
-                    ).first()
-                    
-                    if not existing:
-                        # Create new task
-                        task_create = TaskCreate(**task_data)
-                        task = task_service.create_task(db, task_create, current_user.id)
-                        created_tasks.append(task)
+                    fetched_tasks.append(client.assignment_to_task(assignment, course_name))
             except Exception as e:
                 # Log error but continue with other courses
                 print(f"Error syncing course {course_name}: {str(e)}")
                 continue
         
-        return created_tasks
+        # Skip tasks that already exist (by title and source), with one lookup
+        existing_titles = {
+            title for (title,) in db.query(Task.title).filter(
+                Task.user_id == current_user.id,
+                Task.source == TaskSource.BRIGHTSPACE
+            )
+        }
+        new_tasks = []
+        for task_data in fetched_tasks:
+            if task_data['title'] not in existing_titles:
+                existing_titles.add(task_data['title'])
+                new_tasks.append(TaskCreate(**task_data))
+        
+        return task_service.create_tasks(db, new_tasks, current_user.id)
         
     except Exception as e:
         raise HTTPException(
@@ -139,7 +144,7 @@ def sync_brightspace_tasks(
         )
 
 
-@router.post("/calendar/authorize")
+@router.post("/calendar/authorize", dependencies=[Depends(query_budget(1))])
 def authorize_google_calendar(
     code: str,
     redirect_uri: str,
@@ -158,7 +163,10 @@ def authorize_google_calendar(
     )
 
 
-@router.post("/calendar/sync", response_model=List[TaskResponse])
+@router.post(
+    "/calendar/sync", response_model=List[TaskResponse],
+    dependencies=[Depends(query_budget(2))]
+)
 def sync_calendar_events(
     calendar_id: str = "primary",
     days_ahead: int = 30,
@@ -1,49 +1,215 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from ..core.database import get_db
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.changes import decode_change_token, encode_change_token
+from ..core.database import get_async_db
+from ..core.etags import conditional_get, entity_etag, if_match_versions
+from ..core.fulltext import decode_search_cursor, encode_search_cursor, search_terms
+from ..core.pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, paginate
+from ..core.replicas import get_read_db
+from ..core.query_stats import query_budget
 from ..core.security import get_current_user
+from ..core.streaming import (
+    CSV_MEDIA_TYPE, GZIP_MEDIA_TYPE, NDJSON_MEDIA_TYPE, STREAM_BATCH_SIZE, export_response, json_rows_response,
+    ndjson_response, parse_fields, query_columns, wants_ndjson
+)
 from ..models.user import User
 from ..models.task import TaskStatus
-from ..schemas.task import TaskCreate, TaskUpdate, TaskResponse
-from ..services import task_service
+from ..schemas.task import (
+    TaskBatchCreate, TaskBatchDelete, TaskBatchResult, TaskBatchStatusUpdate, TaskChanges,
+    TaskCreate, TaskPriority, TaskStats, TaskUpdate, TaskResponse
+)
+from ..services import async_task_service as task_service
+from ..services import priority_service, task_stats_service
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.get("", response_model=List[TaskResponse])
-def get_tasks(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
+@router.get(
+    "", response_model=List[TaskResponse],
+    dependencies=[Depends(query_budget(3)), Depends(conditional_get("tasks"))],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
+async def get_tasks(
+    request: Request,
+    response: Response,
+    after: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated: use `after`"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=1000, description="Page size (default 100); NDJSON streams every task unless set"
+    ),
     task_status: Optional[TaskStatus] = Query(None, alias="status"),
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,due_date"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all tasks for the current user"""
-    tasks = task_service.get_user_tasks(
-        db, current_user.id, skip=skip, limit=limit, status=task_status
+    """Get the current user's tasks in creation order, one page at a time or streamed as NDJSON"""
+    selected = parse_fields(fields, TaskResponse)
+    if wants_ndjson(request):
+        selected = selected or list(TaskResponse.model_fields)
+        rows = task_service.stream_user_tasks(
+            db, current_user.id, selected, skip=skip, limit=limit, status=task_status,
+            after=decode_cursor(after), batch_size=STREAM_BATCH_SIZE
+        )
+        return ndjson_response(response, rows, selected)
+    
+    limit = limit or DEFAULT_PAGE_SIZE
+    tasks = await task_service.get_user_tasks(
+        db, current_user.id, skip=skip, limit=limit + 1, status=task_status,
+        after=decode_cursor(after), columns=query_columns(selected) if selected else None
+    )
+    tasks = paginate(response, tasks, limit)
+    return json_rows_response(response, tasks, selected) if selected else tasks
+
+
+@router.get(
+    "/export", dependencies=[Depends(query_budget(2))],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}, CSV_MEDIA_TYPE: {}, GZIP_MEDIA_TYPE: {}}}}
+)
+async def export_tasks(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False, description="Compress the download (.gz)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download every task, in creation order, as NDJSON or CSV streamed from a server-side cursor"""
+    selected = parse_fields(fields, TaskResponse) or list(TaskResponse.model_fields)
+    rows = task_service.stream_user_tasks(db, current_user.id, selected, batch_size=STREAM_BATCH_SIZE)
+    return export_response(rows, selected, export_format, gzip, "tasks")
+
+
+@router.get(
+    "/changes", response_model=TaskChanges,
+    dependencies=[Depends(query_budget(4)), Depends(conditional_get("tasks"))]
+)
+async def get_task_changes(
+    since: Optional[str] = Query(None, description="next_token from the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tasks created, updated or deleted since a sync token, oldest change first"""
+    changes = await task_service.get_task_changes(db, current_user.id, decode_change_token(since), limit)
+    changes["next_token"] = encode_change_token(changes.pop("next"))
+    return changes
+
+
+@router.get("/stats", response_model=TaskStats, dependencies=[Depends(query_budget(3))])
+async def get_task_stats(
+    days: int = Query(7, ge=1, le=31, description="Upcoming days to report, starting today"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Task counts by status and source, overdue count and estimated minutes due per upcoming day"""
+    return await task_stats_service.get_task_stats(db, current_user.id, current_user.timezone, days)
+
+
+@router.get(
+    "/search", response_model=List[TaskResponse],
+    dependencies=[Depends(query_budget(3)), Depends(conditional_get("tasks"))]
+)
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in title or description"),
+    after: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Tasks containing every word of `q` (words ending in `*` as prefixes), best match first"""
+    rows = await task_service.search_user_tasks(
+        db, current_user.id, search_terms(q), limit=limit + 1, after=decode_search_cursor(after)
     )
-    return tasks
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_search_cursor((rows[-1].rank, rows[-1].Task.id))
+    return [row.Task for row in rows]
+
+
+@router.get("/next", response_model=List[TaskPriority], dependencies=[Depends(query_budget(3))])
+async def get_next_tasks(
+    k: int = Query(5, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The open tasks to work on next, by priority adjusted for the current mood"""
+    ranked = await priority_service.get_next_tasks(db, current_user.id, k)
+    return [
+        {**TaskResponse.model_validate(item["task"]).model_dump(), "priority_score": item["priority_score"],
+         "score": item["score"]}
+        for item in ranked
+    ]
 
 
-@router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+@router.post(
+    "", response_model=TaskResponse, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(4))]
+)
+async def create_task(
     task_data: TaskCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new task"""
-    task = task_service.create_task(db, task_data, current_user.id)
+    task = await task_service.create_task(db, task_data, current_user.id)
     return task
 
 
-@router.get("/{task_id}", response_model=TaskResponse)
-def get_task(
+# Batch routes are declared before /{task_id} so "batch" isn't parsed as an id
+@router.post(
+    "/batch", response_model=TaskBatchResult, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(4))]
+)
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create up to 1000 tasks in one transaction"""
+    tasks = await task_service.create_tasks(db, batch.tasks, current_user.id)
+    return {"results": [{"id": task.id, "ok": True, "task": task} for task in tasks]}
+
+
+@router.patch("/batch", response_model=TaskBatchResult, dependencies=[Depends(query_budget(4))])
+async def update_tasks_batch_status(
+    batch: TaskBatchStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Set the status of up to 1000 tasks in one statement; results follow the order of `ids`"""
+    tasks = await task_service.update_tasks_status(db, batch.ids, current_user.id, batch.status)
+    updated = {task.id: task for task in tasks}
+    return {"results": [
+        {"id": task_id, "ok": True, "task": updated[task_id]} if task_id in updated
+        else {"id": task_id, "ok": False, "error": "not_found"}
+        for task_id in batch.ids
+    ]}
+
+
+@router.delete("/batch", response_model=TaskBatchResult, dependencies=[Depends(query_budget(4))])
+async def delete_tasks_batch(
+    batch: TaskBatchDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete up to 1000 tasks in one statement; results follow the order of `ids`"""
+    deleted = set(await task_service.delete_tasks(db, batch.ids, current_user.id))
+    return {"results": [
+        {"id": task_id, "ok": True} if task_id in deleted
+        else {"id": task_id, "ok": False, "error": "not_found"}
+        for task_id in batch.ids
+    ]}
+
+
+@router.get("/{task_id}", response_model=TaskResponse, dependencies=[Depends(query_budget(2))])
+async def get_task(
     task_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a specific task by ID"""
+    """Get a specific task by ID; its ETag can be sent as If-Match on PUT and DELETE"""
     import uuid
     try:
         task_uuid = uuid.UUID(task_id)
@@ -53,20 +219,23 @@ def get_task(
             detail="Invalid task ID format"
         )
     
-    task = task_service.get_task_by_id(db, task_uuid, current_user.id)
+    task = await task_service.get_task_by_id(db, task_uuid, current_user.id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+    response.headers["ETag"] = entity_etag(task.change_seq)
     return task
 
 
-@router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+@router.put("/{task_id}", response_model=TaskResponse, dependencies=[Depends(query_budget(4))])
+async def update_task(
     task_id: str,
     task_data: TaskUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; 412 if the task changed since"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update an existing task"""
@@ -79,19 +248,26 @@ def update_task(
             detail="Invalid task ID format"
         )
     
-    task = task_service.update_task(db, task_uuid, current_user.id, task_data)
+    task = await task_service.update_task(
+        db, task_uuid, current_user.id, task_data, versions=if_match_versions(if_match)
+    )
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
+    response.headers["ETag"] = entity_etag(task.change_seq)
     return task
 
 
-@router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+@router.delete(
+    "/{task_id}", status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(query_budget(4))]
+)
+async def delete_task(
     task_id: str,
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None, description="ETag from a previous read; 412 if the task changed since"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a task"""
@@ -104,7 +280,7 @@ def delete_task(
             detail="Invalid task ID format"
         )
     
-    success = task_service.delete_task(db, task_uuid, current_user.id)
+    success = await task_service.delete_task(db, task_uuid, current_user.id, versions=if_match_versions(if_match))
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import uuid
 
 
@@ -13,6 +13,10 @@ class JournalEntryCreate(JournalEntryBase):
     pass
 
 
+class JournalEntryImport(JournalEntryCreate):
+    created_at: Optional[datetime] = None  # kept as given; naive times are UTC, missing means now
+
+
 class JournalEntryResponse(JournalEntryBase):
     id: uuid.UUID
     user_id: uuid.UUID
@@ -22,3 +26,29 @@ class JournalEntryResponse(JournalEntryBase):
         from_attributes = True
 
 
+class JournalSearchResult(BaseModel):
+    id: uuid.UUID
+    created_at: datetime
+    mood_label: Optional[str] = None
+    snippet: str  # HTML-escaped words around the matches, which are wrapped in <mark>
+
+
+class JournalChanges(BaseModel):
+    changed: List[JournalEntryResponse]  # created or updated since the token, oldest change first
+    deleted: List[uuid.UUID]
+    next_token: str  # pass as ?since= on the next call
+    has_more: bool  # call again right away to get the rest
+
+
+class JournalImportResponse(BaseModel):
+    id: uuid.UUID
+    status: str  # 'importing', 'labeling' (entries are in, mood labels being filled), 'done', 'failed'
+    imported: int
+    skipped: int
+    labeled: int
+    errors: List[str]  # the first few skipped rows
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from datetime import datetime
 from typing import Optional, Dict, Any
 import uuid
@@ -15,7 +15,9 @@ class MoodProfileResponse(BaseModel):
     arousal: float
     source: str
     confidence: float
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = Field(
+        default=None, validation_alias=AliasChoices("metadata_", "metadata")
+    )
     created_at: datetime
     
     class Config:
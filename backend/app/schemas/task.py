@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Dict, List, Optional
 import uuid
 from ..models.task import TaskStatus, TaskSource
 
@@ -36,3 +36,57 @@ class TaskResponse(TaskBase):
         from_attributes = True
 
 
+class TaskPriority(TaskResponse):
+    priority_score: float  # stored score, 0-100
+    score: float  # priority_score adjusted for the user's current mood; results are sorted by this
+
+
+class TaskDayLoad(BaseModel):
+    date: date  # in the user's timezone
+    tasks: int  # open tasks due that day
+    estimated_minutes: int
+
+
+class TaskStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_source: Dict[str, int]
+    overdue: int  # open tasks past their due date
+    upcoming: List[TaskDayLoad]  # today first
+    timezone: str
+    generated_at: datetime
+
+
+class TaskChanges(BaseModel):
+    changed: List[TaskResponse]  # created or updated since the token, oldest change first
+    deleted: List[uuid.UUID]
+    next_token: str  # pass as ?since= on the next call
+    has_more: bool  # call again right away to get the rest
+
+
+# Bulk endpoints accept at most this many items per call
+MAX_BATCH_SIZE = 1000
+
+
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchStatusUpdate(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    status: TaskStatus
+
+
+class TaskBatchDelete(BaseModel):
+    ids: List[uuid.UUID] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class TaskBatchItemResult(BaseModel):
+    id: uuid.UUID
+    ok: bool
+    error: Optional[str] = None  # "not_found" for ids that don't exist or aren't the user's
+    task: Optional[TaskResponse] = None
+
+
+class TaskBatchResult(BaseModel):
+    results: List[TaskBatchItemResult]
@@ -1,6 +1,7 @@
 from . import task_service
 from . import journal_service
+from . import async_task_service
+from . import async_journal_service
 
-__all__ = ["task_service", "journal_service"]
-
+__all__ = ["task_service", "journal_service", "async_task_service", "async_journal_service"]
 
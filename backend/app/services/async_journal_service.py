@@ -0,0 +1,126 @@
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import Row, Select, and_, desc, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from ..core.changes import ChangeKey, read_changes
+from ..core.fulltext import SearchKey, ranked_search
+from ..models.journal import JournalEntry
+from ..schemas.journal import JournalEntryCreate
+from .mood_label_queue import mood_label_queue
+import uuid
+
+
+async def create_journal_entry(
+    db: AsyncSession,
+    entry_data: JournalEntryCreate,
+    user_id: uuid.UUID
+) -> JournalEntry:
+    """Create a new journal entry; unlabeled entries are queued for mood labeling"""
+    new_entry = JournalEntry(**entry_data.model_dump(), user_id=user_id)
+    db.add(new_entry)
+    await db.commit()
+    await db.refresh(new_entry)
+    if new_entry.mood_label is None:
+        mood_label_queue.enqueue(new_entry.id)
+    return new_entry
+
+
+def user_journal_query(
+    user_id: uuid.UUID,
+    since: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, uuid.UUID]] = None,
+    columns: Optional[Sequence[str]] = None
+) -> Select:
+    """A user's journal entries, newest first; `columns` selects only those attributes"""
+    entities = [getattr(JournalEntry, name) for name in columns] if columns else [JournalEntry]
+    query = select(*entities).where(JournalEntry.user_id == user_id)
+    
+    if since:
+        query = query.where(JournalEntry.created_at >= since)
+    if before:
+        query = query.where(tuple_(JournalEntry.created_at, JournalEntry.id) < before)
+    return query.order_by(desc(JournalEntry.created_at), desc(JournalEntry.id))
+
+
+async def get_user_journal_entries(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    since: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, uuid.UUID]] = None,
+    columns: Optional[Sequence[str]] = None
+) -> List:
+    """
+    Get a user's journal entries, newest first, optionally before a (created_at, id) key.
+    
+    With `columns`, returns rows carrying only those attributes instead of JournalEntry objects.
+    """
+    query = user_journal_query(user_id, since, before, columns).offset(skip).limit(limit)
+    result = await db.execute(query) if columns else await db.scalars(query)
+    return list(result)
+
+
+async def stream_user_journal_entries(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    columns: Sequence[str],
+    skip: int = 0,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, uuid.UUID]] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Row]:
+    """Yield journal rows from a server-side cursor, `batch_size` at a time"""
+    query = user_journal_query(user_id, since, before, columns).offset(skip).limit(limit)
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for row in result:
+        yield row
+
+
+async def search_journal_entries(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    terms: Sequence[str],
+    since: Optional[datetime] = None,
+    limit: int = 20,
+    after: Optional[SearchKey] = None
+) -> List[Row]:
+    """
+    A user's entries matching every term, best match first, after a (rank, id) key.
+    
+    Rows carry id, created_at, mood_label, a highlighted snippet of the content, rank
+    and truncated. On SQLite only the most recently written matches are ranked,
+    and truncated says whether older ones were left out (see ranked_search).
+    """
+    connection = await db.connection()
+    query = ranked_search(
+        connection.dialect.name, JournalEntry.__table__, user_id, terms,
+        [JournalEntry.id, JournalEntry.created_at, JournalEntry.mood_label], "content", limit, after,
+        where=[JournalEntry.created_at >= since] if since else ()
+    )
+    result = await db.execute(query)
+    return list(result)
+
+
+async def get_journal_changes(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    since: Optional[ChangeKey] = None,
+    limit: int = 500
+) -> dict:
+    """Journal entries written and ids deleted after a change position (see core/changes.py)"""
+    return await read_changes(db, JournalEntry, user_id, "journal", since, limit)
+
+
+async def get_journal_entry_by_id(
+    db: AsyncSession,
+    entry_id: uuid.UUID,
+    user_id: uuid.UUID
+) -> Optional[JournalEntry]:
+    """Get a specific journal entry by ID, ensuring it belongs to the user"""
+    return await db.scalar(
+        select(JournalEntry).where(
+            and_(JournalEntry.id == entry_id, JournalEntry.user_id == user_id)
+        )
+    )
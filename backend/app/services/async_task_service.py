@@ -0,0 +1,270 @@
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import Row, Select, and_, case, delete, insert, select, tuple_, update
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from ..core.changes import ChangeKey, allocate_change_seqs, read_changes
+from ..core.etags import precondition_failed
+from ..core.fulltext import SearchKey, search_clauses
+from ..core.replicas import mark_written
+from ..models.task import Task, TaskStatus
+from ..models.tombstone import Tombstone
+from ..schemas.task import TaskCreate, TaskUpdate
+from .priority_service import (
+    CLOSED_SCORE, CLOSED_STATUSES, SCORE_INPUTS, rescore_statement, rescored, score_values
+)
+import uuid
+
+
+def user_tasks_query(
+    user_id: uuid.UUID,
+    status: Optional[str] = None,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    columns: Optional[Sequence[str]] = None
+) -> Select:
+    """A user's tasks in creation order; `columns` selects only those Task attributes"""
+    entities = [getattr(Task, name) for name in columns] if columns else [Task]
+    query = select(*entities).where(Task.user_id == user_id)
+    
+    if status:
+        query = query.where(Task.status == status)
+    if after:
+        query = query.where(tuple_(Task.created_at, Task.id) > after)
+    return query.order_by(Task.created_at, Task.id)
+
+
+async def get_user_tasks(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    columns: Optional[Sequence[str]] = None
+) -> List:
+    """
+    Get a user's tasks in creation order, optionally after a (created_at, id) key.
+    
+    With `columns`, returns rows carrying only those attributes instead of Task objects.
+    """
+    query = user_tasks_query(user_id, status, after, columns).offset(skip).limit(limit)
+    result = await db.execute(query) if columns else await db.scalars(query)
+    return list(result)
+
+
+async def stream_user_tasks(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    columns: Sequence[str],
+    skip: int = 0,
+    limit: Optional[int] = None,
+    status: Optional[str] = None,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None,
+    batch_size: int = 500
+) -> AsyncIterator[Row]:
+    """Yield task rows from a server-side cursor, `batch_size` at a time"""
+    query = user_tasks_query(user_id, status, after, columns).offset(skip).limit(limit)
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for row in result:
+        yield row
+
+
+async def search_user_tasks(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    terms: Sequence[str],
+    limit: int = 20,
+    after: Optional[SearchKey] = None
+) -> List[Row]:
+    """A user's tasks matching every term as (Task, rank) rows, best match first, after a (rank, id) key"""
+    connection = await db.connection()
+    from_clause, condition, rank = search_clauses(connection.dialect.name, Task.__table__, user_id, terms)
+    query = select(Task, rank.label("rank")).select_from(from_clause).where(condition)
+    if after:
+        query = query.where(tuple_(rank, Task.id) > after)
+    result = await db.execute(query.order_by(rank, Task.id).limit(limit))
+    return list(result)
+
+
+async def get_task_changes(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    since: Optional[ChangeKey] = None,
+    limit: int = 500
+) -> dict:
+    """Tasks written and ids deleted after a change position (see core/changes.py)"""
+    return await read_changes(db, Task, user_id, "tasks", since, limit)
+
+
+async def get_task_by_id(
+    db: AsyncSession,
+    task_id: uuid.UUID,
+    user_id: uuid.UUID
+) -> Optional[Task]:
+    """Get a specific task by ID, ensuring it belongs to the user"""
+    return await db.scalar(
+        select(Task).where(and_(Task.id == task_id, Task.user_id == user_id))
+    )
+
+
+async def create_task(db: AsyncSession, task_data: TaskCreate, user_id: uuid.UUID) -> Task:
+    """Create a new task"""
+    new_task = Task(**task_data.model_dump(), user_id=user_id)
+    db.add(new_task)
+    await db.commit()
+    await db.refresh(new_task)
+    return new_task
+
+
+def _task_conditions(task_id: uuid.UUID, user_id: uuid.UUID, versions: Optional[Sequence[int]]) -> list:
+    conditions = [Task.id == task_id, Task.user_id == user_id]
+    if versions is not None:
+        conditions.append(Task.change_seq.in_(versions))
+    return conditions
+
+
+async def _raise_if_stale(db: AsyncSession, task_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """After a versioned write matched no row: 412 if the task exists (at another version)"""
+    current = await db.scalar(select(Task.change_seq).where(Task.id == task_id, Task.user_id == user_id))
+    if current is not None:
+        raise precondition_failed(current)
+
+
+async def update_task(
+    db: AsyncSession,
+    task_id: uuid.UUID,
+    user_id: uuid.UUID,
+    task_data: TaskUpdate,
+    versions: Optional[Sequence[int]] = None
+) -> Optional[Task]:
+    """
+    Update a task with one UPDATE ... RETURNING; None if it doesn't exist.
+    
+    With `versions` (from If-Match) the update applies only while the task's
+    change_seq is one of them, and raises 412 otherwise.
+    """
+    update_data = task_data.model_dump(exclude_unset=True)
+    if not update_data:
+        task = await get_task_by_id(db, task_id, user_id)
+        if task is not None and versions is not None and task.change_seq not in versions:
+            raise precondition_failed(task.change_seq)
+        return task
+    
+    (seq,) = await allocate_change_seqs(db, user_id, "tasks", 1)
+    closing = update_data.get("status") in CLOSED_STATUSES
+    task = await db.scalar(
+        update(Task)
+        .where(*_task_conditions(task_id, user_id, versions))
+        .values(**update_data, change_seq=seq, **({"priority_score": CLOSED_SCORE} if closing else {}))
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    if task is None:
+        await db.rollback()
+        if versions is not None:
+            await _raise_if_stale(db, task_id, user_id)
+        return None
+    
+    # Open tasks score from fields the request may not have sent, so re-score the returned row
+    if not closing and update_data.keys() & SCORE_INPUTS:
+        scores = rescored([task])
+        if scores:
+            await db.execute(rescore_statement(), scores)
+            set_committed_value(task, "priority_score", scores[0]["score"])
+    mark_written(db, user_id)
+    await db.commit()
+    return task
+
+
+async def delete_task(
+    db: AsyncSession,
+    task_id: uuid.UUID,
+    user_id: uuid.UUID,
+    versions: Optional[Sequence[int]] = None
+) -> bool:
+    """Delete a task with one DELETE ... RETURNING; False if it doesn't exist, 412 on a stale `versions`"""
+    deleted = await _delete_tasks_where(db, user_id, *_task_conditions(task_id, user_id, versions))
+    if not deleted and versions is not None:
+        await _raise_if_stale(db, task_id, user_id)
+    return bool(deleted)
+
+
+async def create_tasks(
+    db: AsyncSession,
+    tasks_data: List[TaskCreate],
+    user_id: uuid.UUID
+) -> List[Task]:
+    """Create several tasks with one multi-row INSERT ... RETURNING"""
+    seqs = await allocate_change_seqs(db, user_id, "tasks", len(tasks_data))
+    result = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        [
+            {**values, "user_id": user_id, "change_seq": seq, "priority_score": score_values(values)}
+            for values, seq in zip((task_data.model_dump() for task_data in tasks_data), seqs)
+        ]
+    )
+    tasks = list(result)
+    mark_written(db, user_id)
+    await db.commit()
+    return tasks
+
+
+async def update_tasks_status(
+    db: AsyncSession,
+    task_ids: List[uuid.UUID],
+    user_id: uuid.UUID,
+    status: TaskStatus
+) -> List[Task]:
+    """Set the status of the user's tasks among `task_ids`; returns the updated tasks"""
+    task_ids = list(dict.fromkeys(task_ids))
+    seqs = await allocate_change_seqs(db, user_id, "tasks", len(task_ids))
+    values = {"status": status, "change_seq": case(dict(zip(task_ids, seqs)), value=Task.id)}
+    if status in CLOSED_STATUSES:
+        values["priority_score"] = CLOSED_SCORE
+    result = await db.scalars(
+        update(Task)
+        .where(Task.user_id == user_id, Task.id.in_(task_ids))
+        .values(**values)
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    tasks = list(result)
+    # Open statuses score from each task's deadline and estimate, so re-score the returned rows
+    scores = rescored(tasks) if status not in CLOSED_STATUSES else []
+    if scores:
+        await db.execute(rescore_statement(), scores)
+        by_id = {task.id: task for task in tasks}
+        for change in scores:
+            set_committed_value(by_id[change["task_id"]], "priority_score", change["score"])
+    mark_written(db, user_id)
+    await db.commit()
+    return tasks
+
+
+async def delete_tasks(
+    db: AsyncSession,
+    task_ids: List[uuid.UUID],
+    user_id: uuid.UUID
+) -> List[uuid.UUID]:
+    """Delete the user's tasks among `task_ids`; returns the ids actually deleted"""
+    return await _delete_tasks_where(db, user_id, Task.user_id == user_id, Task.id.in_(task_ids))
+
+
+async def _delete_tasks_where(db: AsyncSession, user_id: uuid.UUID, *conditions) -> List[uuid.UUID]:
+    """DELETE ... RETURNING the matching tasks, leaving tombstones for delta sync"""
+    result = await db.scalars(
+        delete(Task)
+        .where(*conditions)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = list(result)
+    if deleted:
+        seqs = await allocate_change_seqs(db, user_id, "tasks", len(deleted))
+        await db.execute(insert(Tombstone), [
+            {"resource": "tasks", "entity_id": task_id, "user_id": user_id, "change_seq": seq}
+            for task_id, seq in zip(deleted, seqs)
+        ])
+    mark_written(db, user_id)
+    await db.commit()
+    return deleted
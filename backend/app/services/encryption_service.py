@@ -1,28 +1,123 @@
 """
 Service for encrypting/decrypting OAuth tokens
+
+Keys are derived once per process from ENCRYPTION_KEYS (newest first, falling
+back to SECRET_KEY). New tokens are always encrypted with the first key; any
+listed key can decrypt, so a secret can be rotated by prepending the new one,
+running reencrypt_oauth_tokens, and only then dropping the old one.
 """
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.oauth_token import OAuthToken
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional
 import base64
 import hashlib
 
 
-def get_encryption_key() -> bytes:
-    """Generate encryption key from secret key"""
-    # Use secret key to derive encryption key
-    key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+def derive_key(secret: str) -> bytes:
+    """Derive a Fernet key from a secret"""
+    key = hashlib.sha256(secret.encode()).digest()
     return base64.urlsafe_b64encode(key)
 
 
+def get_key_secrets() -> List[str]:
+    """Configured secrets, newest first"""
+    secrets = [secret.strip() for secret in settings.ENCRYPTION_KEYS.split(",") if secret.strip()]
+    return secrets or [settings.SECRET_KEY]
+
+
+def get_encryption_key() -> bytes:
+    """Key used for new encryptions"""
+    return derive_key(get_key_secrets()[0])
+
+
+@lru_cache(maxsize=1)
+def get_primary_fernet() -> Fernet:
+    return Fernet(get_encryption_key())
+
+
+@lru_cache(maxsize=1)
+def get_fernet() -> MultiFernet:
+    """Encrypts with the newest key, decrypts with any configured key"""
+    return MultiFernet([Fernet(derive_key(secret)) for secret in get_key_secrets()])
+
+
+def reset_keys() -> None:
+    """Forget cached keys (after ENCRYPTION_KEYS / SECRET_KEY change in-process)"""
+    get_primary_fernet.cache_clear()
+    get_fernet.cache_clear()
+
+
 def encrypt_token(token: str) -> str:
     """Encrypt an OAuth token"""
-    f = Fernet(get_encryption_key())
-    return f.encrypt(token.encode()).decode()
+    return get_fernet().encrypt(token.encode()).decode()
 
 
 def decrypt_token(encrypted_token: str) -> str:
     """Decrypt an OAuth token"""
-    f = Fernet(get_encryption_key())
-    return f.decrypt(encrypted_token.encode()).decode()
+    return get_fernet().decrypt(encrypted_token.encode()).decode()
+
+
+def encrypt_many(tokens: Iterable[str]) -> List[str]:
+    """Encrypt several OAuth tokens"""
+    f = get_fernet()
+    return [f.encrypt(token.encode()).decode() for token in tokens]
+
+
+def decrypt_many(encrypted_tokens: Iterable[str]) -> List[str]:
+    """Decrypt several OAuth tokens"""
+    f = get_fernet()
+    return [f.decrypt(token.encode()).decode() for token in encrypted_tokens]
+
+
+def needs_rotation(encrypted_token: str) -> bool:
+    """True if the token wasn't encrypted with the current primary key"""
+    try:
+        get_primary_fernet().decrypt(encrypted_token.encode())
+        return False
+    except InvalidToken:
+        return True
+
+
+def rotate_token(encrypted_token: str) -> str:
+    """Re-encrypt a token under the current primary key"""
+    return get_fernet().rotate(encrypted_token.encode()).decode()
+
+
+def reencrypt_oauth_tokens(
+    session_factory: Optional[Callable] = None,
+    chunk_size: int = 500
+) -> int:
+    """
+    Re-encrypt every stored OAuth token under the primary key.
 
+    Walks oauth_tokens in primary-key order and commits after each chunk, so
+    locks are only ever held on `chunk_size` rows and an interrupted run can
+    simply be restarted. Returns the number of rows rewritten.
+    """
+    session_factory = session_factory or SessionLocal
+    rotated = 0
+    last_id = None
+    while True:
+        db = session_factory()
+        try:
+            query = db.query(OAuthToken).order_by(OAuthToken.id)
+            if last_id is not None:
+                query = query.filter(OAuthToken.id > last_id)
+            tokens = query.limit(chunk_size).all()
+            if not tokens:
+                return rotated
 
+            for token in tokens:
+                for field in ("access_token", "refresh_token"):
+                    value = getattr(token, field)
+                    if value and needs_rotation(value):
+                        setattr(token, field, rotate_token(value))
+                if token in db.dirty:
+                    rotated += 1
+            db.commit()
+            last_id = tokens[-1].id
+        finally:
+            db.close()
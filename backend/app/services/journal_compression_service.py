@@ -0,0 +1,81 @@
+"""
+Compressing journal entries written before compression was turned on (SQLite)
+
+New entries are compressed as they are written once JOURNAL_COMPRESS_MIN_BYTES
+is set; compress_journal_entries rewrites the existing ones. The rewrite is a
+plain UPDATE rather than an ORM write: the text doesn't change, so entries
+aren't stamped as changed and sync clients don't download them again.
+
+The full-text index reads compressed content through inflate_text, which only
+the app registers, so a database gets that index layout only once compression
+is on: prepare_journal_compression, run at startup and before the rewrite,
+upgrades an index created while it was off.
+
+Postgres compresses content in TOAST instead (migration 012 switches it to lz4
+and recompresses existing rows), so there is nothing to do there.
+"""
+from typing import Callable, Optional
+
+from sqlalchemy import LargeBinary, bindparam, cast, func, literal_column, select, text, update
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.fulltext import rebuild_sqlite_search
+from ..models.journal import JournalEntry
+
+
+def prepare_journal_compression(session_factory: Optional[Callable] = None) -> bool:
+    """Switch the SQLite full-text index to the compressed layout if compression is on; True if it was rebuilt"""
+    db = (session_factory or SessionLocal)()
+    try:
+        if db.get_bind().dialect.name != "sqlite" or settings.JOURNAL_COMPRESS_MIN_BYTES <= 0:
+            return False
+        tables = set(db.scalars(text(
+            "SELECT name FROM sqlite_master WHERE name IN ('journal_entries', 'journal_entries_text')"
+        )))
+        if tables != {"journal_entries"}:
+            # Not created yet, or already in the compressed layout
+            return False
+        rebuild_sqlite_search(db.connection(), JournalEntry.__table__)
+        db.commit()
+        return True
+    finally:
+        db.close()
+
+
+def compress_journal_entries(session_factory: Optional[Callable] = None, chunk_size: int = 500) -> int:
+    """
+    Store every plain entry at least JOURNAL_COMPRESS_MIN_BYTES long compressed.
+    
+    Walks journal_entries in rowid order and commits after each chunk, so an
+    interrupted run can simply be restarted. The full-text index is switched to
+    the compressed layout first if needed. Returns the number of
+    entries rewritten (text that doesn't compress is left as it was).
+    """
+    table = JournalEntry.__table__
+    min_bytes = settings.JOURNAL_COMPRESS_MIN_BYTES
+    prepare_journal_compression(session_factory)
+    db = (session_factory or SessionLocal)()
+    try:
+        if db.get_bind().dialect.name != "sqlite" or min_bytes <= 0:
+            return 0
+        
+        rowid = literal_column("rowid")
+        query = select(rowid.label("entry_rowid"), table.c.content).where(
+            func.typeof(table.c.content) == "text",
+            func.length(cast(table.c.content, LargeBinary)) >= min_bytes
+        ).order_by(rowid).limit(chunk_size)
+        rewrite = update(table).where(rowid == bindparam("entry_rowid")).values(content=bindparam("plain_content"))
+        
+        compressed = 0
+        last_rowid = 0
+        while True:
+            rows = db.execute(query.where(rowid > last_rowid)).all()
+            if not rows:
+                return compressed
+            db.execute(rewrite, [{"entry_rowid": row.entry_rowid, "plain_content": row.content} for row in rows])
+            db.commit()
+            compressed += len(rows)
+            last_rowid = rows[-1].entry_rowid
+    finally:
+        db.close()
@@ -0,0 +1,291 @@
+"""
+Bulk journal import
+
+POST /journal/import reads an NDJSON or CSV body as it streams in: lines are
+split off the incoming chunks, parsed and validated one at a time, and written
+JOURNAL_IMPORT_CHUNK_SIZE rows per INSERT and commit, so memory stays flat
+however large the upload. Rows that don't parse are skipped and counted; the
+first few reasons are kept on the job. Chunks committed before a failure (e.g.
+the client disconnecting) stay imported. All of this happens within the
+request: the job is returned once the last row is written.
+
+Mood labels are filled in afterwards by label_imported_entries, run in the
+background, which walks the job's change sequence range (the rows were stamped
+with consecutive numbers per chunk) over the (user_id, change_seq) index and
+labels each chunk with the labeling queue's label_entries, so imported entries
+get the same labels and dated text mood profiles as entries created one by one.
+"""
+from datetime import timezone
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+import csv
+import json
+import logging
+import uuid
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.changes import allocate_change_seqs
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.pagination import utcnow
+from ..core.replicas import mark_written
+from ..core.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE
+from ..models.journal import JournalEntry
+from ..models.journal_import import JournalImport
+from ..schemas.journal import JournalEntryImport
+from .mood_label_queue import label_entries
+
+logger = logging.getLogger(__name__)
+
+MAX_ERRORS = 20
+
+# (line number, parsed row or None, reason it was skipped)
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+
+
+async def split_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """(line number, line) for each line of a byte stream; None for lines longer than max_line_bytes"""
+    pending = bytearray()
+    line_no = 0
+    oversized = False
+    async for chunk in chunks:
+        pending += chunk
+        start = 0
+        end = pending.find(b"\n", start)
+        while end != -1:
+            line_no += 1
+            yield line_no, None if oversized or end - start > max_line_bytes else bytes(pending[start:end])
+            oversized = False
+            start = end + 1
+            end = pending.find(b"\n", start)
+        del pending[:start]
+        # Drop the rest of an overlong line as it arrives rather than buffering it
+        if len(pending) > max_line_bytes:
+            oversized = True
+            pending.clear()
+    if pending or oversized:
+        yield line_no + 1, None if oversized else bytes(pending)
+
+
+def validate_row(line_no: int, values: dict) -> ParsedRow:
+    """Row ready to insert, with created_at in UTC, or the reason it's skipped"""
+    try:
+        entry = JournalEntryImport.model_validate(values)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        reason = f"{field}: {error['msg']}" if field else error["msg"]
+        return line_no, None, f"line {line_no}: {reason}"
+    
+    created_at = entry.created_at or utcnow()
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return line_no, {
+        "content": entry.content,
+        "mood_label": entry.mood_label,
+        "created_at": created_at.astimezone(timezone.utc),
+    }, None
+
+
+async def parse_ndjson(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[ParsedRow]:
+    """One JSON object per line with `content` and optional `created_at` and `mood_label`"""
+    async for line_no, line in split_lines(chunks, max_line_bytes):
+        if line is None:
+            yield line_no, None, f"line {line_no}: longer than {max_line_bytes} bytes"
+            continue
+        if not line.strip():
+            continue
+        try:
+            values = json.loads(line)
+        except ValueError:
+            yield line_no, None, f"line {line_no}: not valid JSON"
+            continue
+        if not isinstance(values, dict):
+            yield line_no, None, f"line {line_no}: not a JSON object"
+            continue
+        yield validate_row(line_no, values)
+
+
+async def parse_csv(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[ParsedRow]:
+    """A header row naming a `content` column and optionally `created_at` and `mood_label`, then one row per entry"""
+    header = None
+    record: List[bytes] = []
+    first_line = 0
+    async for line_no, line in split_lines(chunks, max_line_bytes):
+        if line is None:
+            record = []
+            yield line_no, None, f"line {line_no}: longer than {max_line_bytes} bytes"
+            continue
+        if not record:
+            first_line = line_no
+        record.append(line)
+        # A quoted field may span lines: the record ends once its quotes balance
+        if sum(part.count(b'"') for part in record) % 2:
+            if sum(len(part) for part in record) > max_line_bytes:
+                record = []
+                yield first_line, None, f"line {first_line}: longer than {max_line_bytes} bytes"
+            continue
+        
+        try:
+            text = b"\n".join(record).decode("utf-8-sig" if header is None else "utf-8")
+        except UnicodeDecodeError:
+            text = None
+        record = []
+        if text is None:
+            yield first_line, None, f"line {first_line}: not valid UTF-8"
+            continue
+        if not text.strip():
+            continue
+        fields = next(csv.reader([text]))
+        
+        if header is None:
+            header = [name.strip().lower() for name in fields]
+            if "content" not in header:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="CSV header has no `content` column"
+                )
+            continue
+        values = {name: value for name, value in zip(header, fields) if value != "" or name == "content"}
+        yield validate_row(first_line, values)
+    
+    if record:
+        yield first_line, None, f"line {first_line}: unterminated quoted field"
+
+
+def import_parser(content_type: Optional[str]) -> Callable[[AsyncIterator[bytes], int], AsyncIterator[ParsedRow]]:
+    """Parser for an upload's media type; 415 unless it's NDJSON or CSV"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type == NDJSON_MEDIA_TYPE:
+        return parse_ndjson
+    if media_type == CSV_MEDIA_TYPE:
+        return parse_csv
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=f"Upload {NDJSON_MEDIA_TYPE} or {CSV_MEDIA_TYPE}"
+    )
+
+
+async def _write_chunk(db: AsyncSession, job: JournalImport, rows: List[dict], skipped: int, errors: List[str]) -> None:
+    """Insert one chunk of rows and record it on the job, in one transaction"""
+    if rows:
+        seqs = await allocate_change_seqs(db, job.user_id, "journal", len(rows))
+        # Rows are keyed by column name; the content column compresses them on insert
+        await db.execute(insert(JournalEntry.__table__), [
+            {**row, "id": uuid.uuid4(), "user_id": job.user_id, "change_seq": seq}
+            for row, seq in zip(rows, seqs)
+        ])
+        job.first_seq = job.first_seq or seqs[0]
+        job.last_seq = seqs[-1]
+        job.imported += len(rows)
+    job.skipped = skipped
+    job.errors = list(errors)
+    mark_written(db, job.user_id)
+    await db.commit()
+
+
+async def import_journal_entries(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    rows: AsyncIterator[ParsedRow],
+    chunk_size: Optional[int] = None
+) -> JournalImport:
+    """Write parsed rows in chunks, tracking progress on a new JournalImport; returns the job"""
+    chunk_size = chunk_size or settings.JOURNAL_IMPORT_CHUNK_SIZE
+    job = JournalImport(user_id=user_id, status="importing", imported=0, skipped=0, labeled=0, errors=[])
+    db.add(job)
+    await db.commit()
+    
+    chunk: List[dict] = []
+    skipped = 0
+    errors: List[str] = []
+    try:
+        async for _, row, error in rows:
+            if row is None:
+                skipped += 1
+                if len(errors) < MAX_ERRORS:
+                    errors.append(error)
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                await _write_chunk(db, job, chunk, skipped, errors)
+                chunk = []
+        await _write_chunk(db, job, chunk, skipped, errors)
+    except Exception as exc:
+        await db.rollback()
+        await db.refresh(job)
+        job.status = "failed"
+        job.errors = job.errors + [getattr(exc, "detail", None) or f"import stopped: {type(exc).__name__}"]
+        job.finished_at = utcnow()
+        await db.commit()
+        raise
+    
+    job.status = "labeling" if job.imported else "done"
+    job.finished_at = None if job.imported else utcnow()
+    await db.commit()
+    return job
+
+
+async def get_import(db: AsyncSession, job_id: uuid.UUID, user_id: uuid.UUID) -> Optional[JournalImport]:
+    """A user's import job by id"""
+    return await db.scalar(
+        select(JournalImport).where(JournalImport.id == job_id, JournalImport.user_id == user_id)
+    )
+
+
+def label_imported_entries(
+    job_id: uuid.UUID,
+    session_factory: Optional[Callable] = None,
+    chunk_size: int = 500
+) -> int:
+    """
+    Fill in mood labels and text mood profiles for an import's unlabeled entries, committing after each chunk.
+    
+    Labeling is a write, so each entry gets a new change sequence number (past the
+    job's range) and delta sync delivers the labels. Returns the number labeled.
+    """
+    db = (session_factory or SessionLocal)()
+    try:
+        job = db.get(JournalImport, job_id)
+        if job is None or job.first_seq is None:
+            return 0
+        user_id, first_seq, last_seq = job.user_id, job.first_seq, job.last_seq
+        query = select(JournalEntry.id, JournalEntry.change_seq).where(
+            JournalEntry.user_id == user_id,
+            JournalEntry.change_seq <= last_seq,
+            JournalEntry.mood_label.is_(None)
+        ).order_by(JournalEntry.change_seq).limit(chunk_size)
+        
+        total = 0
+        position = first_seq - 1
+        while True:
+            rows = db.execute(query.where(JournalEntry.change_seq > position)).all()
+            if not rows:
+                break
+            position = rows[-1].change_seq
+            labeled = label_entries(db, [row.id for row in rows])
+            total += labeled
+            db.execute(
+                update(JournalImport).where(JournalImport.id == job_id).values(labeled=JournalImport.labeled + labeled)
+            )
+            db.commit()
+        
+        db.execute(
+            update(JournalImport).where(JournalImport.id == job_id, JournalImport.status == "labeling")
+            .values(status="done", finished_at=utcnow())
+        )
+        db.commit()
+        return total
+    except Exception:
+        logger.exception("Mood labeling for journal import %s failed", job_id)
+        db.rollback()
+        db.execute(
+            update(JournalImport).where(JournalImport.id == job_id)
+            .values(status="failed", finished_at=utcnow())
+        )
+        db.commit()
+        raise
+    finally:
+        db.close()
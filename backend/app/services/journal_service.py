@@ -1,9 +1,10 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, tuple_
 from datetime import datetime
 from ..models.journal import JournalEntry
 from ..schemas.journal import JournalEntryCreate
+from .mood_label_queue import mood_label_queue
 import uuid
 
 
@@ -12,11 +13,13 @@ def create_journal_entry(
     entry_data: JournalEntryCreate,
     user_id: uuid.UUID
 ) -> JournalEntry:
-    """Create a new journal entry"""
+    """Create a new journal entry; unlabeled entries are queued for mood labeling"""
     new_entry = JournalEntry(**entry_data.model_dump(), user_id=user_id)
     db.add(new_entry)
     db.commit()
     db.refresh(new_entry)
+    if new_entry.mood_label is None:
+        mood_label_queue.enqueue(new_entry.id)
     return new_entry
 
 
@@ -25,15 +28,20 @@ def get_user_journal_entries(
     user_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
-    since: Optional[datetime] = None
+    since: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, uuid.UUID]] = None
 ) -> List[JournalEntry]:
-    """Get journal entries for a user with optional date filtering"""
+    """Get a user's journal entries, newest first, optionally before a (created_at, id) key"""
     query = db.query(JournalEntry).filter(JournalEntry.user_id == user_id)
     
     if since:
         query = query.filter(JournalEntry.created_at >= since)
+    if before:
+        query = query.filter(tuple_(JournalEntry.created_at, JournalEntry.id) < before)
     
-    return query.order_by(desc(JournalEntry.created_at)).offset(skip).limit(limit).all()
+    return query.order_by(
+        desc(JournalEntry.created_at), desc(JournalEntry.id)
+    ).offset(skip).limit(limit).all()
 
 
 def get_journal_entry_by_id(
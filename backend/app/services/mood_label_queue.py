@@ -0,0 +1,176 @@
+"""
+Mood labeling off the request path
+
+Creating a journal entry without a mood label queues its id. A pool of
+MOOD_LABEL_WORKERS threads takes up to MOOD_LABEL_BATCH_SIZE queued ids at a
+time, runs the text analyzer on each entry and writes its `mood_label` plus a
+'text' MoodProfile dated at the entry, one commit per batch. A worker that
+picks up an id waits up to MOOD_LABEL_BATCH_WAIT_SECONDS for more, so a
+steady trickle of entries doesn't cost a commit each. The writes go
+through the ORM, so they are stamped for delta sync like any other write.
+
+The queue holds at most MOOD_LABEL_MAX_PENDING ids. Entries beyond that, and
+entries in a batch whose commit fails, stay unlabeled and are counted in
+`mood_labels_total`. `mood_label_backlog` reports the entries queued or being
+labeled. On shutdown, drain() labels whatever is still queued.
+"""
+from typing import Callable, List, Optional, Sequence
+import logging
+import queue
+import threading
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..core.metrics import mood_analyzer_duration, mood_label_backlog, mood_labels, timed
+from ..models.journal import JournalEntry
+from ..models.mood import MoodProfile
+from .mood_label_service import label_for_mood, text_analyzer
+
+logger = logging.getLogger(__name__)
+
+
+def label_entries(db: Session, entry_ids: Sequence[uuid.UUID]) -> int:
+    """
+    Label the given entries that are still unlabeled and add their text mood profiles.
+    
+    The one place journal entries get mood labels: the queue and journal
+    imports both call it. The caller commits. Returns the number labeled.
+    """
+    entries = db.scalars(
+        select(JournalEntry).where(JournalEntry.id.in_(entry_ids), JournalEntry.mood_label.is_(None))
+    ).all()
+    for entry in entries:
+        with timed(mood_analyzer_duration, "text"):
+            text_mood = text_analyzer.analyze(entry.content)
+        entry.mood_label = label_for_mood(text_mood)
+        db.add(MoodProfile(
+            user_id=entry.user_id,
+            valence=text_mood['valence'],
+            arousal=text_mood['arousal'],
+            source='text',
+            confidence=text_mood['confidence'],
+            metadata_={
+                'emotions': text_mood.get('emotions', []),
+                'text_length': len(entry.content),
+                'journal_entry_id': str(entry.id)
+            },
+            created_at=entry.created_at
+        ))
+    return len(entries)
+
+
+class MoodLabelQueue:
+    """Bounded queue of journal entry ids and the threads that label them"""
+    
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        batch_wait: float,
+        max_pending: int,
+        session_factory: Optional[Callable] = None
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_pending = max_pending
+        self.session_factory = session_factory or SessionLocal
+        self.backlog = 0
+        self._queue: "queue.Queue[Optional[uuid.UUID]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+    
+    def _start(self) -> None:
+        # Started on first use so importing the app doesn't spawn threads
+        self._threads = [
+            threading.Thread(target=self._work, name=f"mood-label-{n}", daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def _add_backlog(self, amount: int) -> None:
+        self.backlog += amount
+        mood_label_backlog.set(self.backlog)
+    
+    def enqueue(self, entry_id: uuid.UUID) -> bool:
+        """Queue an entry for labeling; False if labeling is off or the queue is full"""
+        with self._lock:
+            if self.workers <= 0:
+                return False
+            if self.backlog >= self.max_pending:
+                mood_labels.labels("dropped").inc()
+                return False
+            if not any(thread.is_alive() for thread in self._threads):
+                self._start()
+            self._add_backlog(1)
+            self._queue.put(entry_id)
+        return True
+    
+    def _next_batch(self) -> Optional[List[uuid.UUID]]:
+        """Block for one id, then collect more for up to batch_wait seconds or batch_size ids; None means stop"""
+        entry_id = self._queue.get()
+        if entry_id is None:
+            return None
+        batch = [entry_id]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            try:
+                entry_id = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if entry_id is None:
+                # Leave the stop marker for this thread's next call
+                self._queue.put(None)
+                break
+            batch.append(entry_id)
+        return batch
+    
+    def _work(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            db = self.session_factory()
+            try:
+                labeled = label_entries(db, batch)
+                db.commit()
+                mood_labels.labels("labeled").inc(labeled)
+            except Exception:
+                logger.exception("Mood labeling failed for %d journal entries", len(batch))
+                db.rollback()
+                mood_labels.labels("failed").inc(len(batch))
+            finally:
+                db.close()
+                with self._lock:
+                    self._add_backlog(-len(batch))
+    
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Label everything queued so far, then stop the workers.
+        
+        Returns False if `timeout` seconds passed first; the remaining entries
+        stay unlabeled. Entries queued afterwards start new workers.
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+            # Stop markers go behind every queued id
+            for _ in threads:
+                self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        return not any(thread.is_alive() for thread in threads)
+
+
+mood_label_queue = MoodLabelQueue(
+    workers=settings.MOOD_LABEL_WORKERS,
+    batch_size=settings.MOOD_LABEL_BATCH_SIZE,
+    batch_wait=settings.MOOD_LABEL_BATCH_WAIT_SECONDS,
+    max_pending=settings.MOOD_LABEL_MAX_PENDING,
+)
@@ -0,0 +1,23 @@
+"""
+Mood labels for journal entries
+
+A label summarizes the text analyzer's valence for an entry: 'positive',
+'negative' or 'neutral'.
+"""
+from typing import Dict
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from services.mood.text_analyzer import TextMoodAnalyzer
+
+text_analyzer = TextMoodAnalyzer()
+
+
+def label_for_mood(text_mood: Dict[str, float]) -> str:
+    """Label for an analyzed mood"""
+    if text_mood['valence'] > 0.5:
+        return 'positive'
+    if text_mood['valence'] < -0.5:
+        return 'negative'
+    return 'neutral'
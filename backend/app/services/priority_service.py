@@ -0,0 +1,236 @@
+"""
+Priority engine: extended Eisenhower scoring with a mood adjustment
+
+Every open task carries a materialized priority_score (0-100) combining
+urgency (time left once its estimate is subtracted, decaying over days) and
+importance (by source), with a small bonus for work already in progress.
+Closed tasks score CLOSED_SCORE so the (user_id, priority_score) index never
+has to skip over them.
+
+Scores are recomputed when a task's due date, estimate, source or status
+changes (ORM flushes below, bulk writes in async_task_service) and by
+refresh_priority_scores, which re-scores open tasks as their deadlines
+approach. GET /tasks/next reads the top candidates straight off the index and
+reorders them by how well each task's effort fits the user's latest fused mood.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import bindparam, event, inspect, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.mood import MoodProfile
+from ..models.task import Task, TaskSource, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+CLOSED_SCORE = -1.0
+CLOSED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+OPEN_STATUSES = (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+SOURCE_IMPORTANCE = {
+    TaskSource.BRIGHTSPACE: 1.0,  # graded coursework
+    TaskSource.CALENDAR: 0.8,
+    TaskSource.MANUAL: 0.6,
+}
+URGENCY_WEIGHT = 0.65
+IMPORTANCE_WEIGHT = 0.35
+IN_PROGRESS_BONUS = 5.0
+NO_DEADLINE_URGENCY = 0.0  # below any dated task
+DEFAULT_ESTIMATE_MINUTES = 60
+# Fields the stored score depends on
+SCORE_INPUTS = ("due_date", "estimated_time", "source", "status")
+
+# Mood may move a candidate's score by at most this fraction either way
+MOOD_WEIGHT = 0.15
+MAX_EFFORT_MINUTES = 240
+MOOD_MAX_AGE = timedelta(days=1)
+CANDIDATE_FACTOR = 3
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def urgency(due_date: Optional[datetime], estimated_time: Optional[int], now: datetime) -> float:
+    """1.0 once the task can no longer be finished on time, 1/(1 + days of slack) before that"""
+    if due_date is None:
+        return NO_DEADLINE_URGENCY
+    minutes = estimated_time or DEFAULT_ESTIMATE_MINUTES
+    slack_hours = (_as_utc(due_date) - now).total_seconds() / 3600 - minutes / 60
+    return 1.0 if slack_hours <= 0 else 1.0 / (1.0 + slack_hours / 24)
+
+
+def compute_priority(
+    due_date: Optional[datetime],
+    estimated_time: Optional[int],
+    source: Optional[TaskSource],
+    status: Optional[TaskStatus],
+    now: Optional[datetime] = None
+) -> float:
+    """Stored priority score for a task with these fields"""
+    if status in CLOSED_STATUSES:
+        return CLOSED_SCORE
+    now = now or datetime.now(timezone.utc)
+    importance = SOURCE_IMPORTANCE.get(source, SOURCE_IMPORTANCE[TaskSource.MANUAL])
+    score = 100 * (URGENCY_WEIGHT * urgency(due_date, estimated_time, now) + IMPORTANCE_WEIGHT * importance)
+    if status == TaskStatus.IN_PROGRESS:
+        score += IN_PROGRESS_BONUS
+    return round(score, 3)
+
+
+def score_values(values: dict, now: Optional[datetime] = None) -> float:
+    """compute_priority for a dict of column values, using column defaults for missing ones"""
+    return compute_priority(
+        values.get("due_date"), values.get("estimated_time"),
+        values.get("source") or TaskSource.MANUAL, values.get("status") or TaskStatus.PENDING, now
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _rescore_tasks(session, flush_context, instances):
+    now = datetime.now(timezone.utc)
+    for obj in session.new:
+        if isinstance(obj, Task):
+            obj.priority_score = compute_priority(
+                obj.due_date, obj.estimated_time, obj.source or TaskSource.MANUAL,
+                obj.status or TaskStatus.PENDING, now
+            )
+    for obj in session.dirty:
+        if isinstance(obj, Task) and any(inspect(obj).attrs[name].history.has_changes() for name in SCORE_INPUTS):
+            obj.priority_score = compute_priority(obj.due_date, obj.estimated_time, obj.source, obj.status, now)
+
+
+def rescore_statement():
+    """Executemany UPDATE setting priority_score by id ({"task_id", "score"} rows), leaving updated_at alone"""
+    table = Task.__table__
+    return (
+        table.update()
+        .where(table.c.id == bindparam("task_id"))
+        .values(priority_score=bindparam("score"), updated_at=table.c.updated_at)
+    )
+
+
+def rescored(rows: Iterable, now: Optional[datetime] = None) -> List[dict]:
+    """rescore_statement parameters for the rows whose stored score is out of date"""
+    now = now or datetime.now(timezone.utc)
+    changes = []
+    for row in rows:
+        score = compute_priority(row.due_date, row.estimated_time, row.source, row.status, now)
+        if row.priority_score is None or abs(score - row.priority_score) >= 0.01:
+            changes.append({"task_id": row.id, "score": score})
+    return changes
+
+
+def mood_energy(mood: MoodProfile) -> float:
+    """0 (drained) to 1 (energized) from valence and arousal"""
+    return 0.5 * (mood.valence + 1) / 2 + 0.5 * mood.arousal
+
+
+def mood_adjusted(score: float, estimated_time: Optional[int], energy: Optional[float]) -> float:
+    """Nudge a score up for tasks whose effort suits the user's energy, down otherwise"""
+    if energy is None:
+        return score
+    effort = min(estimated_time or DEFAULT_ESTIMATE_MINUTES, MAX_EFFORT_MINUTES) / MAX_EFFORT_MINUTES
+    fit = 1 - abs(energy - effort)
+    return round(score * (1 - MOOD_WEIGHT + 2 * MOOD_WEIGHT * fit), 3)
+
+
+async def get_next_tasks(db: AsyncSession, user_id: uuid.UUID, k: int = 5) -> List[dict]:
+    """The `k` open tasks to do next, as {"task", "priority_score", "score"}, best first"""
+    candidates = list(await db.scalars(
+        select(Task)
+        .where(Task.user_id == user_id, Task.priority_score >= 0)
+        .order_by(Task.priority_score.desc(), Task.id)
+        .limit(max(k * CANDIDATE_FACTOR, 10))
+    ))
+    if not candidates:
+        return []
+    
+    mood = await db.scalar(
+        select(MoodProfile)
+        .where(
+            MoodProfile.user_id == user_id,
+            MoodProfile.source == "fused",
+            MoodProfile.created_at >= datetime.now(timezone.utc) - MOOD_MAX_AGE
+        )
+        .order_by(MoodProfile.created_at.desc())
+        .limit(1)
+    )
+    energy = mood_energy(mood) if mood is not None else None
+    ranked = sorted(
+        (
+            {"task": task, "priority_score": task.priority_score,
+             "score": mood_adjusted(task.priority_score, task.estimated_time, energy)}
+            for task in candidates
+        ),
+        key=lambda item: item["score"],
+        reverse=True
+    )
+    return ranked[:k]
+
+
+def refresh_priority_scores(
+    session_factory: Optional[Callable] = None,
+    horizon_days: Optional[float] = None,
+    chunk_size: int = 1000
+) -> int:
+    """
+    Re-score open tasks whose urgency has drifted since they were last written.
+    
+    Walks open tasks due between a day ago and `horizon_days` from now (every
+    open task when `horizon_days` is None), committing after each chunk, and
+    rewrites only scores that moved. Only priority_score is written: updated_at,
+    change sequences and ETags are left alone. Returns the number of rows rescored.
+    """
+    session_factory = session_factory or SessionLocal
+    now = datetime.now(timezone.utc)
+    query = select(
+        Task.id, Task.due_date, Task.estimated_time, Task.source, Task.status, Task.priority_score
+    ).where(Task.status.in_(OPEN_STATUSES))
+    if horizon_days is None:
+        key_columns = (Task.id,)
+    else:
+        key_columns = (Task.due_date, Task.id)
+        query = query.where(Task.due_date.between(now - timedelta(days=1), now + timedelta(days=horizon_days)))
+    query = query.order_by(*key_columns).limit(chunk_size)
+    
+    total = 0
+    last_key = None
+    while True:
+        db = session_factory()
+        try:
+            chunk = query
+            if last_key is not None:
+                chunk = chunk.where(tuple_(*key_columns) > last_key)
+            rows = db.execute(chunk).all()
+            if not rows:
+                return total
+            
+            changes = rescored(rows, now)
+            if changes:
+                db.execute(rescore_statement(), changes)
+                db.commit()
+                total += len(changes)
+            last = rows[-1]
+            last_key = (last.id,) if horizon_days is None else (last.due_date, last.id)
+        finally:
+            db.close()
+
+
+async def refresh_periodically(interval: float) -> None:
+    """Run refresh_priority_scores every `interval` seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            rescored = await asyncio.to_thread(
+                refresh_priority_scores, horizon_days=settings.PRIORITY_REFRESH_HORIZON_DAYS
+            )
+            logger.info("Refreshed %d task priority scores", rescored)
+        except Exception:
+            logger.exception("Priority score refresh failed")
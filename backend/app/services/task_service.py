@@ -1,6 +1,7 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, tuple_
+from datetime import datetime
 from ..models.task import Task
 from ..schemas.task import TaskCreate, TaskUpdate
 import uuid
@@ -11,15 +12,18 @@ def get_user_tasks(
     user_id: uuid.UUID,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    after: Optional[Tuple[datetime, uuid.UUID]] = None
 ) -> List[Task]:
-    """Get all tasks for a user with optional filtering"""
+    """Get a user's tasks in creation order, optionally after a (created_at, id) key"""
     query = db.query(Task).filter(Task.user_id == user_id)
     
     if status:
         query = query.filter(Task.status == status)
+    if after:
+        query = query.filter(tuple_(Task.created_at, Task.id) > after)
     
-    return query.offset(skip).limit(limit).all()
+    return query.order_by(Task.created_at, Task.id).offset(skip).limit(limit).all()
 
 
 def get_task_by_id(db: Session, task_id: uuid.UUID, user_id: uuid.UUID) -> Optional[Task]:
@@ -38,6 +42,20 @@ def create_task(db: Session, task_data: TaskCreate, user_id: uuid.UUID) -> Task:
     return new_task
 
 
+def create_tasks(db: Session, tasks_data: List[TaskCreate], user_id: uuid.UUID) -> List[Task]:
+    """Create several tasks in one transaction"""
+    new_tasks = [Task(**task_data.model_dump(), user_id=user_id) for task_data in tasks_data]
+    if not new_tasks:
+        return []
+    db.add_all(new_tasks)
+    db.flush()
+    ids = [task.id for task in new_tasks]
+    db.commit()
+    # One SELECT reloads every task instead of a refresh per row
+    tasks_by_id = {task.id: task for task in db.query(Task).filter(Task.id.in_(ids))}
+    return [tasks_by_id[task_id] for task_id in ids]
+
+
 def update_task(
     db: Session,
     task_id: uuid.UUID,
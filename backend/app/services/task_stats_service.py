@@ -0,0 +1,112 @@
+"""
+Task dashboard aggregates
+
+Counts by status and source, the overdue count and the estimated minutes due on
+each of the next few days come from one GROUP BY over the user's tasks. Day
+buckets are the user's local calendar days: their UTC boundaries are computed
+here (so DST changes are handled the same on every database) and bucketed with
+a CASE in the query.
+
+Results are cached per user, keyed by the user's task change version (one
+primary-key lookup, see core/changes.py), so any committed task write from any
+worker invalidates them. Entries also expire after TASK_STATS_CACHE_TTL_SECONDS
+because "overdue" moves with the clock.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import uuid
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.changes import get_change_version
+from ..core.config import settings
+from ..models.task import Task, TaskSource, TaskStatus
+from .priority_service import OPEN_STATUSES
+
+stats_cache = TTLCache(maxsize=settings.TASK_STATS_CACHE_SIZE, ttl=settings.TASK_STATS_CACHE_TTL_SECONDS)
+
+
+def user_zone(name: Optional[str]) -> ZoneInfo:
+    """The user's timezone, UTC if unset or unknown"""
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def day_boundaries(zone: ZoneInfo, days: int, now: datetime) -> List[datetime]:
+    """UTC instants at which each of the next `days` local days (today first) starts, plus the end of the last"""
+    today = now.astimezone(zone).date()
+    return [
+        datetime.combine(today + timedelta(days=offset), time.min, tzinfo=zone).astimezone(timezone.utc)
+        for offset in range(days + 1)
+    ]
+
+
+def stats_query(user_id: uuid.UUID, boundaries: List[datetime], now: datetime):
+    """One row per (status, source, upcoming day) with its task count, estimate total and overdue count"""
+    is_open = Task.status.in_(OPEN_STATUSES)
+    day = case(
+        *(
+            (is_open & (Task.due_date >= start) & (Task.due_date < end), offset)
+            for offset, (start, end) in enumerate(zip(boundaries, boundaries[1:]))
+        ),
+        else_=None
+    ).label("day")
+    return (
+        select(
+            Task.status,
+            Task.source,
+            day,
+            func.count().label("tasks"),
+            func.coalesce(func.sum(Task.estimated_time), 0).label("minutes"),
+            func.coalesce(func.sum(case((is_open & (Task.due_date < now), 1), else_=0)), 0).label("overdue"),
+        )
+        .where(Task.user_id == user_id)
+        .group_by(Task.status, Task.source, day)
+    )
+
+
+def fold_stats(rows, today: date, days: int, zone: ZoneInfo, now: datetime) -> dict:
+    """Response body from the stats_query rows; upcoming[0] is today, including tasks already past due"""
+    stats = {
+        "total": 0,
+        "by_status": {status.value: 0 for status in TaskStatus},
+        "by_source": {source.value: 0 for source in TaskSource},
+        "overdue": 0,
+        "upcoming": [
+            {"date": today + timedelta(days=offset), "tasks": 0, "estimated_minutes": 0}
+            for offset in range(days)
+        ],
+        "timezone": zone.key,
+        "generated_at": now,
+    }
+    for row in rows:
+        stats["total"] += row.tasks
+        stats["by_status"][(row.status or TaskStatus.PENDING).value] += row.tasks
+        stats["by_source"][(row.source or TaskSource.MANUAL).value] += row.tasks
+        stats["overdue"] += row.overdue
+        if row.day is not None:
+            stats["upcoming"][row.day]["tasks"] += row.tasks
+            stats["upcoming"][row.day]["estimated_minutes"] += row.minutes
+    return stats
+
+
+async def get_task_stats(db: AsyncSession, user_id: uuid.UUID, timezone_name: Optional[str], days: int = 7) -> dict:
+    """Dashboard aggregates for a user's tasks, from the cache while no task has been written"""
+    zone = user_zone(timezone_name)
+    key = (user_id, zone.key, days)
+    version = await get_change_version(db, user_id, "tasks")
+    cached = stats_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    now = datetime.now(timezone.utc)
+    boundaries = day_boundaries(zone, days, now)
+    rows = await db.execute(stats_query(user_id, boundaries, now))
+    stats = fold_stats(rows, now.astimezone(zone).date(), days, zone, now)
+    stats_cache.set(key, (version, stats))
+    return stats
@@ -0,0 +1,118 @@
+"""
+Benchmark: sync (threadpool) vs async database stack
+
+Serves the same task listing through a sync `def` route (get_db + task_service)
+and an `async def` route (get_async_db + async_task_service), then drives each
+with N concurrent clients and reports requests/sec and p99 latency.
+
+Usage:
+    python benchmarks/bench_async_db.py
+    python benchmarks/bench_async_db.py --clients 50 200 1000 --requests 10
+
+Point DATABASE_URL at Postgres to benchmark the real deployment; the default is
+a throwaway SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import Base, SessionLocal, async_engine, engine, get_async_db, get_db
+from app.models import Task, User
+from app.services import async_task_service, task_service
+
+
+def seed(task_count: int) -> uuid.UUID:
+    """Create a fresh schema with one user owning `task_count` tasks"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", hashed_password="x", preferences={}, consents={})
+        db.add(user)
+        db.flush()
+        db.add_all(Task(user_id=user.id, title=f"Task {i}") for i in range(task_count))
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def build_app(user_id: uuid.UUID) -> FastAPI:
+    """Minimal app exposing the sync and async stacks side by side (no auth)"""
+    app = FastAPI()
+
+    @app.get("/sync/tasks")
+    def sync_tasks(db: Session = Depends(get_db)):
+        return [task.id for task in task_service.get_user_tasks(db, user_id, limit=20)]
+
+    @app.get("/async/tasks")
+    async def async_tasks(db: AsyncSession = Depends(get_async_db)):
+        tasks = await async_task_service.get_user_tasks(db, user_id, limit=20)
+        return [task.id for task in tasks]
+
+    return app
+
+
+async def run_load(app: FastAPI, path: str, clients: int, requests_per_client: int) -> dict:
+    """Run `clients` concurrent clients, each issuing requests back to back"""
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def run_all(app: FastAPI, client_counts: list, requests_per_client: int):
+    """Alternate stacks at each concurrency level inside a single event loop"""
+    print(f"{'stack':<6} {'clients':>8} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for clients in client_counts:
+        for stack in ("sync", "async"):
+            result = await run_load(app, f"/{stack}/tasks", clients, requests_per_client)
+            print(
+                f"{stack:<6} {clients:>8} {result['rps']:>10.1f} "
+                f"{result['p50_ms']:>10.1f} {result['p99_ms']:>10.1f}"
+            )
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--requests", type=int, default=5, help="requests per client")
+    parser.add_argument("--tasks", type=int, default=200, help="tasks seeded for the user")
+    args = parser.parse_args()
+
+    app = build_app(seed(args.tasks))
+    asyncio.run(run_all(app, args.clients, args.requests))
+
+
+if __name__ == "__main__":
+    main()
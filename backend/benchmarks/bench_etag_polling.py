@@ -0,0 +1,100 @@
+"""
+Benchmark: polling GET /tasks with and without If-None-Match
+
+Seeds --tasks tasks, then polls the first page --polls times, once as a client
+that always downloads the list and once as a client that sends back the last
+ETag. Every --write-every polls a task is updated, so the conditional client
+sees a mix of 304s and full responses. Prints body bytes, process CPU time and
+wall time for each client.
+
+Usage:
+    python benchmarks/bench_etag_polling.py
+    python benchmarks/bench_etag_polling.py --tasks 500 --polls 2000 --write-every 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.main import app
+
+API = settings.API_V1_PREFIX
+CREDENTIALS = {"email": "bench@example.com", "password": "benchmark-password"}
+
+
+async def poll(client: httpx.AsyncClient, headers: dict, task_id: str, args, conditional: bool):
+    body_bytes = 0
+    not_modified = 0
+    etag = None
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for n in range(args.polls):
+        if n and n % args.write_every == 0:
+            response = await client.put(f"{API}/tasks/{task_id}", json={"title": f"Edit {n}"}, headers=headers)
+            response.raise_for_status()
+        request_headers = {**headers, "If-None-Match": etag} if conditional and etag else headers
+        response = await client.get(f"{API}/tasks", params={"limit": args.limit}, headers=request_headers)
+        if response.status_code == 304:
+            not_modified += 1
+        else:
+            response.raise_for_status()
+            etag = response.headers["ETag"]
+        body_bytes += len(response.content)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    label = "If-None-Match" if conditional else "always fetch"
+    print(
+        f"{label:<14} {body_bytes / 1024:>10.0f} {cpu * 1000 / args.polls:>12.2f} "
+        f"{wall * 1000 / args.polls:>12.2f} {not_modified:>6}"
+    )
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.post(f"{API}/auth/register", json=CREDENTIALS)
+        token = (await client.post(f"{API}/auth/login", json=CREDENTIALS)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        response = await client.post(
+            f"{API}/tasks/batch",
+            json={"tasks": [{"title": f"Task {i}", "description": "x" * 80} for i in range(args.tasks)]},
+            headers=headers
+        )
+        response.raise_for_status()
+        task_id = response.json()["results"][0]["id"]
+        
+        print(f"{args.polls} polls of {args.limit} tasks, one write every {args.write_every} polls")
+        print(f"{'client':<14} {'body KiB':>10} {'CPU ms/poll':>12} {'wall ms/poll':>12} {'304s':>6}")
+        await poll(client, headers, task_id, args, conditional=False)
+        await poll(client, headers, task_id, args, conditional=True)
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200, help="tasks to seed (at most 1000)")
+    parser.add_argument("--limit", type=int, default=100, help="page size requested by each poll")
+    parser.add_argument("--polls", type=int, default=1000, help="GET requests per client")
+    parser.add_argument("--write-every", type=int, default=100, help="update a task after this many polls")
+    args = parser.parse_args()
+    
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: journal storage and throughput with and without content compression
+
+Seeds --rows journal entries over --users users, once with
+JOURNAL_COMPRESS_MIN_BYTES=0 (stored as written) and once with --min-bytes,
+into a freshly created journal table each time. About a third of the entries are long
+(400-3000 words); words are drawn from a 3000-word vocabulary with English-like
+(Zipf) frequencies, so they compress about as well as real prose. For each run
+it prints the database and stored content size, the insert rate, and for one
+user: GET /journal/export of every entry (decompressing them all), the first
+page of GET /journal and a search.
+
+Usage:
+    python benchmarks/bench_journal_compression.py
+    python benchmarks/bench_journal_compression.py --rows 200000 --users 20 --min-bytes 512
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import string
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.core.security import create_access_token
+from app.main import app
+from app.models.journal import JournalEntry
+from app.models.user import User
+
+API = f"{settings.API_V1_PREFIX}/journal"
+
+
+def vocabulary(rng: random.Random, size: int = 3000) -> list:
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9))) for _ in range(size)]
+
+
+def seed(rows: int, users: int) -> tuple:
+    """Fresh database with `rows` entries; returns (first user id, seconds spent inserting)"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    words = vocabulary(rng)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    
+    def content():
+        count = rng.randint(400, 3000) if rng.random() < 0.3 else rng.randint(30, 120)
+        return " ".join(rng.choices(words, weights, k=count)).capitalize() + "."
+    
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"user{n}@example.com", "hashed_password": "x"}
+            for n, user_id in enumerate(user_ids)
+        ])
+    inserting = 0.0
+    for offset in range(0, rows, 5000):
+        batch = [
+            {"id": uuid.uuid4(), "user_id": user_ids[n % users], "content": content()}
+            for n in range(offset, min(rows, offset + 5000))
+        ]
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(insert(JournalEntry), batch)
+        inserting += time.perf_counter() - start
+    return user_ids[0], inserting
+
+
+def storage() -> tuple:
+    """(bytes in use by the database, stored content bytes)"""
+    with engine.connect() as conn:
+        database = conn.scalar(text(
+            "SELECT (page_count - freelist_count) * page_size "
+            "FROM pragma_page_count(), pragma_freelist_count(), pragma_page_size()"
+        ))
+        content = conn.scalar(text("SELECT sum(length(CAST(content AS BLOB))) FROM journal_entries"))
+    return database, content
+
+
+async def measure(client: httpx.AsyncClient, user_id: uuid.UUID, repeat: int) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    
+    async def timed(url, params):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            times.append(time.perf_counter() - start)
+        return statistics.median(times), response
+    
+    results = {}
+    results["export"], response = await timed(f"{API}/export", {})
+    results["export_bytes"] = len(response.content)
+    results["page"], _ = await timed(API, {"limit": 100})
+    results["search"], _ = await timed(f"{API}/search", {"q": "the*"})
+    return results
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    print(f"{args.rows} entries over {args.users} users")
+    print(
+        f"{'min bytes':>9} {'database':>10} {'content':>10} {'insert rows/s':>14} "
+        f"{'export MB/s':>12} {'page p50':>9} {'search p50':>11}"
+    )
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        for min_bytes in (0, args.min_bytes):
+            settings.JOURNAL_COMPRESS_MIN_BYTES = min_bytes
+            user_id, inserting = seed(args.rows, args.users)
+            database, content = storage()
+            results = await measure(client, user_id, args.repeat)
+            print(
+                f"{min_bytes:>9} {database / 2**20:>8.1f}MB {content / 2**20:>8.1f}MB "
+                f"{args.rows / inserting:>14.0f} {results['export_bytes'] / 2**20 / results['export']:>12.1f} "
+                f"{results['page'] * 1000:>7.1f}ms {results['search'] * 1000:>9.1f}ms"
+            )
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="journal entries to seed per run")
+    parser.add_argument("--users", type=int, default=10, help="users the entries are spread over")
+    parser.add_argument("--min-bytes", type=int, default=1024, help="compression threshold for the second run")
+    parser.add_argument("--repeat", type=int, default=5, help="requests per measurement")
+    args = parser.parse_args()
+    
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
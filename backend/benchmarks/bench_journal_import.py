@@ -0,0 +1,131 @@
+"""
+Benchmark: POST /journal/import vs one POST /journal per entry
+
+Uploads generated NDJSON bodies of each --megabytes size to /journal/import as a
+stream (the body is never held in memory) and reports rows/s and the peak
+Python memory allocated during the upload, which should stay flat as the upload
+grows. The mood labeling that would follow each import in the background is
+deferred and timed separately, then --baseline-rows entries are created one
+POST /journal at a time for comparison.
+
+Usage:
+    python benchmarks/bench_journal_import.py
+    python benchmarks/bench_journal_import.py --megabytes 10 100 500 --baseline-rows 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.core.security import create_access_token
+from app.main import app
+from app.models.user import User
+from app.services import journal_import_service
+from app.services.journal_import_service import label_imported_entries
+
+WORDS = "today I felt happy tired calm stressed and then we went for a walk after class notes".split()
+
+
+def seed() -> uuid.UUID:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user_id, email="bench@example.com", hashed_password="x"))
+    return user_id
+
+
+def entry_line(rng: random.Random, created_at: datetime) -> bytes:
+    content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+    return (json.dumps({"content": content, "created_at": created_at.isoformat()}) + "\n").encode()
+
+
+async def ndjson_body(megabytes: int, counter: list):
+    """About `megabytes` of entries, yielded 64 KiB at a time"""
+    rng = random.Random(megabytes)
+    created_at = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    remaining = megabytes * 1024 * 1024
+    chunk = bytearray()
+    while remaining > 0:
+        line = entry_line(rng, created_at)
+        created_at += timedelta(minutes=37)
+        counter[0] += 1
+        remaining -= len(line)
+        chunk += line
+        if len(chunk) >= 65536:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+async def run(args, user_id: uuid.UUID):
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    url = f"{settings.API_V1_PREFIX}/journal"
+    # Queue labeling instead of running it inside the request, to time it on its own
+    pending_labeling = []
+    journal_import_service.label_imported_entries = pending_labeling.append
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=3600) as client:
+        print(f"{'upload':>8} {'rows':>9} {'rows/s':>9} {'peak memory':>12}")
+        for megabytes in args.megabytes:
+            counter = [0]
+            tracemalloc.start()
+            start = time.perf_counter()
+            response = await client.post(
+                f"{url}/import", content=ndjson_body(megabytes, counter),
+                headers={**headers, "Content-Type": "application/x-ndjson"}
+            )
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            response.raise_for_status()
+            print(f"{megabytes:>6}MB {counter[0]:>9} {counter[0] / elapsed:>9.0f} {peak / 2**20:>10.1f}MB")
+        
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for _ in range(args.baseline_rows):
+            line = json.loads(entry_line(rng, datetime.now(timezone.utc)))
+            (await client.post(url, json={"content": line["content"]}, headers=headers)).raise_for_status()
+        one_by_one = args.baseline_rows / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    labeled = 0
+    for job_id in pending_labeling:
+        labeled += await asyncio.to_thread(label_imported_entries, job_id)
+    labeling = time.perf_counter() - start
+    print(f"mood labeling: {labeled / labeling:9.0f} rows/s")
+    print(f"POST /journal one at a time: {one_by_one:9.0f} rows/s")
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=int, nargs="+", default=[5, 25, 100], help="upload sizes to import")
+    parser.add_argument("--baseline-rows", type=int, default=500, help="entries to create one request at a time")
+    args = parser.parse_args()
+    
+    user_id = seed()
+    asyncio.run(run(args, user_id))
+
+
+if __name__ == "__main__":
+    main()
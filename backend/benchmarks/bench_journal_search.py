@@ -0,0 +1,135 @@
+"""
+Benchmark: GET /journal/search vs downloading the journal and filtering it
+
+Seeds --rows journal entries of 40-80 words spread over --users users. Words
+come from a small vocabulary so common words match most of a user's entries
+and rare words few. What a search costs depends on how many entries the user
+has, so the default of 10k entries per user matches a 10M-entry database with
+1000 users. For one user it times GET /journal/search (ranked, with snippets)
+for a mix of queries and compares that with paging through GET /journal and
+filtering on the client. Prints p50/p95 latency per query.
+
+Usage:
+    python benchmarks/bench_journal_search.py
+    python benchmarks/bench_journal_search.py --rows 10000000 --users 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.core.security import create_access_token
+from app.main import app
+from app.models.journal import JournalEntry
+from app.models.user import User
+
+API = f"{settings.API_V1_PREFIX}/journal"
+COMMON = [
+    "today", "felt", "tired", "happy", "class", "friends", "walk", "work", "sleep", "coffee", "rain", "music",
+    "family", "dinner", "study", "morning", "evening", "week", "talked", "long",
+]
+RARE = ["lighthouse", "violin", "marathon", "volcano", "graduation", "hospital"]
+QUERIES = ["coffee", "lighthouse", "tired morning", "grad*"]
+
+
+def seed(rows: int, users: int) -> uuid.UUID:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(13)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    
+    def words(count):
+        return " ".join(rng.choice(RARE) if rng.random() < 0.002 else rng.choice(COMMON) for _ in range(count))
+    
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"user{n}@example.com", "hashed_password": "x"}
+            for n, user_id in enumerate(user_ids)
+        ])
+        for offset in range(0, rows, 50000):
+            conn.execute(insert(JournalEntry), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_ids[n % users],
+                    "content": words(rng.randint(40, 80)).capitalize() + ".",
+                }
+                for n in range(offset, min(rows, offset + 50000))
+            ])
+    return user_ids[0]
+
+
+async def timed(func, repeat: int) -> list:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+async def run(args, user_id: uuid.UUID):
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def search(q):
+            response = await client.get(f"{API}/search", params={"q": q, "limit": 20}, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        
+        async def list_and_filter(q):
+            words = q.replace("*", "").split()
+            matches, params = [], {"limit": 1000}
+            while True:
+                response = await client.get(API, params=params, headers=headers)
+                response.raise_for_status()
+                matches += [
+                    entry for entry in response.json()
+                    if all(word in entry["content"].lower() for word in words)
+                ]
+                if "X-Next-Cursor" not in response.headers:
+                    return matches[:20]
+                params["after"] = response.headers["X-Next-Cursor"]
+        
+        print(f"{args.rows} entries over {args.users} users; {args.repeat} runs per query")
+        print(f"{'query':<16} {'hits':>5} {'search p50':>11} {'p95':>7} {'list+filter p50':>16} {'max':>7}")
+        for q in QUERIES:
+            hits = len(await search(q))
+            searched = await timed(lambda: search(q), args.repeat)
+            filtered = await timed(lambda: list_and_filter(q), max(1, args.repeat // 10))
+            print(
+                f"{q:<16} {hits:>5} {statistics.median(searched):>9.2f}ms "
+                f"{statistics.quantiles(searched, n=20)[-1]:>5.2f}ms "
+                f"{statistics.median(filtered):>14.2f}ms {max(filtered):>5.2f}ms"
+            )
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="journal entries to seed")
+    parser.add_argument("--users", type=int, default=100, help="users the entries are spread over")
+    parser.add_argument("--repeat", type=int, default=50, help="searches per query")
+    args = parser.parse_args()
+    
+    user_id = seed(args.rows, args.users)
+    asyncio.run(run(args, user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: task-list latency during a login storm
+
+Polls GET /tasks with a few concurrent clients, first on a quiet server and then
+while logins arrive at a fixed rate (100/s by default). With bcrypt running in
+the dedicated password pool the task-list p99 should stay flat; logins beyond
+PASSWORD_HASH_MAX_PENDING are answered with 503 instead of queueing.
+
+Usage:
+    python benchmarks/bench_login_burst.py
+    python benchmarks/bench_login_burst.py --rate 100 --seconds 5 --pollers 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.main import app
+
+API = settings.API_V1_PREFIX
+CREDENTIALS = {"email": "bench@example.com", "password": "benchmark-password"}
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+async def poll_tasks(client: httpx.AsyncClient, headers: dict, deadline: float, latencies: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(f"{API}/tasks", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        response.raise_for_status()
+
+
+async def login_storm(client: httpx.AsyncClient, rate: float, deadline: float, outcomes: Counter):
+    async def login():
+        response = await client.post(f"{API}/auth/login", json=CREDENTIALS)
+        outcomes[response.status_code] += 1
+
+    in_flight = []
+    while time.perf_counter() < deadline:
+        in_flight.append(asyncio.create_task(login()))
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*in_flight)
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        await client.post(f"{API}/auth/register", json=CREDENTIALS)
+        token = (await client.post(f"{API}/auth/login", json=CREDENTIALS)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for i in range(50):
+            await client.post(f"{API}/tasks", json={"title": f"Task {i}"}, headers=headers)
+
+        print(f"{'phase':<14} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9}")
+        for phase in ("quiet", "login storm"):
+            latencies, outcomes = [], Counter()
+            deadline = time.perf_counter() + args.seconds
+            jobs = [poll_tasks(client, headers, deadline, latencies) for _ in range(args.pollers)]
+            if phase == "login storm":
+                jobs.append(login_storm(client, args.rate, deadline, outcomes))
+            await asyncio.gather(*jobs)
+            print(
+                f"{phase:<14} {len(latencies):>9} "
+                f"{percentile(latencies, 0.5):>9.1f} {percentile(latencies, 0.99):>9.1f}"
+            )
+            if outcomes:
+                print(f"  login responses: {dict(outcomes)}")
+
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=100, help="logins per second")
+    parser.add_argument("--seconds", type=float, default=5, help="duration of each phase")
+    parser.add_argument("--pollers", type=int, default=4, help="concurrent task-list clients")
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
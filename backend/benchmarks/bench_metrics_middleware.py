@@ -0,0 +1,85 @@
+"""
+Benchmark: per-request overhead of MetricsMiddleware
+
+Drives a trivial ASGI app directly (no HTTP client, no routing) with and without
+the middleware and reports the difference per request, so only the metrics
+bookkeeping is measured. Requests cycle over a handful of route templates as
+FastAPI would set them in scope["route"]. Overhead should stay within a few
+microseconds per request.
+
+Usage:
+    python benchmarks/bench_metrics_middleware.py
+    python benchmarks/bench_metrics_middleware.py --requests 500000 --routes 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from app.core.metrics import MetricsMiddleware, registry
+
+
+class Route:
+    def __init__(self, path: str):
+        self.path = path
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def drive(app, scopes: list, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % len(scopes)]), receive, send)
+    return time.perf_counter() - start
+
+
+async def run(args):
+    scopes = [
+        {"type": "http", "method": "GET", "path": f"/api/v1/r{n}/123", "route": Route(f"/api/v1/r{n}/{{id}}")}
+        for n in range(args.routes)
+    ]
+    middleware = MetricsMiddleware(endpoint)
+    
+    # Warm up both paths (series creation, bytecode caches)
+    await drive(endpoint, scopes, 10000)
+    await drive(middleware, scopes, 10000)
+    
+    baseline = min([await drive(endpoint, scopes, args.requests) for _ in range(3)])
+    measured = min([await drive(middleware, scopes, args.requests) for _ in range(3)])
+    
+    overhead_us = (measured - baseline) / args.requests * 1e6
+    print(f"{args.requests} requests over {args.routes} routes (best of 3)")
+    print(f"  bare app:        {baseline / args.requests * 1e6:.2f} us/request")
+    print(f"  with middleware: {measured / args.requests * 1e6:.2f} us/request")
+    print(f"  overhead:        {overhead_us:.2f} us/request")
+    
+    start = time.perf_counter()
+    text = registry.render()
+    print(f"  /metrics render: {(time.perf_counter() - start) * 1000:.2f} ms ({len(text.splitlines())} lines)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000, help="requests per timed run")
+    parser.add_argument("--routes", type=int, default=10, help="distinct route templates")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: POST /journal latency with the mood labeling queue off and on
+
+Creates --entries journal entries one request at a time, first with labeling
+off and then with each --workers count, and prints POST /journal p50/p95. With
+labeling on, the entries are labeled by the worker threads while the requests
+continue, so the latency should match the run with labeling off. The time the
+queue takes to finish afterwards (drain) and the overall labeling rate are
+reported as well.
+
+Usage:
+    python benchmarks/bench_mood_labeling.py
+    python benchmarks/bench_mood_labeling.py --entries 5000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from sqlalchemy import func, insert, select
+
+from app.core.config import settings
+from app.core.database import Base, SessionLocal, async_engine, engine
+from app.core.passwords import password_hasher
+from app.core.security import create_access_token
+from app.main import app
+from app.models.journal import JournalEntry
+from app.models.user import User
+from app.services.mood_label_queue import mood_label_queue
+
+WORDS = "today I felt happy tired calm stressed and then we went for a walk after class notes".split()
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def seed() -> uuid.UUID:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user_id, email="bench@example.com", hashed_password="x"))
+    return user_id
+
+
+def labeled_count() -> int:
+    with SessionLocal() as db:
+        return db.scalar(select(func.count()).select_from(JournalEntry).where(JournalEntry.mood_label.is_not(None)))
+
+
+async def run(args, user_id: uuid.UUID):
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    rng = random.Random(1)
+    print(f"{'workers':>8} {'POST p50':>9} {'p95':>8} {'drain':>8} {'labels/s':>9}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for workers in [0, *args.workers]:
+            mood_label_queue.workers = workers
+            labeled_before = labeled_count()
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(args.entries):
+                content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+                request_start = time.perf_counter()
+                response = await client.post(f"{settings.API_V1_PREFIX}/journal", json={"content": content}, headers=headers)
+                latencies.append(time.perf_counter() - request_start)
+                response.raise_for_status()
+            drain_start = time.perf_counter()
+            await asyncio.to_thread(mood_label_queue.drain)
+            drained = time.perf_counter() - drain_start
+            labeled = labeled_count() - labeled_before
+            rate = labeled / (time.perf_counter() - start) if workers else 0
+            print(
+                f"{workers:>8} {percentile(latencies, 0.5):>7.2f}ms {percentile(latencies, 0.95):>6.2f}ms "
+                f"{drained * 1000:>6.0f}ms {rate:>9.0f}"
+            )
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000, help="entries to create per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="labeling threads to compare")
+    args = parser.parse_args()
+    
+    user_id = seed()
+    asyncio.run(run(args, user_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: GET /tasks/next from the materialized score vs scoring on read
+
+Seeds one user with --rows tasks (scored as the write path would) and compares
+the average latency of GET /tasks/next?k=5, which reads the top candidates off
+the (user_id, priority_score) index, with loading every open task and scoring
+them in Python. Also times one periodic refresh pass over tasks due within the
+refresh horizon.
+
+Usage:
+    python benchmarks/bench_next_tasks.py
+    python benchmarks/bench_next_tasks.py --rows 200000 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.core.security import create_access_token
+from app.main import app
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.services.priority_service import OPEN_STATUSES, compute_priority, refresh_priority_scores, score_values
+
+
+def seed(rows: int) -> uuid.UUID:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user_id, email="bench@example.com", hashed_password="x"))
+        for offset in range(0, rows, 50000):
+            batch = []
+            for n in range(offset, min(rows, offset + 50000)):
+                values = {
+                    "due_date": now + timedelta(hours=rng.randint(-48, 24 * 120)),
+                    "estimated_time": rng.randint(15, 240),
+                    "status": TaskStatus.COMPLETED if n % 2 else TaskStatus.PENDING,
+                }
+                batch.append({
+                    **values, "id": uuid.uuid4(), "user_id": user_id, "title": f"Task {n}",
+                    "priority_score": score_values(values, now),
+                })
+            conn.execute(insert(Task), batch)
+    return user_id
+
+
+async def score_on_read(user_id: uuid.UUID, k: int):
+    async with AsyncSessionLocal() as db:
+        tasks = await db.scalars(select(Task).where(Task.user_id == user_id, Task.status.in_(OPEN_STATUSES)))
+        now = datetime.now(timezone.utc)
+        return sorted(
+            tasks, key=lambda t: compute_priority(t.due_date, t.estimated_time, t.source, t.status, now),
+            reverse=True
+        )[:k]
+
+
+async def run(args, user_id: uuid.UUID):
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        url = f"{settings.API_V1_PREFIX}/tasks/next"
+        (await client.get(url, params={"k": args.k}, headers=headers)).raise_for_status()
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            (await client.get(url, params={"k": args.k}, headers=headers)).raise_for_status()
+        indexed = (time.perf_counter() - start) / args.requests
+    
+    start = time.perf_counter()
+    for _ in range(max(1, args.requests // 20)):
+        await score_on_read(user_id, args.k)
+    on_read = (time.perf_counter() - start) / max(1, args.requests // 20)
+    
+    start = time.perf_counter()
+    rescored = await asyncio.to_thread(refresh_priority_scores, horizon_days=settings.PRIORITY_REFRESH_HORIZON_DAYS)
+    refresh = time.perf_counter() - start
+    
+    print(f"{args.rows} tasks, half of them open; top {args.k}")
+    print(f"GET /tasks/next (indexed):   {indexed * 1000:8.2f} ms")
+    print(f"score every open task:       {on_read * 1000:8.2f} ms")
+    print(f"refresh pass ({rescored} rescored): {refresh * 1000:8.0f} ms")
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="tasks to seed for the user")
+    parser.add_argument("--requests", type=int, default=100, help="GET /tasks/next calls to average over")
+    parser.add_argument("-k", type=int, default=5, help="tasks requested per call")
+    args = parser.parse_args()
+    
+    user_id = seed(args.rows)
+    asyncio.run(run(args, user_id))
+
+
+if __name__ == "__main__":
+    main()
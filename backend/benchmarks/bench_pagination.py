@@ -0,0 +1,101 @@
+"""
+Benchmark: offset vs keyset pagination on a large task table
+
+Seeds one user with --rows tasks (1M by default) and times fetching a page of
+--limit tasks at increasing depths, once with OFFSET and once with the
+(created_at, id) cursor used by GET /tasks. Offset cost grows with depth; the
+keyset page should cost the same at every depth.
+
+Usage:
+    python benchmarks/bench_pagination.py
+    python benchmarks/bench_pagination.py --rows 200000 --limit 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from sqlalchemy import insert
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.task import Task, TaskSource, TaskStatus
+from app.models.user import User
+from app.services import task_service
+
+
+def seed(rows: int) -> uuid.UUID:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user_id, email="bench@example.com", hashed_password="x"))
+        for offset in range(0, rows, 50000):
+            conn.execute(insert(Task), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "title": f"Task {n}",
+                    "source": TaskSource.MANUAL,
+                    "status": TaskStatus.PENDING,
+                    # Pairs of equal timestamps so the id tie-breaker is exercised
+                    "created_at": start + timedelta(seconds=n // 2),
+                }
+                for n in range(offset, min(rows, offset + 50000))
+            ])
+    return user_id
+
+
+def time_page(fetch, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fetch()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="tasks to seed")
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--repeat", type=int, default=20, help="timed fetches per depth")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    user_id = seed(args.rows)
+    print(f"seeded {args.rows} tasks in {time.perf_counter() - start:.1f}s")
+    
+    depths = [0, 1000, args.rows // 10, args.rows // 2, args.rows - args.limit]
+    print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+    with SessionLocal() as db:
+        for depth in depths:
+            # Cursor for the row just before this depth (not timed)
+            after = None
+            if depth:
+                previous = task_service.get_user_tasks(db, user_id, skip=depth - 1, limit=1)[0]
+                after = (previous.created_at, previous.id)
+            
+            offset_page = task_service.get_user_tasks(db, user_id, skip=depth, limit=args.limit)
+            keyset_page = task_service.get_user_tasks(db, user_id, limit=args.limit, after=after)
+            assert [t.id for t in offset_page] == [t.id for t in keyset_page]
+            
+            offset_ms = time_page(
+                lambda: task_service.get_user_tasks(db, user_id, skip=depth, limit=args.limit), args.repeat
+            )
+            keyset_ms = time_page(
+                lambda: task_service.get_user_tasks(db, user_id, limit=args.limit, after=after), args.repeat
+            )
+            print(f"{depth:>10} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+            db.expunge_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: JSON pages vs sparse fieldsets vs NDJSON streaming on GET /tasks, and GET /tasks/export
+
+Seeds one user with --rows tasks and requests the task list several ways,
+driving the ASGI app directly so the time of the first body chunk is visible.
+For each variant it prints time to first byte, total time, body size and the
+peak Python memory allocated while serving it (measured in a second, traced
+pass). The NDJSON stream and the exports over every row should peak at about
+the same memory as a 1000-row stream.
+
+Usage:
+    python benchmarks/bench_streaming.py
+    python benchmarks/bench_streaming.py --rows 500000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.core.security import create_access_token
+from app.main import app
+from app.models.task import Task, TaskSource, TaskStatus
+from app.models.user import User
+
+NDJSON = "application/x-ndjson"
+
+
+def seed(rows: int) -> uuid.UUID:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_id = uuid.uuid4()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=user_id, email="bench@example.com", hashed_password="x"))
+        for offset in range(0, rows, 50000):
+            conn.execute(insert(Task), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "title": f"Task {n}",
+                    "description": "x" * 80,
+                    "due_date": start + timedelta(days=n % 90),
+                    "estimated_time": 30,
+                    "source": TaskSource.MANUAL,
+                    "status": TaskStatus.PENDING,
+                    "created_at": start + timedelta(seconds=n),
+                }
+                for n in range(offset, min(rows, offset + 50000))
+            ])
+    return user_id
+
+
+async def request(token: str, path: str, query: str, accept: str):
+    """Time to first body chunk, total time and body size of one GET"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": f"{settings.API_V1_PREFIX}{path}", "raw_path": b"", "root_path": "",
+        "query_string": query.encode(), "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        "headers": [(b"authorization", f"Bearer {token}".encode()), (b"accept", accept.encode())],
+    }
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    
+    requested = False
+    
+    async def receive():
+        # StreamingResponse listens for a disconnect while it streams; never send one
+        nonlocal requested
+        if requested:
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b""}
+    
+    async def send(message):
+        nonlocal first_byte, size
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+        elif message["type"] == "http.response.body" and message.get("body"):
+            first_byte = first_byte or time.perf_counter()
+            size += len(message["body"])
+    
+    await app(scope, receive, send)
+    return first_byte - start, time.perf_counter() - start, size
+
+
+async def run(args, token: str):
+    variants = [
+        ("JSON, 1000 rows", "/tasks", "limit=1000", "application/json"),
+        ("JSON fields, 1000 rows", "/tasks", "limit=1000&fields=id,title,due_date", "application/json"),
+        ("NDJSON, 1000 rows", "/tasks", "limit=1000", NDJSON),
+        (f"NDJSON, all {args.rows} rows", "/tasks", "", NDJSON),
+        (f"NDJSON fields, all {args.rows}", "/tasks", "fields=id,title,due_date", NDJSON),
+        ("export NDJSON", "/tasks/export", "", "*/*"),
+        ("export CSV", "/tasks/export", "format=csv", "*/*"),
+        ("export CSV gzip", "/tasks/export", "format=csv&gzip=true", "*/*"),
+    ]
+    print(f"{'variant':<28} {'TTFB ms':>9} {'total ms':>9} {'body MB':>8} {'peak MB':>8}")
+    for label, path, query, accept in variants:
+        await request(token, path, query, accept)  # warm up
+        first_byte, total, size = await request(token, path, query, accept)
+        tracemalloc.start()
+        await request(token, path, query, accept)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"{label:<28} {first_byte * 1000:>9.1f} {total * 1000:>9.1f} "
+            f"{size / 2**20:>8.1f} {peak / 2**20:>8.1f}"
+        )
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="tasks to seed")
+    args = parser.parse_args()
+    
+    user_id = seed(args.rows)
+    token = create_access_token(data={"sub": str(user_id)})
+    asyncio.run(run(args, token))
+
+
+if __name__ == "__main__":
+    main()
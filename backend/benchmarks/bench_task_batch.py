@@ -0,0 +1,112 @@
+"""
+Benchmark: bulk task endpoints vs one request per task
+
+Creates, completes and deletes --tasks tasks (1000 by default), once through
+the per-task endpoints and once through POST/PATCH/DELETE /tasks/batch, and
+prints the wall time of each phase. A 1000-task batch call should finish well
+under a second.
+
+Usage:
+    python benchmarks/bench_task_batch.py
+    python benchmarks/bench_task_batch.py --tasks 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx
+
+from app.core.config import settings
+from app.core.database import Base, async_engine, engine
+from app.core.passwords import password_hasher
+from app.main import app
+
+API = settings.API_V1_PREFIX
+CREDENTIALS = {"email": "bench@example.com", "password": "benchmark-password"}
+
+
+async def timed(label: str, coro):
+    start = time.perf_counter()
+    result = await coro
+    print(f"  {label:<10} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+async def one_by_one(client: httpx.AsyncClient, headers: dict, count: int):
+    async def create():
+        return [
+            (await client.post(f"{API}/tasks", json={"title": f"Task {i}"}, headers=headers)).json()["id"]
+            for i in range(count)
+        ]
+    
+    async def complete(ids):
+        for task_id in ids:
+            response = await client.put(f"{API}/tasks/{task_id}", json={"status": "completed"}, headers=headers)
+            response.raise_for_status()
+    
+    async def remove(ids):
+        for task_id in ids:
+            (await client.delete(f"{API}/tasks/{task_id}", headers=headers)).raise_for_status()
+    
+    print(f"one request per task ({count} tasks)")
+    ids = await timed("create", create())
+    await timed("complete", complete(ids))
+    await timed("delete", remove(ids))
+
+
+async def batched(client: httpx.AsyncClient, headers: dict, count: int):
+    async def create():
+        response = await client.post(
+            f"{API}/tasks/batch", json={"tasks": [{"title": f"Task {i}"} for i in range(count)]}, headers=headers
+        )
+        response.raise_for_status()
+        return [result["id"] for result in response.json()["results"]]
+    
+    async def complete(ids):
+        response = await client.patch(
+            f"{API}/tasks/batch", json={"ids": ids, "status": "completed"}, headers=headers
+        )
+        response.raise_for_status()
+    
+    async def remove(ids):
+        response = await client.request("DELETE", f"{API}/tasks/batch", json={"ids": ids}, headers=headers)
+        response.raise_for_status()
+    
+    print(f"batch endpoints ({count} tasks)")
+    ids = await timed("create", create())
+    await timed("complete", complete(ids))
+    await timed("delete", remove(ids))
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        await client.post(f"{API}/auth/register", json=CREDENTIALS)
+        token = (await client.post(f"{API}/auth/login", json=CREDENTIALS)).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        await one_by_one(client, headers, args.tasks)
+        await batched(client, headers, args.tasks)
+    
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per phase (at most 1000 for batches)")
+    args = parser.parse_args()
+    
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 import os
 # Set environment variables before importing app
@@ -12,9 +13,16 @@ os.environ.setdefault("ALGORITHM", "HS256")
 os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 os.environ.setdefault("DEBUG", "True")
 os.environ.setdefault("API_V1_PREFIX", "/api/v1")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Every route runs under its declared SQL statement budget
+os.environ.setdefault("QUERY_BUDGET_ENFORCE", "True")
+# Labeling threads would write between a test's requests; tests that need them turn them on
+os.environ.setdefault("MOOD_LABEL_WORKERS", "0")
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_db, get_async_db
 from app.core.config import settings
+from app.core.security import principal_cache, settings_version_cache
+from app.services.task_stats_service import stats_cache
 from app.main import app
 
 # Create test database
@@ -27,6 +35,13 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async routes share the same SQLite file; NullPool because every TestClient
+# runs its own event loop and aiosqlite connections can't outlive it
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -49,7 +64,15 @@ def client(db):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    principal_cache.clear()
+    settings_version_cache.clear()
+    stats_cache.clear()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -1,5 +1,11 @@
 import pytest
 from fastapi import status
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.passwords import build_crypt_context, password_hasher
+from app.core.security import principal_cache, settings_version_cache
+from app.models.user import User
+from tests.conftest import async_engine
 
 
 def test_register_user(client, test_user_data):
@@ -91,3 +97,121 @@ def test_get_current_user_unauthorized(client):
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+
+
+def get_tasks_recording_statements(client, headers):
+    """GET /tasks and return the response with the SQL statements it ran"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/v1/tasks", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def test_authenticated_request_skips_user_lookup(client, auth_headers):
+    """Test that a warm principal cache authenticates without querying users"""
+    # The first request populates the cache
+    client.get("/api/v1/tasks", headers=auth_headers)
+    
+    response, statements = get_tasks_recording_statements(client, auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    # The ETag version lookup and the task query, but no user lookup
+    assert len(statements) == 2
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_principal_cache_invalidated_on_user_update(client, auth_headers, db):
+    """Test that changing a user record evicts the cached principal"""
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.json()["timezone"] == "UTC"
+    
+    user = db.query(User).one()
+    user.timezone = "America/Toronto"
+    db.commit()
+    
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.json()["timezone"] == "America/Toronto"
+
+
+@pytest.fixture
+def claims_mode(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "claims")
+
+
+def test_claims_mode_authenticates_without_user_lookup(claims_mode, client, auth_headers):
+    """Test that claims-mode tokens authenticate without loading the user, and warm without querying users"""
+    principal_cache.clear()
+    settings_version_cache.clear()
+    response, statements = get_tasks_recording_statements(client, auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    # Cold, only the columns the settings version covers are read
+    lookups = [statement for statement in statements if "FROM users" in statement]
+    assert len(lookups) == 1 and "hashed_password" not in lookups[0]
+    
+    response, statements = get_tasks_recording_statements(client, auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    # The ETag version lookup and the task query, but no user lookup
+    assert len(statements) == 2
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_claims_mode_rejects_tokens_with_stale_settings(claims_mode, client, auth_headers, db, test_user_data):
+    """Test that a claims-mode token issued before a timezone change stops working"""
+    assert client.get("/api/v1/tasks", headers=auth_headers).status_code == status.HTTP_200_OK
+    
+    user = db.query(User).one()
+    user.timezone = "America/Toronto"
+    db.commit()
+    
+    assert client.get("/api/v1/tasks", headers=auth_headers).status_code == status.HTTP_401_UNAUTHORIZED
+    token = client.post("/api/v1/auth/login", json=test_user_data).json()["access_token"]
+    response = client.get("/api/v1/tasks", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_claims_mode_profile_loads_user(claims_mode, client, auth_headers, test_user_data):
+    """Test that /auth/me still returns the full user in claims mode"""
+    response = client.get("/api/v1/auth/me", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == test_user_data["email"]
+
+
+def test_login_rehashes_to_configured_cost(client, db, test_user_data):
+    """Test that logging in upgrades a hash made at a different bcrypt cost"""
+    user = User(
+        email=test_user_data["email"],
+        hashed_password=build_crypt_context(5).hash(test_user_data["password"]),
+        timezone="UTC",
+        preferences={},
+        consents={}
+    )
+    db.add(user)
+    db.commit()
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": test_user_data["email"], "password": test_user_data["password"]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    db.expire_all()
+    assert db.query(User).one().hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+
+
+def test_login_rejected_when_hasher_saturated(client, test_user_data, monkeypatch):
+    """Test that logins fail fast with 503 once the hashing pool is full"""
+    client.post("/api/v1/auth/register", json=test_user_data)
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"email": test_user_data["email"], "password": test_user_data["password"]}
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert "Retry-After" in response.headers
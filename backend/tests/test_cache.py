@@ -0,0 +1,45 @@
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_cache_expires_entries():
+    """Test that entries are dropped once their TTL has passed"""
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    
+    clock.now = 4
+    assert cache.get("a") == 1
+    clock.now = 6
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when full"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disabled_cache_never_stores():
+    """Test that a zero TTL turns the cache off"""
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
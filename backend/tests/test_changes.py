@@ -0,0 +1,74 @@
+from fastapi import status
+
+from app.core.config import settings
+
+TASKS_URL = f"{settings.API_V1_PREFIX}/tasks"
+
+
+def get_changes(client, headers, url=f"{TASKS_URL}/changes", **params):
+    response = client.get(url, params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_task_changes_since_token(client, auth_headers):
+    """Test that a sync token returns only later creates, updates and deletes"""
+    ids = [
+        client.post(TASKS_URL, json={"title": f"Task {i}"}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+    full = get_changes(client, auth_headers)
+    assert [task["id"] for task in full["changed"]] == ids
+    assert full["deleted"] == []
+    assert not full["has_more"]
+    
+    client.put(f"{TASKS_URL}/{ids[0]}", json={"title": "Renamed"}, headers=auth_headers)
+    client.delete(f"{TASKS_URL}/{ids[1]}", headers=auth_headers)
+    new_id = client.post(TASKS_URL, json={"title": "New"}, headers=auth_headers).json()["id"]
+    
+    delta = get_changes(client, auth_headers, since=full["next_token"])
+    assert [task["id"] for task in delta["changed"]] == [ids[0], new_id]
+    assert delta["changed"][0]["title"] == "Renamed"
+    assert delta["deleted"] == [ids[1]]
+    
+    idle = get_changes(client, auth_headers, since=delta["next_token"])
+    assert idle["changed"] == [] and idle["deleted"] == []
+    assert idle["next_token"] == delta["next_token"]
+
+
+def test_task_changes_from_batch_endpoints_page_in_order(client, auth_headers):
+    """Test that bulk writes are sequenced too and that small pages cover every change"""
+    response = client.post(
+        f"{TASKS_URL}/batch", json={"tasks": [{"title": f"Task {i}"} for i in range(5)]}, headers=auth_headers
+    )
+    ids = [result["id"] for result in response.json()["results"]]
+    token = get_changes(client, auth_headers)["next_token"]
+    
+    client.patch(f"{TASKS_URL}/batch", json={"ids": ids[:3], "status": "completed"}, headers=auth_headers)
+    client.request("DELETE", f"{TASKS_URL}/batch", json={"ids": ids[3:]}, headers=auth_headers)
+    
+    changed, deleted = [], []
+    while True:
+        page = get_changes(client, auth_headers, since=token, limit=2)
+        changed += [task["id"] for task in page["changed"]]
+        deleted += page["deleted"]
+        token = page["next_token"]
+        if not page["has_more"]:
+            break
+    assert changed == ids[:3]
+    assert sorted(deleted) == sorted(ids[3:])
+
+
+def test_journal_changes(client, auth_headers):
+    """Test journal delta sync and token validation"""
+    url = f"{settings.API_V1_PREFIX}/journal/changes"
+    first = client.post(f"{settings.API_V1_PREFIX}/journal", json={"content": "One"}, headers=auth_headers)
+    token = get_changes(client, auth_headers, url)["next_token"]
+    client.post(f"{settings.API_V1_PREFIX}/journal", json={"content": "Two"}, headers=auth_headers)
+    
+    delta = get_changes(client, auth_headers, url, since=token)
+    assert [entry["content"] for entry in delta["changed"]] == ["Two"]
+    assert first.json()["id"] not in [entry["id"] for entry in delta["changed"]]
+    
+    response = client.get(url, params={"since": "garbage"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,76 @@
+import sqlite3
+import uuid
+
+from fastapi import status
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.models.journal import JournalEntry
+from app.services.journal_compression_service import compress_journal_entries, prepare_journal_compression
+
+JOURNAL_URL = f"{settings.API_V1_PREFIX}/journal"
+LONG_ENTRY = "Walked to the lighthouse before breakfast, then wrote for an hour. " * 40
+
+
+def storage_classes(db):
+    rows = db.execute(text("SELECT substr(inflate_text(content), 1, 6), typeof(content) FROM journal_entries"))
+    return dict(rows.all())
+
+
+def test_long_entries_are_stored_compressed(client, auth_headers, db, monkeypatch):
+    """Test that long entries are stored compressed and still read, search and delete as text"""
+    monkeypatch.setattr(settings, "JOURNAL_COMPRESS_MIN_BYTES", 1024)
+    # As at startup: the index was created while compression was off
+    assert prepare_journal_compression(lambda: db)
+    long_id = client.post(JOURNAL_URL, json={"content": LONG_ENTRY}, headers=auth_headers).json()["id"]
+    client.post(JOURNAL_URL, json={"content": "Short note about the lighthouse"}, headers=auth_headers)
+    assert storage_classes(db) == {"Walked": "blob", "Short ": "text"}
+    
+    entry = client.get(f"{JOURNAL_URL}/{long_id}", headers=auth_headers).json()
+    assert entry["content"] == LONG_ENTRY
+    # Loaded objects keep the stored value until `content` is read
+    loaded = db.get(JournalEntry, uuid.UUID(long_id))
+    assert isinstance(loaded.stored_content, bytes) and loaded.content == LONG_ENTRY
+    exported = client.get(f"{JOURNAL_URL}/export", params={"format": "csv"}, headers=auth_headers).text
+    assert LONG_ENTRY.strip() in exported
+    
+    results = client.get(f"{JOURNAL_URL}/search", params={"q": "breakfast"}, headers=auth_headers).json()
+    assert [result["id"] for result in results] == [long_id]
+    assert "<mark>breakfast</mark>" in results[0]["snippet"]
+    
+    db.delete(loaded)
+    db.commit()
+    assert client.get(f"{JOURNAL_URL}/search", params={"q": "breakfast"}, headers=auth_headers).json() == []
+    assert len(client.get(f"{JOURNAL_URL}/search", params={"q": "lighthouse"}, headers=auth_headers).json()) == 1
+
+
+def test_compress_existing_entries(client, auth_headers, db, monkeypatch):
+    """Test that the backfill compresses existing entries without marking them changed, upgrading the index"""
+    for n in range(3):
+        client.post(JOURNAL_URL, json={"content": f"{n} {LONG_ENTRY}"}, headers=auth_headers)
+    etag = client.get(JOURNAL_URL, headers=auth_headers).headers["etag"]
+    
+    monkeypatch.setattr(settings, "JOURNAL_COMPRESS_MIN_BYTES", 1024)
+    assert compress_journal_entries(chunk_size=2) == 3
+    assert set(storage_classes(db).values()) == {"blob"}
+    assert compress_journal_entries() == 0
+    
+    response = client.get(JOURNAL_URL, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    entries = client.get(JOURNAL_URL, headers=auth_headers).json()
+    assert sorted(entry["content"] for entry in entries) == [f"{n} {LONG_ENTRY}" for n in range(3)]
+    results = client.get(f"{JOURNAL_URL}/search", params={"q": "breakfast"}, headers=auth_headers).json()
+    assert len(results) == 3
+    assert "<mark>breakfast</mark>" in results[0]["snippet"]
+
+
+def test_uncompressed_database_needs_no_app_functions(client, auth_headers, db):
+    """Test that with compression off, clients without inflate_text (sqlite3 CLI, backups) can still write entries"""
+    entry_id = client.post(JOURNAL_URL, json={"content": "Written by the app"}, headers=auth_headers).json()["id"]
+    schema = " ".join(db.scalars(text("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL")))
+    assert "inflate_text" not in schema
+    
+    with sqlite3.connect(db.get_bind().url.database) as connection:
+        connection.execute("UPDATE journal_entries SET content = 'Edited by hand' WHERE id = ?", (uuid.UUID(entry_id).hex,))
+    results = client.get(f"{JOURNAL_URL}/search", params={"q": "hand"}, headers=auth_headers).json()
+    assert [result["id"] for result in results] == [entry_id]
@@ -0,0 +1,69 @@
+import pytest
+from cryptography.fernet import InvalidToken
+from app.core.config import settings
+from app.models.oauth_token import OAuthToken, OAuthProvider
+from app.models.user import User
+from app.services import encryption_service
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def key_settings(monkeypatch):
+    """Let a test change ENCRYPTION_KEYS, restoring cached keys afterwards"""
+    def use_keys(keys):
+        monkeypatch.setattr(settings, "ENCRYPTION_KEYS", keys)
+        encryption_service.reset_keys()
+    
+    yield use_keys
+    monkeypatch.undo()
+    encryption_service.reset_keys()
+
+
+def test_encrypt_decrypt_round_trip():
+    """Test single and batch token encryption"""
+    encrypted = encryption_service.encrypt_token("secret-token")
+    assert encrypted != "secret-token"
+    assert encryption_service.decrypt_token(encrypted) == "secret-token"
+    
+    batch = encryption_service.encrypt_many(["a", "b", "c"])
+    assert encryption_service.decrypt_many(batch) == ["a", "b", "c"]
+
+
+def test_old_key_still_decrypts_after_rotation(key_settings):
+    """Test that tokens from a retired primary key still decrypt while it is listed"""
+    key_settings("old-secret")
+    encrypted = encryption_service.encrypt_token("secret-token")
+    
+    key_settings("new-secret,old-secret")
+    assert encryption_service.decrypt_token(encrypted) == "secret-token"
+    assert encryption_service.needs_rotation(encrypted)
+    
+    key_settings("new-secret")
+    with pytest.raises(InvalidToken):
+        encryption_service.decrypt_token(encrypted)
+
+
+def test_reencrypt_oauth_tokens(db, key_settings):
+    """Test that the re-encryption job moves every stored token to the new key"""
+    key_settings("old-secret")
+    user = User(email="rotate@example.com", hashed_password="x", preferences={}, consents={})
+    db.add(user)
+    db.flush()
+    for i in range(5):
+        db.add(OAuthToken(
+            user_id=user.id,
+            provider=f"{OAuthProvider.BRIGHTSPACE.value}-{i}",
+            access_token=encryption_service.encrypt_token(f"token-{i}")
+        ))
+    db.commit()
+    
+    key_settings("new-secret,old-secret")
+    assert encryption_service.reencrypt_oauth_tokens(TestingSessionLocal, chunk_size=2) == 5
+    assert encryption_service.reencrypt_oauth_tokens(TestingSessionLocal, chunk_size=2) == 0
+    
+    key_settings("new-secret")
+    db.expire_all()
+    tokens = db.query(OAuthToken).order_by(OAuthToken.provider).all()
+    assert encryption_service.decrypt_many(t.access_token for t in tokens) == [
+        f"token-{i}" for i in range(5)
+    ]
@@ -0,0 +1,123 @@
+from fastapi import status
+from sqlalchemy import event
+
+from app.core.config import settings
+from tests.conftest import async_engine
+
+TASKS_URL = f"{settings.API_V1_PREFIX}/tasks"
+
+
+def create_task(client, headers, title="Write report"):
+    response = client.post(TASKS_URL, json={"title": title}, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def get_if_none_match(client, url, headers, etag):
+    return client.get(url, headers={**headers, "If-None-Match": etag})
+
+
+def test_unchanged_task_list_returns_304(client, auth_headers):
+    """Test that a matching If-None-Match gets an empty 304"""
+    create_task(client, auth_headers)
+    response = client.get(TASKS_URL, headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"tasks.')
+    
+    response = get_if_none_match(client, TASKS_URL, auth_headers, etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    # Clients may send the strong form or a list of tags
+    response = get_if_none_match(client, TASKS_URL, auth_headers, f'"other", {etag[2:]}')
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_writes_change_the_etag(client, auth_headers):
+    """Test that creates, updates, deletes and batch updates all invalidate the ETag"""
+    task = create_task(client, auth_headers)
+    etags = [client.get(TASKS_URL, headers=auth_headers).headers["ETag"]]
+    
+    client.put(f"{TASKS_URL}/{task['id']}", json={"title": "Renamed"}, headers=auth_headers)
+    etags.append(client.get(TASKS_URL, headers=auth_headers).headers["ETag"])
+    client.patch(f"{TASKS_URL}/batch", json={"ids": [task["id"]], "status": "completed"},
+                 headers=auth_headers)
+    etags.append(client.get(TASKS_URL, headers=auth_headers).headers["ETag"])
+    client.delete(f"{TASKS_URL}/{task['id']}", headers=auth_headers)
+    etags.append(client.get(TASKS_URL, headers=auth_headers).headers["ETag"])
+    assert len(set(etags)) == 4
+    
+    response = get_if_none_match(client, TASKS_URL, auth_headers, etags[0])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == []
+
+
+def test_etag_depends_on_query_and_collection(client, auth_headers):
+    """Test that other pages get other ETags and task writes leave the journal ETag alone"""
+    create_task(client, auth_headers)
+    etag = client.get(TASKS_URL, headers=auth_headers).headers["ETag"]
+    response = get_if_none_match(client, f"{TASKS_URL}?limit=1", auth_headers, etag)
+    assert response.status_code == status.HTTP_200_OK
+    
+    journal_url = f"{settings.API_V1_PREFIX}/journal"
+    journal_etag = client.get(journal_url, headers=auth_headers).headers["ETag"]
+    create_task(client, auth_headers, title="Another")
+    response = get_if_none_match(client, journal_url, auth_headers, journal_etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_mood_history_etag(client, auth_headers):
+    """Test conditional GET on mood history"""
+    url = f"{settings.API_V1_PREFIX}/mood/history"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    assert get_if_none_match(client, url, auth_headers, etag).status_code == status.HTTP_304_NOT_MODIFIED
+    
+    client.post(f"{settings.API_V1_PREFIX}/mood/analyze-text", json={"text": "A great day"},
+                headers=auth_headers)
+    assert get_if_none_match(client, url, auth_headers, etag).status_code == status.HTTP_200_OK
+
+
+def test_if_match_guards_updates_and_deletes(client, auth_headers):
+    """Test that writes with a stale If-Match fail with 412 and leave the task alone"""
+    url = f"{TASKS_URL}/{create_task(client, auth_headers)['id']}"
+    first = client.get(url, headers=auth_headers).headers["ETag"]
+    
+    response = client.put(url, json={"title": "Device A"}, headers={**auth_headers, "If-Match": first})
+    assert response.status_code == status.HTTP_200_OK
+    second = response.headers["ETag"]
+    assert second != first
+    
+    # Device B still holds the first version
+    response = client.put(url, json={"title": "Device B"}, headers={**auth_headers, "If-Match": first})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert response.headers["ETag"] == second
+    assert client.get(url, headers=auth_headers).json()["title"] == "Device A"
+    response = client.put(url, json={"title": "Weak"}, headers={**auth_headers, "If-Match": f"W/{second}"})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    
+    response = client.delete(url, headers={**auth_headers, "If-Match": first})
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    response = client.delete(url, headers={**auth_headers, "If-Match": f'"0", {second}'})
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    response = client.put(url, json={"title": "Gone"}, headers={**auth_headers, "If-Match": second})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_update_writes_without_reading(client, auth_headers):
+    """Test that PUT updates the task in one UPDATE ... RETURNING, with no SELECT"""
+    url = f"{TASKS_URL}/{create_task(client, auth_headers)['id']}"
+    etag = client.get(url, headers=auth_headers).headers["ETag"]
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.put(url, json={"title": "Renamed"}, headers={**auth_headers, "If-Match": etag})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert response.json()["title"] == "Renamed"
+    # The change-sequence upsert and the update itself
+    assert len(statements) == 2
+    assert statements[1].startswith("UPDATE tasks") and "RETURNING" in statements[1]
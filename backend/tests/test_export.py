@@ -0,0 +1,47 @@
+import csv
+import gzip
+import io
+import json
+
+from fastapi import status
+
+from app.core.config import settings
+
+API = settings.API_V1_PREFIX
+
+
+def test_export_journal_ndjson(client, auth_headers):
+    """Test that the journal export streams every entry as NDJSON, newest first"""
+    for n in range(3):
+        client.post(f"{API}/journal", json={"content": f"Entry {n}"}, headers=auth_headers)
+    
+    response = client.get(f"{API}/journal/export", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="journal.ndjson"'
+    entries = [json.loads(line) for line in response.text.splitlines()]
+    assert [entry["content"] for entry in entries] == ["Entry 2", "Entry 1", "Entry 0"]
+    assert set(entries[0]) == {"id", "user_id", "content", "mood_label", "created_at"}
+
+
+def test_export_tasks_csv_gzip(client, auth_headers):
+    """Test a gzipped CSV export of selected task fields"""
+    client.post(f"{API}/tasks", json={"title": "Essay, draft", "estimated_time": 90}, headers=auth_headers)
+    client.post(f"{API}/tasks", json={"title": 'Read "Dune"'}, headers=auth_headers)
+    
+    response = client.get(
+        f"{API}/tasks/export", params={"format": "csv", "gzip": "true", "fields": "title,estimated_time,status"},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/gzip"
+    assert response.headers["content-disposition"] == 'attachment; filename="tasks.csv.gz"'
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert rows == [
+        ["title", "estimated_time", "status"],
+        ["Essay, draft", "90", "pending"],
+        ['Read "Dune"', "", "pending"],
+    ]
+    
+    response = client.get(f"{API}/tasks/export", params={"format": "xml"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -121,3 +121,67 @@ def test_journal_entries_ordered_by_date(client, auth_headers):
         assert dates == sorted(dates, reverse=True)
 
 
+def test_journal_entries_cursor_pagination(client, auth_headers):
+    """Test that cursor pages continue where the previous page ended"""
+    for i in range(3):
+        client.post("/api/v1/journal", json={"content": f"Entry {i}"}, headers=auth_headers)
+    
+    first = client.get("/api/v1/journal?limit=2", headers=auth_headers)
+    assert [entry["content"] for entry in first.json()] == ["Entry 2", "Entry 1"]
+    
+    second = client.get(
+        "/api/v1/journal",
+        params={"limit": 2, "after": first.headers["X-Next-Cursor"]},
+        headers=auth_headers
+    )
+    assert [entry["content"] for entry in second.json()] == ["Entry 0"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+
+def test_journal_entries_ndjson_fields(client, auth_headers):
+    """Test a projected NDJSON stream of journal entries"""
+    for i in range(3):
+        client.post("/api/v1/journal", json={"content": f"Entry {i}"}, headers=auth_headers)
+    
+    response = client.get(
+        "/api/v1/journal?fields=content",
+        headers={**auth_headers, "Accept": "application/x-ndjson"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text.splitlines() == ['{"content":"Entry 2"}', '{"content":"Entry 1"}', '{"content":"Entry 0"}']
+
+
+def test_new_entries_are_labeled_in_the_background(client, auth_headers, monkeypatch):
+    """Test that the labeling queue labels new entries and records their text moods, and GET /mood/current doesn't"""
+    from app.services.mood_label_queue import mood_label_queue
+    
+    client.post("/api/v1/journal", json={"content": "Left unlabeled"}, headers=auth_headers)
+    client.get("/api/v1/mood/current", headers=auth_headers)
+    assert client.get("/api/v1/journal", headers=auth_headers).json()[0]["mood_label"] is None
+    
+    monkeypatch.setattr(mood_label_queue, "workers", 2)
+    monkeypatch.setattr(mood_label_queue, "batch_size", 2)
+    for content in ["So happy and excited today", "Feeling sad and lonely", "Went to class"]:
+        response = client.post("/api/v1/journal", json={"content": content}, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["mood_label"] is None
+    assert mood_label_queue.drain(timeout=10)
+    assert mood_label_queue.backlog == 0
+    
+    entries = client.get("/api/v1/journal", headers=auth_headers).json()
+    labels = {entry["content"]: entry["mood_label"] for entry in entries}
+    assert labels == {
+        "So happy and excited today": "positive",
+        "Feeling sad and lonely": "negative",
+        "Went to class": "neutral",
+        "Left unlabeled": None,
+    }
+    profiles = client.get("/api/v1/mood/history", headers=auth_headers).json()
+    text_profiles = {profile["metadata"]["journal_entry_id"] for profile in profiles if profile["source"] == "text"}
+    assert text_profiles == {entry["id"] for entry in entries if entry["mood_label"]}
+    assert "mood_label_backlog 0" in client.get("/metrics").text
+    
+    monkeypatch.setattr(mood_label_queue, "max_pending", 0)
+    client.post("/api/v1/journal", json={"content": "No room in the queue"}, headers=auth_headers)
+    assert 'mood_labels_total{outcome="dropped"} 1' in client.get("/metrics").text
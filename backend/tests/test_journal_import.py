@@ -0,0 +1,94 @@
+import json
+
+from fastapi import status
+
+from app.core.config import settings
+
+JOURNAL_URL = f"{settings.API_V1_PREFIX}/journal"
+
+
+def chunks(body: bytes, size: int = 7):
+    """Upload body in small pieces so lines straddle chunk boundaries"""
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def upload(client, headers, body: bytes, content_type: str):
+    return client.post(
+        f"{JOURNAL_URL}/import", content=chunks(body), headers={**headers, "Content-Type": content_type}
+    )
+
+
+def test_import_ndjson(client, auth_headers, monkeypatch):
+    """Test that an NDJSON import keeps timestamps, skips bad rows and labels moods and records them in mood history in the background"""
+    monkeypatch.setattr(settings, "JOURNAL_IMPORT_CHUNK_SIZE", 2)
+    lines = [
+        json.dumps({"content": "So happy and excited today", "created_at": "2019-03-01T08:30:00Z"}),
+        json.dumps({"content": "Feeling sad and lonely", "created_at": "2019-03-02T21:00:00"}),
+        "{not json",
+        json.dumps({"created_at": "2019-03-03T10:00:00Z"}),
+        "",
+        json.dumps({"content": "Kept my label", "mood_label": "grateful", "created_at": "2019-03-04T10:00:00Z"}),
+        json.dumps({"content": "An ordinary day"}),
+    ]
+    response = upload(client, auth_headers, "\n".join(lines).encode(), "application/x-ndjson")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = response.json()
+    assert (job["imported"], job["skipped"]) == (4, 2)
+    assert job["errors"][0] == "line 3: not valid JSON"
+    assert job["errors"][1].startswith("line 4: content")
+    
+    # The test client runs background tasks before returning
+    response = client.get(f"{JOURNAL_URL}/import/{job['id']}", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "done"
+    assert response.json()["labeled"] == 3
+    
+    entries = client.get(JOURNAL_URL, headers=auth_headers).json()
+    by_content = {entry["content"]: entry for entry in entries}
+    assert by_content["So happy and excited today"]["created_at"].startswith("2019-03-01T08:30:00")
+    assert by_content["So happy and excited today"]["mood_label"] == "positive"
+    assert by_content["Feeling sad and lonely"]["mood_label"] == "negative"
+    assert by_content["Kept my label"]["mood_label"] == "grateful"
+    assert by_content["An ordinary day"]["mood_label"] == "neutral"
+    
+    # The same text mood profiles as entries created one at a time, dated at the entry
+    history = client.get(f"{settings.API_V1_PREFIX}/mood/history", params={"days": 36500}, headers=auth_headers).json()
+    assert [profile["source"] for profile in history] == ["text"] * 3
+    assert history[-1]["created_at"].startswith("2019-03-01T08:30:00")
+    
+    changes = client.get(f"{JOURNAL_URL}/changes", headers=auth_headers).json()
+    assert len(changes["changed"]) == 4
+
+
+def test_import_csv(client, auth_headers, monkeypatch):
+    """Test a CSV import with quoted multi-line content and an overlong row"""
+    monkeypatch.setattr(settings, "JOURNAL_IMPORT_MAX_LINE_BYTES", 64)
+    body = (
+        "Created_At,Content\r\n"
+        '2020-01-05T09:00:00Z,"First line\nsecond line, with a comma"\r\n'
+        f"2020-01-06T09:00:00Z,{'x' * 100}\r\n"
+        '2020-01-07T09:00:00Z,"She said ""calm"""\r\n'
+        "not a date,Bad timestamp\r\n"
+    ).encode()
+    response = upload(client, auth_headers, body, "text/csv")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job = response.json()
+    assert (job["imported"], job["skipped"]) == (2, 2)
+    assert job["errors"][0] == "line 4: longer than 64 bytes"
+    
+    entries = client.get(JOURNAL_URL, headers=auth_headers).json()
+    assert [entry["content"] for entry in entries] == [
+        'She said "calm"', "First line\nsecond line, with a comma"
+    ]
+    assert entries[1]["created_at"].startswith("2020-01-05T09:00:00")
+
+
+def test_import_rejects_unknown_formats(client, auth_headers):
+    """Test that only NDJSON and CSV uploads with a content column are accepted"""
+    response = upload(client, auth_headers, b'[{"content": "x"}]', "application/json")
+    assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    
+    response = upload(client, auth_headers, b"text,date\r\nhello,2020-01-01\r\n", "text/csv")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(JOURNAL_URL, headers=auth_headers).json() == []
@@ -0,0 +1,40 @@
+import uuid
+
+from app.core.config import settings
+from app.core.metrics import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus text rendering of a histogram"""
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("/a").observe(value)
+    
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+
+
+def test_metrics_use_route_templates(client, auth_headers):
+    """Test that request metrics are labelled by route template and known method, not raw path or verb"""
+    task_id = str(uuid.uuid4())
+    client.get(f"{settings.API_V1_PREFIX}/tasks/{task_id}", headers=auth_headers)
+    client.get("/no/such/path")
+    client.request("FROBNICATE", "/no/such/path")
+    client.post(f"{settings.API_V1_PREFIX}/mood/analyze-text", json={"text": "A calm day"}, headers=auth_headers)
+    
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="404"}' in text
+    assert 'route="<unmatched>"' in text
+    assert 'method="other",route="<unmatched>"' in text and "FROBNICATE" not in text
+    assert task_id not in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/v1/tasks/{task_id}",le="+Inf"}' in text
+    assert 'mood_analyzer_duration_seconds_count{analyzer="text"}' in text
+    assert 'db_pool_connections{engine="sync",state="checked_out"}' in text
+    assert "http_requests_in_flight 1" in text
@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+from app.core.config import settings
+from app.models.mood import MoodProfile
+from app.models.task import Task
+from app.services.priority_service import refresh_priority_scores
+from tests.conftest import TestingSessionLocal
+
+TASKS_URL = f"{settings.API_V1_PREFIX}/tasks"
+
+
+def due_in(**delta) -> str:
+    return (datetime.now(timezone.utc) + timedelta(**delta)).isoformat()
+
+
+def create(client, headers, title, **fields) -> str:
+    response = client.post(TASKS_URL, json={"title": title, **fields}, headers=headers)
+    return response.json()["id"]
+
+
+def next_titles(client, headers, k=5):
+    response = client.get(f"{TASKS_URL}/next", params={"k": k}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return [task["title"] for task in response.json()]
+
+
+def test_next_tasks_by_priority(client, auth_headers):
+    """Test that open tasks come back most urgent first and closed tasks are left out"""
+    create(client, auth_headers, "Someday")
+    create(client, auth_headers, "Next month", due_date=due_in(days=30))
+    create(client, auth_headers, "Overdue", due_date=due_in(hours=-2))
+    create(client, auth_headers, "Tomorrow", due_date=due_in(days=1), estimated_time=30)
+    create(client, auth_headers, "Done", due_date=due_in(hours=1), status="completed")
+    
+    assert next_titles(client, auth_headers) == ["Overdue", "Tomorrow", "Next month", "Someday"]
+    assert next_titles(client, auth_headers, k=2) == ["Overdue", "Tomorrow"]
+    
+    top = client.get(f"{TASKS_URL}/next", headers=auth_headers).json()[0]
+    assert 0 < top["priority_score"] <= 105
+    assert top["score"] == top["priority_score"]  # no recent mood, no adjustment
+
+
+def test_priority_follows_updates(client, auth_headers):
+    """Test that edits and batch status changes re-score tasks"""
+    later = create(client, auth_headers, "Later", due_date=due_in(days=20))
+    create(client, auth_headers, "Soon", due_date=due_in(days=2))
+    assert next_titles(client, auth_headers) == ["Soon", "Later"]
+    
+    client.put(f"{TASKS_URL}/{later}", json={"due_date": due_in(hours=3)}, headers=auth_headers)
+    assert next_titles(client, auth_headers) == ["Later", "Soon"]
+    
+    client.patch(f"{TASKS_URL}/batch", json={"ids": [later], "status": "completed"}, headers=auth_headers)
+    assert next_titles(client, auth_headers) == ["Soon"]
+    
+    client.patch(f"{TASKS_URL}/batch", json={"ids": [later], "status": "pending"}, headers=auth_headers)
+    assert next_titles(client, auth_headers) == ["Later", "Soon"]
+    
+    client.post(
+        f"{TASKS_URL}/batch", json={"tasks": [{"title": "Batch", "due_date": due_in(hours=-1)}]},
+        headers=auth_headers
+    )
+    assert next_titles(client, auth_headers)[0] == "Batch"
+
+
+def test_mood_reorders_candidates(client, auth_headers, db):
+    """Test that a low-energy mood favours short tasks and a high-energy one long tasks"""
+    due = due_in(days=3)
+    create(client, auth_headers, "Quick", due_date=due, estimated_time=15)
+    create(client, auth_headers, "Deep work", due_date=due, estimated_time=240)
+    user_id = uuid.UUID(client.get(f"{settings.API_V1_PREFIX}/auth/me", headers=auth_headers).json()["id"])
+    
+    db.add(MoodProfile(user_id=user_id, valence=-0.8, arousal=0.1, source="fused"))
+    db.commit()
+    assert next_titles(client, auth_headers) == ["Quick", "Deep work"]
+    
+    db.add(MoodProfile(
+        user_id=user_id, valence=0.9, arousal=0.9, source="fused",
+        created_at=datetime.now(timezone.utc) + timedelta(seconds=1)
+    ))
+    db.commit()
+    assert next_titles(client, auth_headers) == ["Deep work", "Quick"]
+
+
+def test_refresh_rescores_stale_tasks(client, auth_headers, db):
+    """Test that the periodic refresh re-scores open tasks whose deadline has drawn closer"""
+    task_id = uuid.UUID(create(client, auth_headers, "Drifting", due_date=due_in(hours=6)))
+    far = create(client, auth_headers, "Far", due_date=due_in(days=60))
+    fresh = db.get(Task, task_id).priority_score
+    
+    # As if the score was computed days ago
+    db.get(Task, task_id).priority_score = 1.0
+    db.commit()
+    
+    assert refresh_priority_scores(TestingSessionLocal, horizon_days=14, chunk_size=1) == 1
+    db.expire_all()
+    assert abs(db.get(Task, task_id).priority_score - fresh) < 0.1
+    assert refresh_priority_scores(TestingSessionLocal, horizon_days=14) == 0
+    
+    db.get(Task, uuid.UUID(far)).priority_score = -1.0
+    db.commit()
+    assert refresh_priority_scores(TestingSessionLocal, horizon_days=None) == 1
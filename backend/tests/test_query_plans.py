@@ -0,0 +1,211 @@
+"""
+Index verification for service queries
+
+Seeds a separate SQLite database, runs every read query the task, journal and
+mood services issue while capturing the SQL, and fails if EXPLAIN QUERY PLAN
+shows a full scan of any table. QUERY_PLAN_TEST_ROWS controls the size of the
+dataset (10k rows by default so the suite stays fast); run the full check with
+
+    QUERY_PLAN_TEST_ROWS=1000000 pytest tests/test_query_plans.py
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.changes import get_change_version
+from app.core.database import Base
+from app.models.journal import JournalEntry
+from app.models.mood import MoodProfile
+from app.models.oauth_token import OAuthToken
+from app.models.task import Task, TaskSource, TaskStatus
+from app.models.user import User
+from app.services import (
+    async_journal_service, async_task_service, journal_service, priority_service, task_service,
+    task_stats_service
+)
+from services.mood.behavioral_predictor import BehavioralMoodPredictor
+
+PLAN_DB_PATH = "./test_query_plans.db"
+ROWS = int(os.environ.get("QUERY_PLAN_TEST_ROWS", "10000"))
+TABLES = (
+    "users", "tasks", "journal_entries", "mood_profiles", "oauth_tokens", "user_change_versions",
+    "tombstones"
+)
+
+
+def seed(plan_engine, rows: int) -> uuid.UUID:
+    """`rows` tasks and journal entries spread over many users; returns one of them"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    user_ids = [uuid.uuid4() for _ in range(max(10, rows // 1000))]
+    statuses = list(TaskStatus)
+    
+    with plan_engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"user{n}@example.com", "hashed_password": "x"}
+            for n, user_id in enumerate(user_ids)
+        ])
+        for offset in range(0, rows, 50000):
+            batch = range(offset, min(rows, offset + 50000))
+            conn.execute(insert(Task), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": rng.choice(user_ids),
+                    "title": f"Task {n}",
+                    "status": rng.choice(statuses),
+                    "source": TaskSource.BRIGHTSPACE if n % 5 == 0 else TaskSource.MANUAL,
+                    "due_date": now + timedelta(hours=rng.randint(-500, 500)) if n % 3 else None,
+                    "estimated_time": rng.randint(15, 240),
+                    "priority_score": rng.choice([-1.0, rng.uniform(0, 100)]),
+                    "created_at": now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+                }
+                for n in batch
+            ])
+            conn.execute(insert(JournalEntry), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": rng.choice(user_ids),
+                    "content": f"Entry {n}",
+                    "created_at": now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+                }
+                for n in batch
+            ])
+            conn.execute(insert(MoodProfile), [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": rng.choice(user_ids),
+                    "valence": 0.0,
+                    "arousal": 0.5,
+                    "source": "fused",
+                    "created_at": now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)),
+                }
+                for n in batch[::10]
+            ])
+        # Give the planner real statistics, as a production database would have
+        conn.execute(text("ANALYZE"))
+    return user_ids[0]
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Engine on the seeded database and the user whose queries are checked"""
+    if os.path.exists(PLAN_DB_PATH):
+        os.remove(PLAN_DB_PATH)
+    plan_engine = create_engine(f"sqlite:///{PLAN_DB_PATH}")
+    Base.metadata.create_all(bind=plan_engine)
+    yield plan_engine, seed(plan_engine, ROWS)
+    plan_engine.dispose()
+    os.remove(PLAN_DB_PATH)
+
+
+def capture_selects(target_engine, statements: list) -> None:
+    @event.listens_for(target_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+
+def run_sync_queries(plan_engine, user_id: uuid.UUID) -> None:
+    cutoff = datetime.utcnow() - timedelta(days=30)
+    with Session(plan_engine) as db:
+        tasks = task_service.get_user_tasks(db, user_id, limit=20)
+        task_service.get_user_tasks(db, user_id, limit=20, status=TaskStatus.PENDING)
+        task_service.get_user_tasks(db, user_id, limit=20, after=(tasks[-1].created_at, tasks[-1].id))
+        task_service.get_task_by_id(db, tasks[0].id, user_id)
+        
+        entries = journal_service.get_user_journal_entries(db, user_id, limit=20)
+        journal_service.get_user_journal_entries(db, user_id, limit=20, since=cutoff)
+        journal_service.get_user_journal_entries(
+            db, user_id, limit=20, before=(entries[-1].created_at, entries[-1].id)
+        )
+        journal_service.get_journal_entry_by_id(db, entries[0].id, user_id)
+        
+        BehavioralMoodPredictor().predict(db, user_id)
+        
+        # Inline route queries: mood history, latest journal entry, Brightspace titles, OAuth token
+        db.scalars(
+            select(MoodProfile).where(MoodProfile.user_id == user_id, MoodProfile.created_at >= cutoff)
+            .order_by(MoodProfile.created_at.desc())
+        ).all()
+        db.query(JournalEntry).filter(JournalEntry.user_id == user_id).order_by(
+            JournalEntry.created_at.desc()
+        ).first()
+        db.query(Task.title).filter(Task.user_id == user_id, Task.source == TaskSource.BRIGHTSPACE).all()
+        db.query(OAuthToken).filter(
+            OAuthToken.user_id == user_id, OAuthToken.provider == "brightspace"
+        ).first()
+    
+    # Deadline walk of the periodic priority refresh
+    priority_service.refresh_priority_scores(lambda: Session(plan_engine), horizon_days=14, chunk_size=100)
+
+
+async def run_async_queries(async_engine, user_id: uuid.UUID) -> None:
+    async with AsyncSession(async_engine) as db:
+        await get_change_version(db, user_id, "tasks")
+        tasks = await async_task_service.get_user_tasks(db, user_id, limit=20)
+        await async_task_service.get_user_tasks(db, user_id, limit=20, status=TaskStatus.COMPLETED)
+        await async_task_service.get_user_tasks(
+            db, user_id, limit=20, after=(tasks[-1].created_at, tasks[-1].id)
+        )
+        await async_task_service.get_task_by_id(db, tasks[0].id, user_id)
+        entries = await async_journal_service.get_user_journal_entries(db, user_id, limit=20)
+        await async_journal_service.get_user_journal_entries(
+            db, user_id, limit=20, before=(entries[-1].created_at, entries[-1].id)
+        )
+        await async_journal_service.get_journal_entry_by_id(db, entries[0].id, user_id)
+        since = datetime.utcnow() - timedelta(days=30)
+        hits = await async_journal_service.search_journal_entries(db, user_id, ["entry"], since=since, limit=20)
+        await async_journal_service.search_journal_entries(
+            db, user_id, ["entry"], limit=20, after=(hits[-1].rank, hits[-1].id)
+        )
+        await priority_service.get_next_tasks(db, user_id, 5)
+        await task_stats_service.get_task_stats(db, user_id, "America/New_York", 7)
+        hits = await async_task_service.search_user_tasks(db, user_id, ["task"], limit=20)
+        await async_task_service.search_user_tasks(
+            db, user_id, ["task"], limit=20, after=(hits[-1].rank, hits[-1].Task.id)
+        )
+        
+        # Delta sync: first sync, then from a position
+        changes = await async_task_service.get_task_changes(db, user_id, limit=20)
+        await async_task_service.get_task_changes(db, user_id, since=changes["next"], limit=20)
+        changes = await async_journal_service.get_journal_changes(db, user_id, limit=20)
+        await async_journal_service.get_journal_changes(db, user_id, since=changes["next"], limit=20)
+
+
+def full_scans(conn, statement: str, parameters) -> list:
+    plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    return [
+        row[-1] for row in plan
+        if row[-1].startswith("SCAN ") and row[-1].split()[1] in TABLES
+    ]
+
+
+def test_service_queries_use_indexes(seeded):
+    """Test that no service query falls back to a full table scan"""
+    plan_engine, user_id = seeded
+    statements = []
+    
+    capture_selects(plan_engine, statements)
+    run_sync_queries(plan_engine, user_id)
+    
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{PLAN_DB_PATH}", poolclass=NullPool)
+    capture_selects(async_engine.sync_engine, statements)
+    asyncio.run(run_async_queries(async_engine, user_id))
+    asyncio.run(async_engine.dispose())
+    
+    assert len(statements) >= 20
+    failures = []
+    with plan_engine.connect() as conn:
+        for statement, parameters in dict.fromkeys((s, tuple(p)) for s, p in statements):
+            scans = full_scans(conn, statement, parameters)
+            if scans:
+                failures.append(f"{' '.join(statement.split())}\n    -> {scans}")
+    assert not failures, "Full table scans:\n" + "\n".join(failures)
@@ -0,0 +1,112 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.query_stats import QueryBudgetExceeded, QueryStatsMiddleware, query_budget
+from app.routes import sync as sync_routes
+
+
+def make_app(statements):
+    """Minimal app whose only route runs the given statements"""
+    query_engine = create_engine("sqlite://")
+    budget_app = FastAPI()
+    budget_app.add_middleware(QueryStatsMiddleware)
+    
+    @budget_app.get("/run", dependencies=[Depends(query_budget(3))])
+    def run():
+        with query_engine.connect() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+        return {"ok": True}
+    
+    return TestClient(budget_app)
+
+
+def test_failed_statements_leave_no_timers(monkeypatch):
+    """Test that statements that fail don't leave start times behind on the pooled connection"""
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1000)
+    query_engine = create_engine("sqlite://", poolclass=StaticPool)
+    timing_app = FastAPI()
+    timing_app.add_middleware(QueryStatsMiddleware)
+    
+    @timing_app.get("/run", dependencies=[Depends(query_budget(3))])
+    def run():
+        with query_engine.connect() as conn:
+            for _ in range(2):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            return {"info": [key for key, value in conn.info.items() if key.endswith("start_time") and value]}
+    
+    response = TestClient(timing_app).get("/run")
+    assert response.status_code == 200
+    assert response.json() == {"info": []}
+
+
+def test_server_timing_header(client, auth_headers):
+    """Test that responses report statement count and database time"""
+    response = client.get(f"{settings.API_V1_PREFIX}/tasks", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'queries"' in response.headers["Server-Timing"]
+
+
+def test_over_budget_request_fails():
+    """Test that running more statements than the route's budget raises"""
+    budget_client = make_app(["SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4"])
+    with pytest.raises(QueryBudgetExceeded, match="budget is 3"):
+        budget_client.get("/run")
+
+
+def test_repeated_statement_fails(monkeypatch):
+    """Test that repeating the same statement is reported as an N+1"""
+    monkeypatch.setattr(settings, "QUERY_REPEAT_LIMIT", 3)
+    budget_client = make_app(["SELECT 1"] * 3)
+    with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+        budget_client.get("/run")
+
+
+def test_budget_only_logged_when_not_enforced(monkeypatch, caplog):
+    """Test that violations are logged instead of failing outside test/debug mode"""
+    monkeypatch.setattr(settings, "QUERY_BUDGET_ENFORCE", False)
+    budget_client = make_app(["SELECT 1", "SELECT 2", "SELECT 3", "SELECT 4"])
+    response = budget_client.get("/run")
+    assert response.status_code == 200
+    assert 'desc="4 queries"' in response.headers["Server-Timing"]
+    assert "budget is 3" in caplog.text
+
+
+class FakeBrightspaceClient:
+    def __init__(self, *args):
+        pass
+    
+    def get_courses(self):
+        return [{"OrgUnit": {"Id": course_id, "Name": f"Course {course_id}"}} for course_id in (1, 2)]
+    
+    def get_assignments(self, org_unit_id):
+        return [{"Name": f"Assignment {n}"} for n in range(6)]
+    
+    def assignment_to_task(self, assignment, course_name):
+        return {"title": f"{course_name}: {assignment['Name']}", "source": "brightspace"}
+
+
+def test_brightspace_sync_within_budget(client, auth_headers, monkeypatch):
+    """Test that syncing many assignments doesn't run a query per assignment"""
+    monkeypatch.setattr(sync_routes, "BrightspaceClient", FakeBrightspaceClient)
+    client.post(
+        f"{settings.API_V1_PREFIX}/sync/brightspace/authorize",
+        params={"app_id": "a", "app_key": "b", "user_id": "c", "user_key": "d", "host": "e"},
+        headers=auth_headers
+    )
+    
+    response = client.post(f"{settings.API_V1_PREFIX}/sync/brightspace/sync", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    assert len(response.json()) == 12
+    
+    # Already-synced assignments are skipped
+    response = client.post(f"{settings.API_V1_PREFIX}/sync/brightspace/sync", headers=auth_headers)
+    assert response.json() == []
@@ -0,0 +1,74 @@
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import replicas
+from app.core.config import settings
+from app.core.database import Base
+from app.core.replicas import ReadReplicaRouter
+from app.models.task import Task
+
+REPLICA_PATH = "./test_replica.db"
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A second SQLite file standing in for a read replica"""
+    replica_engine = create_engine(f"sqlite:///{REPLICA_PATH}")
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(replicas, "read_router", ReadReplicaRouter([f"sqlite:///{REPLICA_PATH}"]))
+    monkeypatch.setattr(replicas, "_recent_writes", {})
+    yield sessionmaker(bind=replica_engine)
+    replica_engine.dispose()
+    os.remove(REPLICA_PATH)
+
+
+def add_replica_task(replica, user_id, title="Only on the replica"):
+    with replica() as session:
+        session.add(Task(user_id=uuid.UUID(user_id), title=title))
+        session.commit()
+
+
+def get_task_titles(client, headers):
+    response = client.get(f"{settings.API_V1_PREFIX}/tasks", headers=headers)
+    assert response.status_code == 200
+    return [task["title"] for task in response.json()]
+
+
+def test_reads_go_to_replica(client, auth_headers, replica, monkeypatch):
+    """Test that GET endpoints read from the replica once no recent write is pending"""
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+    user_id = client.get(f"{settings.API_V1_PREFIX}/auth/me", headers=auth_headers).json()["id"]
+    add_replica_task(replica, user_id)
+    
+    assert get_task_titles(client, auth_headers) == ["Only on the replica"]
+
+
+def test_recent_writer_reads_from_primary(client, auth_headers, replica):
+    """Test read-your-writes: a user who just wrote reads from the primary"""
+    client.post(f"{settings.API_V1_PREFIX}/tasks", json={"title": "Fresh"}, headers=auth_headers)
+    
+    assert get_task_titles(client, auth_headers) == ["Fresh"]
+
+
+def test_consistency_header_forces_primary(client, auth_headers, replica, monkeypatch):
+    """Test that X-Read-Consistency: primary bypasses the replica"""
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+    user_id = client.get(f"{settings.API_V1_PREFIX}/auth/me", headers=auth_headers).json()["id"]
+    add_replica_task(replica, user_id)
+    
+    headers = {**auth_headers, "X-Read-Consistency": "primary"}
+    assert get_task_titles(client, headers) == []
+
+
+def test_unavailable_replica_falls_back_to_primary(client, auth_headers, monkeypatch):
+    """Test that reads fall back to the primary when no replica can be reached"""
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", 0.0)
+    router = ReadReplicaRouter(["sqlite:////nonexistent/replica.db"])
+    monkeypatch.setattr(replicas, "read_router", router)
+    
+    assert get_task_titles(client, auth_headers) == []
+    assert router._down_until[0] > 0
@@ -0,0 +1,126 @@
+from fastapi import status
+
+from app.core import fulltext
+from app.core.config import settings
+
+TASKS_URL = f"{settings.API_V1_PREFIX}/tasks"
+
+
+def search(client, headers, **params):
+    response = client.get(f"{TASKS_URL}/search", params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response
+
+
+def titles(response):
+    return [task["title"] for task in response.json()]
+
+
+def test_task_search_ranks_and_matches_prefixes(client, auth_headers, test_user_data):
+    """Test that search matches every word, stems, expands `*` prefixes and ranks title hits first"""
+    for title, description in [
+        ("Buy groceries", "milk and history books"),
+        ("History essay", "draft the introduction"),
+        ("Essay outline", "for the history course"),
+        ("Gym", "running intervals"),
+    ]:
+        client.post(TASKS_URL, json={"title": title, "description": description}, headers=auth_headers)
+    
+    found = titles(search(client, auth_headers, q="history"))
+    assert found[0] == "History essay"
+    assert sorted(found[1:]) == ["Buy groceries", "Essay outline"]
+    assert titles(search(client, auth_headers, q="history ess*")) == ["History essay", "Essay outline"]
+    assert titles(search(client, auth_headers, q="history ess")) == []
+    assert titles(search(client, auth_headers, q="run")) == ["Gym"]
+    assert titles(search(client, auth_headers, q="volcano")) == []
+    
+    # Another user's tasks never match
+    other = {"email": "other@example.com", "password": test_user_data["password"]}
+    client.post(f"{settings.API_V1_PREFIX}/auth/register", json=other)
+    token = client.post(f"{settings.API_V1_PREFIX}/auth/login", json=other).json()["access_token"]
+    assert titles(search(client, {"Authorization": f"Bearer {token}"}, q="history")) == []
+    
+    response = client.get(f"{TASKS_URL}/search", params={"q": "!!"}, headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_task_search_pages_and_follows_writes(client, auth_headers):
+    """Test cursor pagination of results and that edits and deletes update the index"""
+    client.post(
+        f"{TASKS_URL}/batch", json={"tasks": [{"title": f"Reading {i}"} for i in range(5)]}, headers=auth_headers
+    )
+    seen = []
+    params = {"q": "reading", "limit": 2}
+    while True:
+        response = search(client, auth_headers, **params)
+        seen += titles(response)
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["after"] = response.headers["X-Next-Cursor"]
+    assert sorted(seen) == [f"Reading {i}" for i in range(5)]
+    
+    first = search(client, auth_headers, q="reading 0").json()[0]
+    client.put(f"{TASKS_URL}/{first['id']}", json={"title": "Writing"}, headers=auth_headers)
+    assert titles(search(client, auth_headers, q="writing")) == ["Writing"]
+    assert len(search(client, auth_headers, q="reading").json()) == 4
+    
+    client.delete(f"{TASKS_URL}/{first['id']}", headers=auth_headers)
+    assert titles(search(client, auth_headers, q="writing")) == []
+
+
+def search_journal(client, headers, **params):
+    response = client.get(f"{settings.API_V1_PREFIX}/journal/search", params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response
+
+
+def test_journal_search_snippets(client, auth_headers, test_user_data):
+    """Test that journal search ranks entries, honours `since` and returns escaped, highlighted snippets"""
+    journal_url = f"{settings.API_V1_PREFIX}/journal"
+    filler = " ".join(["nothing much happened"] * 20)
+    for content in [
+        f"Morning run by the <river>, then another run. {filler} An evening run too.",
+        f"{filler} Went for a run.",
+        "Rainy day, stayed inside and read.",
+    ]:
+        client.post(journal_url, json={"content": content}, headers=auth_headers)
+    
+    results = search_journal(client, auth_headers, q="running").json()
+    assert len(results) == 2
+    assert set(results[0]) == {"id", "created_at", "mood_label", "snippet"}
+    best = results[0]["snippet"]
+    assert "<mark>run</mark>" in best and "&lt;river&gt;" in best
+    assert len(best) < 400  # a snippet, not the whole entry
+    assert results[1]["snippet"].endswith("Went for a <mark>run</mark>.")
+    
+    page = search_journal(client, auth_headers, q="run", limit=1)
+    rest = search_journal(client, auth_headers, q="run", after=page.headers["X-Next-Cursor"]).json()
+    assert [r["id"] for r in page.json() + rest] == [r["id"] for r in results]
+    
+    future = "2999-01-01T00:00:00Z"
+    assert search_journal(client, auth_headers, q="run", since=future).json() == []
+    
+    other = {"email": "other@example.com", "password": test_user_data["password"]}
+    client.post(f"{settings.API_V1_PREFIX}/auth/register", json=other)
+    token = client.post(f"{settings.API_V1_PREFIX}/auth/login", json=other).json()["access_token"]
+    assert search_journal(client, {"Authorization": f"Bearer {token}"}, q="run").json() == []
+
+
+def test_journal_search_reports_truncation(client, auth_headers, monkeypatch):
+    """Test that SQLite search says when matches beyond the rank window were left out, counting only `since` matches"""
+    monkeypatch.setattr(fulltext, "SQLITE_RANK_WINDOW", 2)
+    journal_url = f"{settings.API_V1_PREFIX}/journal"
+    created = [
+        client.post(journal_url, json={"content": f"Walk number {n}"}, headers=auth_headers).json()
+        for n in range(3)
+    ]
+    
+    page = search_journal(client, auth_headers, q="walk", limit=1)
+    assert page.headers["X-Search-Truncated"] == "true"
+    rest = search_journal(client, auth_headers, q="walk", after=page.headers["X-Next-Cursor"])
+    assert rest.headers["X-Search-Truncated"] == "true"
+    assert {r["id"] for r in page.json() + rest.json()} == {entry["id"] for entry in created[1:]}
+    
+    recent = search_journal(client, auth_headers, q="walk", since=created[1]["created_at"])
+    assert "X-Search-Truncated" not in recent.headers
+    assert {r["id"] for r in recent.json()} == {entry["id"] for entry in created[1:]}
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.slow_queries import normalize_sql, parameter_shape, slow_query_log
+
+
+@pytest.fixture
+def log_every_query(monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.000001)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-secret")
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+def test_normalize_sql_collapses_placeholder_lists():
+    """Test that IN lists and multi-row VALUES normalize to one shape"""
+    assert normalize_sql("SELECT *\n  FROM tasks WHERE id IN (?, ?, ?)") == "SELECT * FROM tasks WHERE id IN (...)"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (...)"
+
+
+def test_parameter_shape_omits_values():
+    """Test that only parameter types are recorded"""
+    assert parameter_shape(("secret@example.com", 3)) == ["str", "int"]
+    assert parameter_shape({"email": "secret@example.com"}) == {"email": "str"}
+    assert parameter_shape([("a",), ("b",)], executemany=True) == {"rows": 2, "row": ["str"]}
+
+
+def test_slow_query_logged_with_route_and_plan(client, auth_headers, log_every_query):
+    """Test that a slow statement is recorded with its route and EXPLAIN QUERY PLAN"""
+    client.get(f"{settings.API_V1_PREFIX}/mood/history", headers=auth_headers)
+    
+    response = client.get("/api/v1/admin/db/slow-queries", headers={"X-Admin-Token": "admin-secret"})
+    assert response.status_code == 200
+    entries = [entry for entry in response.json() if "FROM mood_profiles" in entry["sql"]]
+    assert entries
+    assert entries[0]["route"] == "/api/v1/mood/history"
+    assert entries[0]["plan"] and any("mood_profiles" in line for line in entries[0]["plan"])
+    assert "test@example.com" not in json.dumps(response.json())
@@ -0,0 +1,78 @@
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import status
+
+from app.core.config import settings
+from app.services.task_stats_service import stats_cache
+
+TASKS_URL = f"{settings.API_V1_PREFIX}/tasks"
+ZONE = ZoneInfo("Pacific/Kiritimati")  # UTC+14, so local and UTC days rarely line up
+
+
+@pytest.fixture
+def test_user_data():
+    return {"email": "stats@example.com", "password": "testpassword123", "timezone": ZONE.key}
+
+
+def local_day_start(offset: int) -> datetime:
+    today = datetime.now(ZONE).date()
+    return datetime.combine(today + timedelta(days=offset), time.min, tzinfo=ZONE)
+
+
+def utc(moment: datetime) -> str:
+    return moment.astimezone(timezone.utc).isoformat()
+
+
+def create(client, headers, title, **fields):
+    response = client.post(TASKS_URL, json={"title": title, **fields}, headers=headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def get_stats(client, headers, **params):
+    response = client.get(f"{TASKS_URL}/stats", params=params, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def test_task_stats(client, auth_headers):
+    """Test counts, overdue tasks and upcoming load bucketed by the user's local days"""
+    tomorrow = local_day_start(1)
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    create(client, auth_headers, "Early tomorrow", due_date=utc(tomorrow + timedelta(minutes=1)), estimated_time=30)
+    create(
+        client, auth_headers, "Late tomorrow", due_date=utc(local_day_start(2) - timedelta(minutes=1)),
+        estimated_time=45, source="brightspace"
+    )
+    create(client, auth_headers, "In two days", due_date=utc(local_day_start(2) + timedelta(hours=1)))
+    create(client, auth_headers, "Overdue", due_date=utc(yesterday))
+    create(client, auth_headers, "Missed but done", due_date=utc(yesterday), status="completed")
+    create(client, auth_headers, "Done tomorrow", due_date=utc(tomorrow + timedelta(hours=1)), status="completed")
+    
+    stats = get_stats(client, auth_headers, days=3)
+    assert stats["total"] == 6
+    assert stats["by_status"] == {"pending": 4, "in_progress": 0, "completed": 2, "cancelled": 0}
+    assert stats["by_source"]["brightspace"] == 1
+    assert stats["overdue"] == 1
+    assert stats["timezone"] == ZONE.key
+    assert [(day["date"], day["tasks"], day["estimated_minutes"]) for day in stats["upcoming"]] == [
+        (local_day_start(0).date().isoformat(), 0, 0),
+        (tomorrow.date().isoformat(), 2, 75),
+        (local_day_start(2).date().isoformat(), 1, 0),
+    ]
+
+
+def test_task_stats_cached_until_write(client, auth_headers):
+    """Test that repeated loads come from the cache and a task write invalidates it"""
+    create(client, auth_headers, "First")
+    assert get_stats(client, auth_headers)["total"] == 1
+    hits = stats_cache.stats()["hits"]
+    assert get_stats(client, auth_headers)["total"] == 1
+    assert stats_cache.stats()["hits"] == hits + 1
+    
+    task = create(client, auth_headers, "Second", status="in_progress")
+    assert get_stats(client, auth_headers)["by_status"]["in_progress"] == 1
+    client.delete(f"{TASKS_URL}/{task['id']}", headers=auth_headers)
+    assert get_stats(client, auth_headers)["total"] == 1
@@ -1,6 +1,9 @@
+import json
 import pytest
 from fastapi import status
 from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.models.task import Task
 
 
 def test_create_task(client, auth_headers):
@@ -165,3 +168,122 @@ def test_get_tasks_with_filter(client, auth_headers):
     assert all(task["status"] == "completed" for task in data)
 
 
+def test_get_tasks_keyset_pages(client, auth_headers, db):
+    """Test walking the task list with cursors, including rows with equal timestamps"""
+    for i in range(5):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}"}, headers=auth_headers)
+    # Identical created_at values force the id tie-breaker
+    db.execute(update(Task).values(created_at=datetime(2024, 1, 1)))
+    db.commit()
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"after": cursor} if cursor else {})}
+        response = client.get("/api/v1/tasks", params=params, headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+        seen.extend(task["id"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+    
+    response = client.get("/api/v1/tasks?after=not-a-cursor", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+
+def test_batch_create_update_delete(client, auth_headers):
+    """Test the bulk task endpoints, including ids the user doesn't own"""
+    response = client.post(
+        "/api/v1/tasks/batch",
+        json={"tasks": [{"title": f"Task {i}"} for i in range(1000)]},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    results = response.json()["results"]
+    assert [result["task"]["title"] for result in results[:3]] == ["Task 0", "Task 1", "Task 2"]
+    ids = [result["id"] for result in results]
+    
+    # Another user's task can be neither updated nor deleted
+    client.post("/api/v1/auth/register", json={"email": "other@example.com", "password": "otherpassword"})
+    token = client.post(
+        "/api/v1/auth/login", json={"email": "other@example.com", "password": "otherpassword"}
+    ).json()["access_token"]
+    other_id = client.post(
+        "/api/v1/tasks", json={"title": "Not yours"}, headers={"Authorization": f"Bearer {token}"}
+    ).json()["id"]
+    
+    response = client.patch(
+        "/api/v1/tasks/batch",
+        json={"ids": ids[:10] + [other_id], "status": "completed"},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()["results"]
+    assert all(result["ok"] and result["task"]["status"] == "completed" for result in results[:10])
+    assert results[10] == {"id": other_id, "ok": False, "error": "not_found", "task": None}
+    
+    response = client.request(
+        "DELETE", "/api/v1/tasks/batch", json={"ids": ids[:500] + [other_id]}, headers=auth_headers
+    )
+    results = response.json()["results"]
+    assert sum(result["ok"] for result in results) == 500
+    assert not results[-1]["ok"]
+    
+    remaining = client.get("/api/v1/tasks?limit=1000", headers=auth_headers).json()
+    assert len(remaining) == 500
+    assert client.get(f"/api/v1/tasks/{other_id}", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_batch_size_limit(client, auth_headers):
+    """Test that batches over 1000 items are rejected"""
+    response = client.post(
+        "/api/v1/tasks/batch",
+        json={"tasks": [{"title": "x"}] * 1001},
+        headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_get_tasks_sparse_fields(client, auth_headers):
+    """Test that ?fields= returns only the requested fields and still paginates"""
+    for i in range(3):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}", "estimated_time": 30}, headers=auth_headers)
+    
+    response = client.get("/api/v1/tasks?fields=title,status&limit=2", headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {"title": "Task 0", "status": "pending"},
+        {"title": "Task 1", "status": "pending"},
+    ]
+    
+    response = client.get(
+        "/api/v1/tasks",
+        params={"fields": "id", "after": response.headers["X-Next-Cursor"]},
+        headers=auth_headers
+    )
+    assert len(response.json()) == 1
+    assert list(response.json()[0]) == ["id"]
+    
+    response = client.get("/api/v1/tasks?fields=title,password", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_tasks_ndjson(client, auth_headers):
+    """Test streaming the task list as NDJSON, in full and projected"""
+    for i in range(3):
+        client.post("/api/v1/tasks", json={"title": f"Task {i}"}, headers=auth_headers)
+    headers = {**auth_headers, "Accept": "application/x-ndjson"}
+    
+    response = client.get("/api/v1/tasks", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "ETag" in response.headers
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == client.get("/api/v1/tasks", headers=auth_headers).json()
+    
+    response = client.get("/api/v1/tasks?fields=title&limit=2", headers=headers)
+    assert response.text == '{"title":"Task 0"}\n{"title":"Task 1"}\n'